@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+"""
+Module that benchmarks hot paths of the game on synthetic maps of growing sizes
+
+Each benchmark gives the best mean duration of one call in seconds. Results are saved as
+json and compared with a baseline: a benchmark slower than baseline by more than the
+threshold is a regression.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import timeit
+
+import game.core as gc
+import game.default_settings as def_settings
+import game.loader as loader
+
+__author__ = 'tom.gabriele'
+LOGGER = logging.getLogger(__name__)
+
+# legend of synthetic maps
+LEGEND = {
+    "#": {"name": "wall", "type": "wall"},
+    "s": {"name": "start", "type": "start"},
+    ".": {"name": "ground", "type": "ground"},
+    "t": {"name": "tube", "type": "inventory"},
+    "n": {"name": "needle", "type": "inventory"},
+    "e": {"name": "ether", "type": "inventory"},
+    "g": {"name": "guard", "type": "exit"},
+}
+OBJECTS = {"needle": 1, "tube": 1, "ether": 1}
+
+
+def write_synthetic_map(folder: str, size: int):
+    """
+    write a square map: walls around ground with wall pillars, start at top left and exit at
+    bottom right.
+    :param folder:
+    :param size: number of rows and columns, at least 5
+    :return: a MapSpec instance
+    """
+    name = 'benchmark_{0}x{0}'.format(size)
+    map_path = os.path.join(folder, name + '.txt')
+    dict_path = os.path.join(folder, name + '.json')
+    ground = '#' + '.' * (size - 2) + '#\n'
+    # column in front of exit is kept free
+    pillars = '#' + ''.join('#' if column % 4 == 2 and column != size - 2 else '.'
+                            for column in range(1, size - 1)) + '#\n'
+    with open(map_path, 'w') as file:
+        file.write('#s' + '#' * (size - 2) + '\n')
+        for row in range(1, size - 1):
+            file.write(pillars if row % 4 == 2 else ground)
+        file.write('#' * (size - 2) + 'g#\n')
+    with open(dict_path, 'w') as file:
+        json.dump(LEGEND, file)
+    return loader.compile_map(name, map_path, dict_path)
+
+
+def measure(function, repeat: int):
+    """
+    time a function as timeit does: calls are repeated until a run lasts 0.2 second
+    :param function: callable without argument
+    :param repeat: number of runs
+    :return: best mean duration of one call in seconds
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def create_labyrinth(map_spec, labyrinth_class=gc.CommandLineLabyrinth):
+    """
+    build a labyrinth of a synthetic map with player on start
+    :return:
+    """
+    labyrinth = labyrinth_class(map_spec.name, gc.Conditions(to_pick_up_objects=OBJECTS),
+                                'benchmark', map_spec=map_spec, seed=0)
+    labyrinth.get_player_initial_position()
+    return labyrinth
+
+
+def benchmark_construction(map_spec, repeat):
+    """
+    parse map files and build a labyrinth
+    :return:
+    """
+    return measure(lambda: create_labyrinth(
+        loader.compile_map(map_spec.name, map_spec.map_path, map_spec.dict_path)), repeat)
+
+
+def benchmark_move_player(map_spec, repeat):
+    """
+    move player back and forth in first row
+    :return:
+    """
+    labyrinth = create_labyrinth(map_spec)
+    labyrinth.move_player('down')
+    directions = ['right', 'left'] * 500
+
+    def moves():
+        """
+        1000 moves
+        :return:
+        """
+        for direction in directions:
+            labyrinth.move_player(direction)
+    return measure(moves, repeat) / len(directions)
+
+
+def benchmark_print_map(map_spec, repeat):
+    """
+    console representation of the map after a move
+    :return:
+    """
+    labyrinth = create_labyrinth(map_spec)
+    directions = ['down', 'up']
+
+    def print_map():
+        """
+        move and render
+        :return:
+        """
+        previous_position = labyrinth.player['position']
+        labyrinth.move_player(directions[labyrinth.moves % 2])
+        labyrinth.renderer.invalidate(previous_position, labyrinth.player['position'])
+        return labyrinth.print_map()
+    return measure(print_map, repeat)
+
+
+def benchmark_checked_conditions(map_spec, repeat):
+    """
+    check success conditions
+    :return:
+    """
+    return measure(create_labyrinth(map_spec).checked_conditions, repeat)
+
+
+def benchmark_frame(map_spec, repeat):
+    """
+    render one full frame of graphical mode, visible map chunks built again
+    :return:
+    """
+    # pygame is only needed by this benchmark
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    import game.graphics as graphics
+
+    pygame.init()
+    try:
+        labyrinth = create_labyrinth(map_spec, graphics.GraphicalLabyrinth)
+        window = pygame.display.set_mode(labyrinth.window_size)
+        labyrinth.renderer = graphics.MapRenderer(labyrinth, graphics.AssetManager(),
+                                                  window_size=labyrinth.window_size)
+
+        def frame():
+            """
+            render without cached chunks nor static layer, as after a scroll
+            :return:
+            """
+            labyrinth.renderer.chunks.clear()
+            labyrinth.renderer.static_layer = None
+            labyrinth.renderer.render(window, full=True)
+        return measure(frame, repeat)
+    finally:
+        pygame.quit()
+
+
+BENCHMARKS = {
+    'construction': benchmark_construction,
+    'move_player': benchmark_move_player,
+    'print_map': benchmark_print_map,
+    'checked_conditions': benchmark_checked_conditions,
+    'frame': benchmark_frame,
+}
+
+
+def run(sizes=None, names=None, repeat=3):
+    """
+    run benchmarks on synthetic maps
+    :param sizes: sizes of maps. Default to BENCHMARK_SIZES
+    :param names: keys of BENCHMARKS. Default to every benchmark
+    :param repeat: number of runs of each benchmark
+    :return: dict of results: {'sizes': {size: {name: seconds}}, 'python': version}
+    """
+    names = names or list(BENCHMARKS)
+    unknown = set(names).difference(BENCHMARKS)
+    if unknown:
+        raise ValueError("Unknown benchmarks %s. Available benchmarks: %s"
+                         % (sorted(unknown), sorted(BENCHMARKS)))
+    results = {'python': platform.python_version(), 'sizes': {}}
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes or def_settings.BENCHMARK_SIZES:
+            map_spec = write_synthetic_map(folder, size)
+            timings = results['sizes'][str(size)] = {}
+            for name in names:
+                timings[name] = BENCHMARKS[name](map_spec, repeat)
+                LOGGER.info("%sx%s %s: %.3g s", size, size, name, timings[name])
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float):
+    """
+    find regressions: benchmarks of both results slower than baseline by more than threshold
+    :param results: dict returned by run
+    :param baseline: dict returned by run
+    :param threshold: allowed relative slowdown, 0.25 allows 25% slower
+    :return: list of (size, benchmark name, duration / baseline duration)
+    """
+    regressions = []
+    for size, timings in results['sizes'].items():
+        for name, duration in timings.items():
+            reference = baseline['sizes'].get(size, {}).get(name)
+            if reference and duration / reference > 1 + threshold:
+                regressions.append((size, name, duration / reference))
+    return regressions
+
+
+def main(argv=None):
+    """
+    Function that runs benchmarks from command line
+    :return: list of regressions
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the game on synthetic maps.")
+    parser.add_argument('-s', '--sizes', type=int, nargs='+',
+                        default=def_settings.BENCHMARK_SIZES)
+    parser.add_argument('-b', '--benchmarks', nargs='+', choices=sorted(BENCHMARKS))
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('-t', '--threshold', type=float, default=def_settings.BENCHMARK_THRESHOLD)
+    parser.add_argument('--baseline', default=def_settings.BENCHMARK_BASELINE_PATH,
+                        help="json results to compare with")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="save results as baseline instead of comparing")
+    parser.add_argument('-o', '--output', help="save results in this json file")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.benchmarks, args.repeat)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        return []
+    if not os.path.exists(args.baseline):
+        LOGGER.warning("No baseline %s: save one with --save-baseline", args.baseline)
+        return []
+    with open(args.baseline) as file:
+        regressions = compare(results, json.load(file), args.threshold)
+    for size, name, ratio in regressions:
+        print("REGRESSION {0}x{0} {1}: {2:.2f} times baseline".format(size, name, ratio))
+    return regressions
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main() else 0)
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+"""
+
+Contains the compiled binary map format and the compile-map tool.
+
+A compiled map is made of:
+- a fixed size header: magic, version, height, width, max column index, sizes of element
+  table and legend, offset of cells,
+- the element table: map characters of type ids, utf-8 encoded,
+- the legend: content of the json description file, utf-8 encoded,
+- cells: height * (width + 1) uint8 type ids laid out as CompactGrid cells, starting on
+  a DATA_ALIGNMENT boundary so that they can be memory mapped directly.
+
+"""
+import argparse
+import collections
+import json
+import logging
+import mmap
+import os
+import struct
+
+import game.catalog as catalog
+import game.default_settings as def_settings
+import game.grid as compact_grid
+
+__author__ = 'tom.gabriele'
+LOGGER = logging.getLogger(__name__)
+
+MAGIC = b'MGYMAP'
+VERSION = 1
+HEADER = struct.Struct('<6sHIIIIIQ')
+# multiple of memory mapping granularity on every platform
+DATA_ALIGNMENT = 65536
+
+CompiledMapHeader = collections.namedtuple(
+    'CompiledMapHeader', ('height', 'width', 'max_column_index', 'symbols', 'legend',
+                          'data_offset'))
+
+
+def compiled_map_path(map_path: str):
+    """
+
+    :param map_path: path of the .txt file
+    :return: path of the compiled map next to it
+    """
+    return os.path.splitext(map_path)[0] + def_settings.COMPILED_MAP_EXTENSION
+
+
+def write_compiled_map(path: str, lines, legend):
+    """
+    encode map lines and write them as a compiled map. File is replaced atomically.
+    :param path: path of the compiled map
+    :param lines: iterable of map lines, carriage returns included
+    :param legend: dict parsed from json description file
+    :return:
+    """
+    cells, width, height, max_column_index, symbols = compact_grid.encode_lines(lines)
+    symbols_content = ''.join(symbols).encode('utf-8')
+    legend_content = json.dumps(legend).encode('utf-8')
+    data_offset = HEADER.size + len(symbols_content) + len(legend_content)
+    data_offset += -data_offset % DATA_ALIGNMENT
+
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, height, width, max_column_index,
+                               len(symbols_content), len(legend_content), data_offset))
+        file.write(symbols_content)
+        file.write(legend_content)
+        file.seek(data_offset)
+        file.write(cells)
+    os.replace(temporary_path, path)
+
+
+def compile_map_files(map_path: str, dict_path: str, output_path=None, progress=None):
+    """
+    compile a .txt/.json pair of map files. Map file is streamed line by line.
+    :param map_path:
+    :param dict_path:
+    :param output_path: path of the compiled map. Default to compiled_map_path(map_path)
+    :param progress: callable receiving read bytes and file size, see grid.iter_lines
+    :return: path of the compiled map
+    """
+    output_path = output_path or compiled_map_path(map_path)
+    with open(dict_path) as file:
+        legend = json.load(file)
+    write_compiled_map(output_path, compact_grid.iter_lines(map_path, progress), legend)
+    LOGGER.info("%s compiled to %s", map_path, output_path)
+    return output_path
+
+
+def read_header(path: str):
+    """
+    read header, element table and legend of a compiled map
+    :param path: path of the compiled map
+    :return: a CompiledMapHeader instance
+    """
+    with open(path, 'rb') as file:
+        content = file.read(HEADER.size)
+        if len(content) != HEADER.size:
+            raise ValueError("%s is not a compiled map" % path)
+        magic, version, height, width, max_column_index, symbols_size, legend_size, \
+            data_offset = HEADER.unpack(content)
+        if magic != MAGIC:
+            raise ValueError("%s is not a compiled map" % path)
+        if version != VERSION:
+            raise ValueError("%s has version %s, version %s expected. Compile it again."
+                             % (path, version, VERSION))
+        symbols = file.read(symbols_size).decode('utf-8')
+        legend = json.loads(file.read(legend_size).decode('utf-8'))
+    return CompiledMapHeader(height, width, max_column_index, symbols, legend, data_offset)
+
+
+def map_cells(path: str, header: CompiledMapHeader):
+    """
+    memory map cells of a compiled map. Mapping is copy on write: modifications of cells
+    (objects placement, pick up...) are private and never written to the file.
+    :param path: path of the compiled map
+    :param header: a CompiledMapHeader instance
+    :return: an mmap instance
+    """
+    size = header.height * (header.width + 1)
+    if not size:
+        return bytearray()
+    with open(path, 'rb') as file:
+        return mmap.mmap(file.fileno(), size, access=mmap.ACCESS_COPY,
+                         offset=header.data_offset)
+
+
+def load_grid(path: str, element_factory):
+    """
+    build a CompactGrid reading cells of a compiled map from memory without parsing them.
+    :param path: path of the compiled map
+    :param element_factory: callable returning an Element instance from a map character
+    :return: a CompactGrid instance
+    """
+    header = read_header(path)
+    return compact_grid.CompactGrid.from_buffer(map_cells(path, header), header.width,
+                                                header.height, header.symbols,
+                                                element_factory, header.max_column_index)
+
+
+def main(argv=None):
+    """
+    compile-map tool: compile maps of the catalog (or given map files)
+    :return: list of compiled maps paths
+    """
+    parser = argparse.ArgumentParser(prog='compile-map',
+                                     description="Compile .txt/.json map files to binary maps.")
+    parser.add_argument('maps', nargs='*',
+                        help="map names of the catalog or .txt map files. Default to every "
+                             "map of the catalog")
+    parser.add_argument('-o', '--output', help="compiled map path, when one map is given")
+    args = parser.parse_args(argv)
+    if args.output and len(args.maps) != 1:
+        parser.error("--output needs exactly one map")
+
+    maps_catalog = catalog.get_catalog()
+    paths = []
+    for name in args.maps or maps_catalog.names():
+        if name.endswith('.txt'):
+            map_path, dict_path = name, os.path.splitext(name)[0] + '.json'
+        else:
+            entry = maps_catalog.get(name)
+            map_path, dict_path = entry['map_path'], entry['dict_path']
+        paths.append(compile_map_files(map_path, dict_path, args.output))
+        print(paths[-1])
+    return paths
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+"""
+
+Contains the map catalog: a persistent index of every map available in maps folders.
+
+"""
+import hashlib
+import json
+import logging
+import os
+
+import game.default_settings as def_settings
+
+__author__ = 'tom.gabriele'
+LOGGER = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+
+def _get_mtime(path):
+    """
+    get modification time of a file or a folder, None if it does not exist.
+    :param path:
+    :return:
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def describe_map(map_path: str, dict_path: str):
+    """
+    build the catalog entry of a map: paths, dimensions, items, start and exit counts
+    and checksum of files content. Map file is streamed line by line.
+    :param map_path:
+    :param dict_path:
+    :return: a dict
+    """
+    with open(dict_path, 'rb') as file:
+        dict_content = file.read()
+    legend = json.loads(dict_content.decode('utf-8'))
+    elements_types = def_settings.ELEMENTS_TYPE
+
+    def char_has(char, attribute):
+        """
+        check an attribute of the element type attached to a map character
+        :param char:
+        :param attribute:
+        :return:
+        """
+        element_type = legend.get(char, {}).get('type', def_settings.DEFAULT_ELEMENT_TYPE)
+        return elements_types.get(element_type, {}).get(attribute, False)
+
+    start_chars = [char for char in legend if char_has(char, 'is_start')]
+    exit_chars = [char for char in legend if char_has(char, 'is_exit')]
+    items = sorted(value['name'] for char, value in legend.items()
+                   if char_has(char, 'can_be_picked_up'))
+
+    checksum = hashlib.sha1()
+    height = width = start_count = exit_count = 0
+    with open(map_path, 'rb') as file:
+        for raw_line in file:
+            checksum.update(raw_line)
+            line = raw_line.decode('utf-8').rstrip('\r\n')
+            height += 1
+            width = max(width, len(line))
+            start_count += sum(line.count(char) for char in start_chars)
+            exit_count += sum(line.count(char) for char in exit_chars)
+    checksum.update(dict_content)
+
+    return {
+        'map_path': map_path,
+        'dict_path': dict_path,
+        'mtimes': [_get_mtime(map_path), _get_mtime(dict_path)],
+        'height': height,
+        'width': width,
+        'items': items,
+        'start_count': start_count,
+        'exit_count': exit_count,
+        'checksum': checksum.hexdigest(),
+    }
+
+
+class MapCatalog:
+    """
+    Index of maps found in maps folders, keyed by map name. The index is stored on disk and
+    only folders whose modification time changed are scanned again.
+    """
+
+    def __init__(self, folders=None, index_path=None):
+        """
+
+        :param folders: maps folders. Default to MAP_FOLDER_PATH_LIST
+        :param index_path: path of on-disk index. Default to MAP_CATALOG_PATH
+        """
+        self.folders = list(def_settings.MAP_FOLDER_PATH_LIST if folders is None else folders)
+        self.index_path = def_settings.MAP_CATALOG_PATH if index_path is None else index_path
+        self.directories = self.__read_index()
+        self.maps = {}
+        self.refresh()
+
+    def __repr__(self):
+        return "MapCatalog ({} maps)".format(len(self.maps))
+
+    def __contains__(self, map_name):
+        return map_name in self.maps
+
+    # INDEX PERSISTENCE METHODS
+    def __read_index(self):
+        """
+        read on-disk index. An unreadable or outdated index is ignored.
+        :return: scanned directories records
+        """
+        try:
+            with open(self.index_path) as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if index.get('version') != INDEX_VERSION or index.get('folders') != self.folders:
+            return {}
+        return index.get('directories', {})
+
+    def save(self):
+        """
+        write index on disk.
+        :return:
+        """
+        index = {'version': INDEX_VERSION, 'folders': self.folders,
+                 'directories': self.directories}
+        tmp_path = self.index_path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            with open(tmp_path, 'w') as file:
+                json.dump(index, file)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            LOGGER.warning("Map catalog index can not be saved in %s: %s", self.index_path, e)
+
+    # SCANNING METHODS
+    def refresh(self):
+        """
+        update index: folders whose modification time did not change are not listed again.
+        :return: True if index changed
+        """
+        changed = False
+        seen = set()
+        self.maps = {}
+
+        def scan(folder):
+            """
+            scan a folder and its sub folders, top-down as os.walk does.
+            :param folder:
+            :return:
+            """
+            nonlocal changed
+            mtime = _get_mtime(folder)
+            if mtime is None or folder in seen:
+                return
+            seen.add(folder)
+
+            record = self.directories.get(folder)
+            if record is None or record['mtime'] != mtime:
+                LOGGER.info("Scanning maps folder %s", folder)
+                record = self.__scan_folder(folder, mtime)
+                self.directories[folder] = record
+                changed = True
+
+            for map_name, entry in record['maps'].items():
+                self.maps.setdefault(map_name, entry)
+            for sub_folder in record['subdirs']:
+                scan(os.path.join(folder, sub_folder))
+
+        for maps_folder in self.folders:
+            scan(maps_folder)
+
+        for folder in set(self.directories).difference(seen):
+            del self.directories[folder]
+            changed = True
+
+        if changed:
+            self.save()
+        return changed
+
+    @staticmethod
+    def __scan_folder(folder, mtime):
+        """
+        list maps and sub folders of a folder
+        :param folder:
+        :param mtime: folder modification time
+        :return: folder record
+        """
+        subdirs, files = [], set()
+        for entry in os.scandir(folder):
+            if entry.is_dir():
+                subdirs.append(entry.name)
+            else:
+                files.add(entry.name)
+
+        maps = {}
+        for file_name in sorted(files):
+            map_name, extension = os.path.splitext(file_name)
+            if extension == '.txt' and map_name + '.json' in files:
+                map_path = os.path.join(folder, file_name)
+                try:
+                    maps[map_name] = describe_map(map_path,
+                                                  os.path.join(folder, map_name + '.json'))
+                except (OSError, ValueError) as e:
+                    LOGGER.warning("Map %s can not be indexed: %s", map_path, e)
+        return {'mtime': mtime, 'subdirs': sorted(subdirs), 'maps': maps}
+
+    # LOOKUP METHODS
+    def get(self, map_name: str):
+        """
+        get catalog entry of a map. Entry is updated if map files were modified since indexing.
+        :param map_name:
+        :return: a dict
+        """
+        entry = self.maps.get(map_name)
+        if entry is None or not os.path.exists(entry['map_path']):
+            self.refresh()
+            entry = self.maps.get(map_name)
+        if entry is None:
+            raise FileNotFoundError(
+                "Files %s or %s do not exist in maps folders : %s" % (
+                    map_name + '.txt', map_name + '.json', self.folders))
+
+        mtimes = [_get_mtime(entry['map_path']), _get_mtime(entry['dict_path'])]
+        if mtimes != entry['mtimes']:
+            entry.update(describe_map(entry['map_path'], entry['dict_path']))
+            self.save()
+        return entry
+
+    def names(self):
+        """
+
+        :return: sorted list of available map names
+        """
+        return sorted(self.maps)
+
+
+_CATALOGS = {}
+
+
+def get_catalog():
+    """
+    return the catalog of current maps folders. Catalog is created once per folders list.
+    :return: a MapCatalog instance
+    """
+    key = (tuple(def_settings.MAP_FOLDER_PATH_LIST), def_settings.MAP_CATALOG_PATH)
+    catalog = _CATALOGS.get(key)
+    if catalog is None:
+        catalog = _CATALOGS[key] = MapCatalog(*key)
+    return catalog
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+"""
+
+Contains the console renderer used by command line mode.
+
+"""
+import logging
+import shutil
+import sys
+
+import game.grid as compact_grid
+
+__author__ = 'tom.gabriele'
+LOGGER = logging.getLogger(__name__)
+
+# ANSI escape sequences
+MOVE_TO = "\x1b[{};1H"
+CLEAR_LINE = "\x1b[2K"
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+CLEAR_BELOW = "\x1b[J"
+
+
+class ConsoleRenderer:
+    """
+    Keep one string per map row and write only rows which changed.
+    When stream is an interactive terminal, changed rows are patched in place with ANSI
+    cursor moves. Otherwise the whole map is written each time.
+    A status message (last picked up object for instance) is written below the map on each
+    draw, so that clearing below the map never erases it.
+    """
+
+    def __init__(self, labyrinth, stream=None, interactive=None):
+        """
+
+        :param labyrinth: a GenericLabyrinth instance
+        :param stream: output stream. Default to sys.stdout
+        :param interactive: use ANSI cursor moves. Default to True if stream is a terminal
+        which can display the whole map without wrapping rows.
+        """
+        self.labyrinth = labyrinth
+        self.stream = stream or sys.stdout
+        if interactive is None:
+            size = shutil.get_terminal_size()
+            interactive = self.stream.isatty() and (
+                size.lines > labyrinth.grid.height + 2 and size.columns > labyrinth.grid.width)
+        self.interactive = interactive
+        self.rows = []
+        self.dirty_rows = set()
+        self.drawn = False
+        self.status = ""
+
+    def __repr__(self):
+        return "ConsoleRenderer of {}".format(self.labyrinth.map)
+
+    # ROWS METHODS
+    def __symbols(self):
+        """
+        translation table from element type ids to map symbols
+        :return: a dict
+        """
+        grid = self.labyrinth.grid
+        symbols = {type_id: element.symbol for type_id, element in enumerate(grid.elements)}
+        symbols[compact_grid.NEWLINE_ID] = '\n'
+        symbols[compact_grid.VOID_ID] = None
+        return symbols
+
+    def build_row(self, row: int, symbols=None):
+        """
+        build string of a map row, player included
+        :param row: row index
+        :param symbols: translation table, computed if not given
+        :return:
+        """
+        grid = self.labyrinth.grid
+        start = row * grid.stride
+        text = grid.cells[start:start + grid.stride].decode('latin-1').translate(
+            symbols or self.__symbols())
+
+        position = self.labyrinth.player['position']
+        if position and position[0] == row:
+            column = position[1]
+            text = text[:column] + self.labyrinth.player['element'].symbol + text[column + 1:]
+        return text
+
+    def build_rows(self):
+        """
+        build strings of every map rows
+        :return:
+        """
+        symbols = self.__symbols()
+        self.rows = [self.build_row(row, symbols) for row in range(self.labyrinth.grid.height)]
+        self.dirty_rows.clear()
+        return self.rows
+
+    def render(self):
+        """
+
+        :return: string of the whole map
+        """
+        return ''.join(self.build_rows())
+
+    def invalidate(self, *positions):
+        """
+        mark rows of given positions to be built and written again
+        :return:
+        """
+        self.dirty_rows.update(position[0] for position in positions if position)
+
+    # OUTPUT METHODS
+    def set_status(self, message: str):
+        """
+        set message written below the map by next draws
+        :return:
+        """
+        self.status = message
+
+    def draw(self):
+        """
+        write the map: only changed rows in interactive mode, the whole map otherwise.
+        :return:
+        """
+        if not (self.interactive and self.drawn):
+            self.drawn = True
+            if self.interactive:
+                self.stream.write(CLEAR_SCREEN)
+            self.stream.write(self.render() + '\n')
+            if self.status:
+                self.stream.write(self.status + '\n')
+            self.stream.flush()
+            return
+
+        symbols = self.__symbols()
+        output = []
+        for row in sorted(self.dirty_rows):
+            self.rows[row] = self.build_row(row, symbols)
+            output.append(MOVE_TO.format(row + 1) + CLEAR_LINE + self.rows[row].rstrip('\n'))
+        self.dirty_rows.clear()
+        # status, messages and prompt are written below the map
+        output.append(MOVE_TO.format(len(self.rows) + 1) + CLEAR_BELOW)
+        if self.status:
+            output.append(self.status + '\n')
+        self.stream.write(''.join(output))
+        self.stream.flush()
@@ -6,24 +6,46 @@
 Contains main classes used in game.
 
 """
-import json
 import logging
-import operator
 import os
 import random
-import re
+import time
 
-import pygame
-from pygame.locals import QUIT, KEYDOWN, K_UP, K_RIGHT, K_DOWN, K_LEFT
+import game.binmap as binmap
+import game.console as console
 import game.default_settings as def_settings
+import game.grid as compact_grid
+import game.inventory as inventory
+import game.loader as loader
+import game.placement as placement
+import game.profiling as profiling
+import game.recording as recording
 
 __author__ = 'tom.gabriele'
 LOGGER = logging.getLogger(__name__)
 
+# input prompt of console games
+PROMPT = "Choisir une direction Z,S,W,Q : "
+# message of a condition which is not satisfied at the end of a game
+CONSTRAINT_MESSAGE = "check_{}: constraint not satisfied"
+
 
 # logging.basicConfig(level=logging.DEBUG)
 
 
+def __getattr__(name):
+    """
+    import GraphicalLabyrinth on first access: console mode and headless tools never load
+    pygame.
+    :param name: attribute name
+    :return:
+    """
+    if name == 'GraphicalLabyrinth':
+        import game.graphics as graphics  # pylint: disable=import-outside-toplevel
+        return graphics.GraphicalLabyrinth
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
 class MissingElementException(Exception):
     """Exception to raise when an mandatory element miss on a map"""
 
@@ -47,6 +69,9 @@ class Element:
     # pylint: disable=too-many-instance-attributes
     # pylint: disable=too-many-arguments
 
+    __slots__ = ('symbol', 'element_name', 'walkable', 'can_be_picked_up', 'randomly_placed',
+                 'is_start', 'is_exit', 'is_player', 'picture')
+
     def __init__(self, symbol=" ", element_name="default", walkable=True, can_be_picked_up=False,
                  randomly_placed=False, is_start=False, is_exit=False, is_player=False,
                  picture=None):
@@ -83,20 +108,81 @@ class Element:
     @classmethod
     def create_from_default_settings(cls, element_type: str):
         """
-        this method is only used in unittests
-        :return:
+        get the shared immutable element of a default element type.
+        :return: an ElementType instance
         """
-        if element_type in cls.get_elements_types_list():
-            element_dict = cls._get_default_settings_elements_types()[element_type]
-            return cls(**element_dict)
+        if element_type in cls._get_default_settings_elements_types():
+            return ELEMENT_REGISTRY.get(element_type)
+
+
+class ElementType(Element):
+    """
+    Immutable Element shared by every cell of the same kind (flyweight).
+    Instances are interned by ElementRegistry.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        element = Element(*args, **kwargs)
+        for attr in Element.__slots__:
+            object.__setattr__(self, attr, getattr(element, attr))
+
+    def __setattr__(self, key, value):
+        raise AttributeError("ElementType instances are immutable")
+
+    def __reduce__(self):
+        return self.__class__, tuple(getattr(self, attr) for attr in Element.__slots__)
+
+
+class ElementRegistry:
+    """
+    Registry of interned ElementType instances, built from ELEMENTS_TYPE settings
+    and overridden by map description files (name, symbol and picture).
+    """
+
+    def __init__(self):
+        self.elements = {}
+
+    def __repr__(self):
+        return "ElementRegistry ({} elements)".format(len(self.elements))
+
+    def get(self, element_type: str, symbol=None, element_name=None, picture=None):
+        """
+        get the interned element of an element type, with optional overrides.
+        :param element_type: a key of ELEMENTS_TYPE
+        :param symbol:
+        :param element_name:
+        :param picture:
+        :return: an ElementType instance
+        """
+        settings = def_settings.ELEMENTS_TYPE[element_type]
+        key = (symbol if symbol is not None else settings['symbol'],
+               element_type,
+               element_name if element_name is not None else settings['element_name'],
+               picture if picture is not None else settings.get('picture'))
+        element = self.elements.get(key)
+        if element is None:
+            attributes = dict(settings)
+            attributes['symbol'], _, attributes['element_name'], attributes['picture'] = key
+            element = self.elements[key] = ElementType(**attributes)
+        return element
+
+
+ELEMENT_REGISTRY = ElementRegistry()
 
 
 class Conditions:
     """
     define conditions to say if player win or loose the game.
+    - to_pick_up_objects: dict of object names and counts the inventory must equal,
+    - max_moves: max number of moves,
+    - time_limit: max duration of the game in seconds.
     """
 
-    valid_conditions = ['to_pick_up_objects', ]
+    valid_conditions = ['to_pick_up_objects', 'max_moves', 'time_limit']
+    # conditions which can not be satisfied anymore once they failed: they end the game
+    limit_conditions = ['max_moves', 'time_limit']
 
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
@@ -115,61 +201,107 @@ class Conditions:
                 conditions_repr += "{} : {}".format(condition, getattr(self, condition))
         return conditions_repr
 
+    def as_dict(self):
+        """
+
+        :return: dict of defined conditions, keyword arguments of a new instance
+        """
+        return {key: getattr(self, key) for key in self.valid_conditions if key in self.__dict__}
+
     @staticmethod
-    def __get_method_attached_to_attribute_name(attribute_name):
+    def check_conditions(labyrinth, verbose=True):
         """
-        determine method attached to valid attribute
+        run check plan of a labyrinth
+        :param labyrinth:
+        :param verbose: print unsatisfied constraint
         :return:
         """
-        return "check_" + attribute_name
+        failed = labyrinth.check_plan.failed_condition()
+        if failed is not None:
+            if verbose:
+                print(CONSTRAINT_MESSAGE.format(failed))
+            return False
+        return True
 
-    @staticmethod
-    def __get_attribute_attached_to_method(method_name):
+    def compile(self, labyrinth):
+        """
+        build the check plan of a labyrinth: check methods are looked up once and inventory
+        counters get their targets.
+        :param labyrinth: a GenericLabyrinth instance
+        :return: a CheckPlan instance
         """
-        dertimine attribute attached to check method
+        labyrinth.player['inventory'].set_targets(getattr(self, 'to_pick_up_objects', None))
+        checks = [(key, getattr(self, "check_" + key))
+                  for key in self.valid_conditions if key in self.__dict__]
+        return CheckPlan(labyrinth, checks, [check for check in checks
+                                             if check[0] in self.limit_conditions])
+
+    def check_to_pick_up_objects(self, labyrinth):
+        """
+        compare inventory with instance attribute 'to_pick_up_objects'. Inventory keeps the
+        number of differences up to date.
         :return:
         """
-        reg = r"^check_(.*)$"
-        expression = re.search(reg, method_name)
-        return expression.group(1)
+        return labyrinth.player['inventory'].matches_targets()
 
-    @staticmethod
-    def check_conditions(labyrinth):
+    def check_max_moves(self, labyrinth):
         """
-        browse check conditions method
-        :param labyrinth:
+        compare number of moves with instance attribute 'max_moves'
         :return:
         """
+        return labyrinth.moves <= self.max_moves
 
-        for check_method in labyrinth.success_conditions.get_list_of_active_checks():
-            if getattr(labyrinth.success_conditions, check_method)(labyrinth) is False:
-                print("{}: constraint not satisfied".format(check_method))
-                return False
-        return True
+    def check_time_limit(self, labyrinth):
+        """
+        compare game duration with instance attribute 'time_limit'
+        :return:
+        """
+        return labyrinth.elapsed_time() <= self.time_limit
+
+
+class CheckPlan:
+    """
+    Conditions compiled for a labyrinth: the list of check methods to run, each of them
+    running in constant time.
+    """
 
-    def get_list_of_active_checks(self):
+    def __init__(self, labyrinth, checks, limits):
         """
-        determine the list of active method according to instance attributes
-        :return: the list of check method needed relative to Condition instance attributes
+
+        :param labyrinth: a GenericLabyrinth instance
+        :param checks: list of condition names and check methods
+        :param limits: checks of conditions ending the game once they failed
         """
+        self.labyrinth = labyrinth
+        self.checks = tuple(checks)
+        self.limits = tuple(limits)
 
-        return [self.__get_method_attached_to_attribute_name(key) for key in self.__dict__]
+    def __repr__(self):
+        return "CheckPlan ({})".format(", ".join(name for name, _ in self.checks))
 
-    def check_to_pick_up_objects(self, labyrinth):
+    def failed_condition(self):
         """
-        compare inventory with instance attribute 'to_pick_up_objects'
-        :return:
+
+        :return: name of first condition not satisfied, None if every condition is satisfied
+        """
+        for name, check in self.checks:
+            if not check(self.labyrinth):
+                return name
+        return None
+
+    def satisfied(self):
+        """
+
+        :return: True if every condition is satisfied
+        """
+        return self.failed_condition() is None
+
+    def is_lost(self):
         """
-        check_method_name = self.check_to_pick_up_objects.__name__
-        attribute_name = self.__get_attribute_attached_to_method(check_method_name)
 
-        inventory = {}
-        for key, value in labyrinth.player['inventory'].items():
-            new_key = key
-            inventory[new_key] = value['nb']
-        LOGGER.info("objects to pick up: %s ", getattr(self, attribute_name))
-        LOGGER.info("inventory : %s", inventory)
-        return getattr(self, attribute_name) == inventory
+        :return: True if a limit (moves, time) has been exceeded
+        """
+        return any(not check(self.labyrinth) for _, check in self.limits)
 
 
 class GenericLabyrinth:
@@ -184,14 +316,42 @@ class GenericLabyrinth:
 
     keyboard_commands = {}
 
-    def __init__(self, map_name: str, success_conditions: Conditions, player_name: str):
+    # directions understood by headless API whatever the labyrinth class
+    directions = {
+        'up': (-1, 0),
+        'right': (0, 1),
+        'down': (1, 0),
+        'left': (0, -1)
+    }
+
+    def __init__(self, map_name: str, success_conditions: Conditions, player_name: str,
+                 map_spec=None, seed=None):
+        """
+
+        :param map_name:
+        :param success_conditions:
+        :param player_name:
+        :param map_spec: an already compiled MapSpec. Default to the one loaded from map files.
+        :param seed: seed of objects placement. Default to a random one, kept in seed attribute.
+        """
         self.map = map_name
         self.success_conditions = success_conditions
+        self.map_spec = map_spec or loader.load_map_spec(map_name)
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.grid = None
+        self.placement = None
+        # elements replaced by randomly placed objects, put back by reset
+        self.__replaced_elements = {}
         self.positions = self.__get_elements_positions()
         # self player is a dict containing
         # 'element': Element instance, 'is_alive' status , 'position' and 'inventory' dict
         self.player = self.__create_player_element(player_name)
+        self.check_plan = success_conditions.compile(self)
         self.quit = False
+        self.moves = 0
+        self.started_at = time.monotonic()
+        self.recorder = None
+        self.profiler = None
 
     def __repr__(self):
         return "{}".format(self.print_map())
@@ -215,51 +375,144 @@ class GenericLabyrinth:
         """
         change player position on map according to button pressed
         and attributes of targetted position (Element) on the map
-        :return:
+        :param key: a key of keyboard_commands or of directions
+        :return: picked up Element instance or None
         """
 
         # Deals with case pressed key is not in keyboard commands
-        try:
-            next_position = tuple(
-                map(operator.add, self.player['position'], self.keyboard_commands[key]))
-        except KeyError:
-            next_position = self.player['position']
-
-        # check if new coordonates exist
-        if self.is_position_on_map(next_position):
-            # check if it's walkable
-            if self.is_position_walkable(next_position):
-                # change player position
-                self.player['position'] = next_position
-                # check if it is pickable
-                if self.is_position_pickable(next_position):
-                    # pick up object and add to inventory
-                    gift = self.positions[next_position]
-                    self.player['inventory'][gift.element_name]['nb'] += 1
-                    print(self.player['inventory'])
-                    self.positions[next_position] = Element.create_from_default_settings(
-                        def_settings.DEFAULT_ELEMENT_TYPE)
+        vector = self.keyboard_commands.get(key) or self.directions.get(key)
+        if vector is None:
+            return None
+        if self.recorder is not None:
+            self.recorder.add(vector)
+        row, column = self.player['position']
+        next_position = row + vector[0], column + vector[1]
+
+        # check if new coordonates exist and if it's walkable
+        if not (self.is_position_on_map(next_position) and
+                self.is_position_walkable(next_position)):
+            return None
+
+        # change player position
+        self.player['position'] = next_position
+        self.moves += 1
+        # check if it is pickable
+        if self.is_position_pickable(next_position):
+            # pick up object and add to inventory
+            gift = self.positions[next_position]
+            self.player['inventory'].add(gift.element_name)
+            self.positions[next_position] = Element.create_from_default_settings(
+                def_settings.DEFAULT_ELEMENT_TYPE)
+            return gift
+        return None
 
     def checked_conditions(self):
         """
         are success condition satisfied
         :return:
         """
-        return Conditions.check_conditions(self)
+        return self.check_plan.satisfied()
 
     def game_finished(self):
         """
-        is player on exit
+        is player on exit, or has a limit (moves, time) been exceeded
         :return:
         """
         if self.player['position'] in self.exit_positions:
             return True
         else:
-            return self.quit
+            return self.quit or self.check_plan.is_lost()
+
+    def elapsed_time(self):
+        """
+
+        :return: seconds since player has been placed on start
+        """
+        return time.monotonic() - self.started_at
+
+    # HEADLESS API
+    def reset(self, seed=None):
+        """
+        put map, player and inventory back in their initial state: cells of randomly placed
+        objects get their elements back, then objects are placed again randomly.
+        :param seed: seed of objects placement. Default to seed attribute.
+        :return: state of the game
+        """
+        if seed is not None:
+            self.seed = seed
+        for position, element in self.__replaced_elements.items():
+            self.positions[position] = element
+        self.__randomly_place_inventory_objects_on_map(self.positions, random.Random(self.seed))
+        self.player['inventory'].clear()
+        self.quit = False
+        self.moves = 0
+        self.get_player_initial_position()
+        if self.recorder is not None:
+            self.start_recording()
+        return self.state()
+
+    def step(self, direction):
+        """
+        move player without any input, output or pygame call.
+        :param direction: a key of directions ('up', 'right', 'down', 'left')
+        or of keyboard_commands
+        :return: position, name of picked up object or None, game finished, game won
+        """
+        gift = self.move_player(direction)
+        finished = self.game_finished()
+        won = finished and self.check_plan.satisfied()
+        return self.player['position'], gift.element_name if gift else None, finished, won
+
+    def start_recording(self):
+        """
+        record next commands given to move_player
+        :return: a recording.Recorder instance
+        """
+        self.recorder = recording.Recorder(self)
+        return self.recorder
+
+    def save_recording(self, folder=None):
+        """
+        write recorded game in a file and stop recording
+        :param folder: Default to RECORDING_FOLDER_PATH setting
+        :return: path of the recording file
+        """
+        folder = folder or def_settings.RECORDING_FOLDER_PATH
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, "{}-{}-{}{}".format(
+            self.map, self.seed, time.strftime('%Y%m%d%H%M%S'), def_settings.RECORDING_EXTENSION))
+        recording.write_recording(path, self.recorder.finish())
+        self.recorder = None
+        LOGGER.info("Game recorded in %s", path)
+        return path
+
+    def enable_profiling(self, log_interval=None):
+        """
+        time phases of play_game loop and count moves, see game.profiling
+        :param log_interval: seconds between two summaries logged. Default to
+        PROFILE_LOG_INTERVAL, 0 to log no summary
+        :return: a profiling.FrameProfiler instance
+        """
+        self.profiler = profiling.FrameProfiler()
+        self.profiler.watch('moves', lambda: self.moves)
+        if log_interval != 0:
+            self.profiler.add_callback(profiling.LogDump(log_interval))
+        return self.profiler
+
+    def state(self):
+        """
+
+        :return: dict with player position, inventory counts and number of moves
+        """
+        return {
+            'position': self.player['position'],
+            'inventory': self.player['inventory'].as_dict(),
+            'moves': self.moves,
+        }
 
     def __get_elements_positions(self):
         """
-        return a dictionary containing coordinates (tuple) of as keys
+        return a dict-like view containing coordinates (tuple) of as keys
         and elements instances as values.
         :return:
         """
@@ -267,25 +520,22 @@ class GenericLabyrinth:
 
     def __get_map_file_structure(self):
         """
-        Transforms map to dictionnary with a tuple of absciss and ordinate as key and Element
-        instance as value.
+        Transforms map to a compact grid and return its dict-like view with a tuple of absciss
+        and ordinate as key and Element instance as value.
         :return:
         """
-        map_path = self.__get_map_files_path()[0]
-        structure = {}
-        with open(map_path, 'r') as file:
-            lines = file.readlines()
-            ordinate = 0
-            for line in lines:
-                row = ordinate
-                absciss = 0
-                for char in line:
-                    column = absciss
-                    structure[row, column] = self.__create_element_from_map_files(char)
-                    absciss += 1
-                ordinate += 1
-
-        self.__randomly_place_inventory_objects_on_map(structure)
+        if self.map_spec.binary_path is not None:
+            self.grid = binmap.load_grid(self.map_spec.binary_path,
+                                         self.__create_element_from_map_files)
+        elif self.map_spec.rows is None:
+            self.grid = compact_grid.CompactGrid.from_file(self.map_spec.map_path,
+                                                           self.__create_element_from_map_files)
+        else:
+            self.grid = compact_grid.CompactGrid.from_rows(self.map_spec.rows,
+                                                           self.__create_element_from_map_files)
+        structure = compact_grid.GridPositions(self.grid)
+        self.placement = placement.PlacementEngine(self.grid, self.start_position, self.map_spec)
+        self.__randomly_place_inventory_objects_on_map(structure, random.Random(self.seed))
 
         return structure
 
@@ -296,10 +546,8 @@ class GenericLabyrinth:
         :param position:
         :return: True if position is in map
         """
-        row_is_ok = position[0] in range(0, self.max_row_index + 1)
         # player can not be placed on carriage return
-        column_is_ok = position[1] in range(0, self.max_column_index)
-        return row_is_ok and column_is_ok
+        return self.grid.contains(*position)
 
     def is_position_walkable(self, position: tuple):
         """
@@ -307,7 +555,7 @@ class GenericLabyrinth:
         :param position:
         :return: True if position is walkable.
         """
-        return self.positions[position].walkable
+        return self.grid.is_walkable(*position)
 
     def is_position_pickable(self, position: tuple):
         """
@@ -315,7 +563,7 @@ class GenericLabyrinth:
         :param position:
         :return:
         """
-        return self.positions[position].can_be_picked_up
+        return self.grid.is_pickable(*position)
 
     def is_position_exit(self, position: tuple):
         """
@@ -323,43 +571,9 @@ class GenericLabyrinth:
         :param position:
         :return:
         """
-        return self.positions[position].is_exit
+        return self.grid.is_exit(*position)
 
     # CREATE LABYRINTH ELEMENTS AND STRUCTURE METHODS
-    def __get_map_files_path(self):
-        """
-        get map et map dict files path
-        :return:
-        """
-        map_file_name = self.map + '.txt'
-        map_dict_file_name = self.map + '.json'
-        map_files_path = None
-
-        def search_file_in_folder(folder):
-            """
-            search map and map dict in given folder
-            :param folder:
-            :return:
-            """
-            for root, dirs, files in os.walk(folder):
-                LOGGER.info("Searching map...")
-                if map_file_name in files and map_dict_file_name in files:
-                    LOGGER.info("Map found !")
-                    return os.path.join(root, map_file_name), os.path.join(root,
-                                                                           map_dict_file_name)
-
-        for maps_folder in def_settings.MAP_FOLDER_PATH_LIST:
-            map_files_path = search_file_in_folder(maps_folder)
-            if map_files_path:
-                break
-
-        if not map_files_path:
-            raise FileNotFoundError(
-                "Files %s or %s do not exist in maps folders : %s" % (
-                    map_file_name, map_dict_file_name,
-                    def_settings.MAP_FOLDER_PATH_LIST))
-        return map_files_path
-
     def __create_element_from_map_files(self, char):
         """
         allow to create all Element instances according to map file and map dict.
@@ -374,18 +588,15 @@ class GenericLabyrinth:
 
         json_dict = self.__map_json_to_dict()
         try:
-            element = Element.create_from_default_settings(json_dict[char]['type'])
-            element.element_name = json_dict[char]['name']
-            element.symbol = char
-            if 'picture' in json_dict[char].keys():
-                element.picture = json_dict[char]['picture']
+            element = ELEMENT_REGISTRY.get(json_dict[char]['type'], symbol=char,
+                                           element_name=json_dict[char]['name'],
+                                           picture=json_dict[char].get('picture'))
 
         except KeyError as e:
             LOGGER.warning("%s :\n Element type of char %s not defined in %s. "
                            "Default type %s will be applied", e, char, json_dict,
                            def_settings.DEFAULT_ELEMENT_TYPE)
-            element = Element.create_from_default_settings(def_settings.DEFAULT_ELEMENT_TYPE)
-            element.symbol = char
+            element = ELEMENT_REGISTRY.get(def_settings.DEFAULT_ELEMENT_TYPE, symbol=char)
         except Exception:
             raise
             # we add the symbol to used symbol
@@ -399,36 +610,20 @@ class GenericLabyrinth:
         :return: name and type of element of the map
         :type:dict
         """
-        dict_path = self.__get_map_files_path()[1]
-        with open(dict_path) as file:
-            json_dict = json.load(file)
-        return json_dict
+        return self.map_spec.legend
 
-    def __randomly_place_inventory_objects_on_map(self, structure: dict):
+    def __randomly_place_inventory_objects_on_map(self, structure, rng):
         """
-        Places element randomly on the map.
+        Places element randomly on cells reachable from start.
         :param structure:
+        :param rng: a random.Random instance
         :return:
         """
-        available_coordonates = self.__get_walkable_elements_coordonates(structure)
-        for key in self.__get_randomly_placed_elements():
-            i = random.randrange(len(available_coordonates))
-            structure[available_coordonates[i]] = self.__create_element_from_map_files(key)
-            del available_coordonates[i]
-
-    @staticmethod
-    def __get_walkable_elements_coordonates(structure):
-        """
-        List coordonates of walkable element of the map
-        :param structure:
-        :return:
-        """
-        elements_coordinates = [key for key, value in structure.items() if
-                                isinstance(value, Element)]
-        walkable_coordinates = [key for key in elements_coordinates if
-                                structure[key].walkable and not (
-                                    structure[key].is_start or structure[key].is_exit)]
-        return walkable_coordinates
+        objects_to_place = self.__get_randomly_placed_elements()
+        coordonates = self.placement.sample(len(objects_to_place), rng)
+        self.__replaced_elements = {position: structure[position] for position in coordonates}
+        for key, position in zip(objects_to_place, coordonates):
+            structure[position] = self.__create_element_from_map_files(key)
 
     def __get_randomly_placed_elements(self):
         """
@@ -451,25 +646,26 @@ class GenericLabyrinth:
         """
 
         authorized_symbol = list(set(def_settings.PLAYER_SYMBOLS).difference(self.used_char))
-        element = Element.create_from_default_settings(element_type=def_settings.PLAYER_TYPE)
+        element = Element(**def_settings.ELEMENTS_TYPE[def_settings.PLAYER_TYPE])
         element.element_name = player_name
 
         if element.symbol in self.used_char:
             element.symbol = authorized_symbol[0]
 
-        inventory = dict()
+        pictures = dict()
         for obj in self.pickable_elements_position.values():
-            inventory[obj.element_name] = {'picture': obj.picture,
-                                           'nb': 0}
+            pictures[obj.element_name] = obj.picture
 
-        return dict(element=element, is_alive=True, position=tuple(), inventory=inventory)
+        return dict(element=element, is_alive=True, position=tuple(),
+                    inventory=inventory.Inventory(pictures))
 
     def get_player_initial_position(self):
         """
-
+        place player on start. Game duration is measured from now.
         :return: initial player position
         """
         self.player['position'] = self.start_position
+        self.started_at = time.monotonic()
 
     # PROPERTIES
     @property
@@ -478,13 +674,7 @@ class GenericLabyrinth:
         extract all objects that can be picked up
         :return:
         """
-
-        pickable_objects = {}
-        for key, element in self.positions.items():
-            if not isinstance(element, str):
-                if element.can_be_picked_up:
-                    pickable_objects[key] = element
-        return pickable_objects
+        return dict(self.grid.pickable_positions)
 
     @property
     def max_row_index(self):
@@ -492,9 +682,7 @@ class GenericLabyrinth:
 
         :return: max row index
         """
-        if self.positions != {}:
-            return sorted([key[0] for key in self.positions])[-1]
-        return 0
+        return max(self.grid.height - 1, 0)
 
     @property
     def max_column_index(self):
@@ -502,9 +690,7 @@ class GenericLabyrinth:
 
         :return: max row index
         """
-        if self.positions != {}:
-            return sorted([key[1] for key in self.positions])[-1]
-        return 0
+        return self.grid.max_column_index
 
     @property
     def start_position(self):
@@ -512,10 +698,8 @@ class GenericLabyrinth:
 
         :return: start coordonates
         """
-        for key, element in self.positions.items():
-            if not isinstance(element, str):
-                if element.is_start:
-                    return key
+        if self.grid.start_positions:
+            return min(self.grid.start_positions)
         raise MissingElementException(self,
                                       'is_start',
                                       "There is no start point in this map. "
@@ -525,20 +709,14 @@ class GenericLabyrinth:
     def exit_positions(self):
         """
 
-        :return: a list of exit coordonates
+        :return: a frozenset of exit coordonates
         """
-        exit_list = []
-        for key, element in self.positions.items():
-            if not isinstance(element, str):
-                if element.is_exit:
-                    exit_list.append(key)
-        if exit_list:
-            return exit_list
-        else:
-            raise MissingElementException(self,
-                                          'is_exit',
-                                          "There is no exit point in this map. "
-                                          "Please modify txt and json map file")
+        if self.grid.exit_positions:
+            return self.grid.exit_positions
+        raise MissingElementException(self,
+                                      'is_exit',
+                                      "There is no exit point in this map. "
+                                      "Please modify txt and json map file")
 
 
 class CommandLineLabyrinth(GenericLabyrinth):
@@ -552,6 +730,12 @@ class CommandLineLabyrinth(GenericLabyrinth):
         'Q': (0, -1)
     }
 
+    def __init__(self, map_name: str, success_conditions: Conditions, player_name: str,
+                 map_spec=None, seed=None):
+        super(CommandLineLabyrinth, self).__init__(map_name, success_conditions, player_name,
+                                                   map_spec, seed)
+        self.renderer = console.ConsoleRenderer(self)
+
     # GAME AND CONDITIONS CHECKING METHODS
     def print_map(self):
         """
@@ -559,24 +743,7 @@ class CommandLineLabyrinth(GenericLabyrinth):
         and player_position attribute
         :return:
         """
-        map_str = ''
-
-        for row in range(self.max_row_index + 1):
-            for column in range(self.max_column_index + 1):
-                try:
-                    if isinstance(self.positions[row, column], Element):
-                        if (row, column) == self.player['position']:
-                            map_str += self.player['element'].symbol
-                        else:
-                            map_str += self.positions[row, column].symbol
-                    else:
-                        map_str += str(self.positions[row, column])
-                except KeyError as e:
-                    if row == self.max_row_index and column == self.max_column_index:
-                        return map_str
-                    else:
-                        raise e
-        return map_str
+        return self.renderer.render()
 
     def play_game(self):
         """
@@ -587,18 +754,39 @@ class CommandLineLabyrinth(GenericLabyrinth):
             "\nGetting initial position of player %s\n", self.player['element'].element_name)
         print("\nGetting initial position of player %s \n" % self.player['element'].element_name)
         self.get_player_initial_position()
-        print(self.print_map())
+        if def_settings.RECORDING_FOLDER_PATH:
+            self.start_recording()
+        if def_settings.PROFILE_FRAMES and self.profiler is None:
+            self.enable_profiling()
+        profiler = self.profiler
+        self.renderer.draw()
         while not self.game_finished():
-            self.checked_conditions()
+            if profiler is not None:
+                profiler.begin_frame()
+            previous_position = self.player['position']
             next_direction = self.__ask_direction()
-            self.move_player(next_direction)
-            print(self.print_map())
+            if profiler is not None:
+                profiler.lap('input')
+            if self.move_player(next_direction) is not None:
+                self.renderer.set_status(str(self.player['inventory']))
+            if profiler is not None:
+                profiler.lap('move')
+            # only rows where player moved or picked up an object are written again
+            self.renderer.invalidate(previous_position, self.player['position'])
+            self.renderer.draw()
+            if profiler is not None:
+                profiler.lap('render')
+                profiler.end_frame()
 
         # check if conditions are satisfied
-        if self.checked_conditions():
+        if Conditions.check_conditions(self):
             print("You win !")
         else:
             print("You loose...")
+        if self.recorder is not None:
+            self.save_recording()
+        if profiler is not None:
+            LOGGER.info("Frame profile: %s", "; ".join(profiler.summary()))
 
     @staticmethod
     def __ask_direction():
@@ -608,166 +796,5 @@ class CommandLineLabyrinth(GenericLabyrinth):
         """
         direction = ""
         while direction not in ('Z', 'S', 'W', 'Q'):
-            direction = input("Choisir une direction Z,S,W,Q : ").upper()
+            direction = input(PROMPT).upper()
         return direction
-
-
-class GraphicalLabyrinth(GenericLabyrinth):
-    """
-    Represent a GraphicalLabyrinth
-    """
-
-    keyboard_commands = {
-        K_UP: (-1, 0),
-        K_RIGHT: (0, 1),
-        K_DOWN: (1, 0),
-        K_LEFT: (0, -1)
-    }
-
-    def play_game(self):
-        """
-        Execution of the game
-        :return:
-        """
-        continue_game = True
-
-        # Initialize pygame module
-        pygame.init()
-        pygame.key.set_repeat(400, 30)
-
-        # Draw game's window
-        window = self.__draw_window()
-
-        # Get position of the player on the map.
-        LOGGER.info(
-            "\nGetting initial position of player %s\n", self.player['element'].element_name)
-        print("\nGetting initial position of player %s \n" % self.player['element'].element_name)
-        self.get_player_initial_position()
-
-        # main loop of the game
-        while continue_game:
-
-            # Try to save CPU time
-            pygame.time.wait(50)
-
-            # Draw Game Title
-            self.__draw_title(window)
-
-            # Draw background of the game.
-            self.__draw_background(window)
-
-            # Draw every element of the map.
-            for key, element in self.positions.items():
-                if not isinstance(element, str):
-                    ordonate, absciss = key
-                    coordinates = absciss, ordonate
-                    if element.picture is not None:
-                        self.__draw_element(window, element, coordinates)
-
-            # Events watcher
-            for event in pygame.event.get():
-                # if player clic on top right cross button.
-                if event.type == QUIT:
-                    continue_game = False
-                if event.type == KEYDOWN:
-                    # Change player position and check if game is finished.
-                    self.move_player(event.key)
-                    continue_game = not self.game_finished()
-
-            # Draw player
-            self.__draw_player(window)
-
-            # Draw inventory
-            self.__draw_inventory(window)
-
-            # Check if conditions are satisfied
-            if not continue_game:
-                window = self.__draw_window()
-                result_font = pygame.font.SysFont("monospace", 50)
-                if self.checked_conditions():
-                    message = "You win ;) !!!"
-
-                else:
-                    message = "You loose :( ..."
-                result = result_font.render(message, 1, (255, 255, 0))
-                window.blit(result, (50, 100))
-                pygame.display.update()
-                pygame.time.wait(2000)
-
-            pygame.display.update()
-            window.fill((0, 0, 0))
-
-    # DRAWING METHODS
-    @staticmethod
-    def __draw_window():
-        """
-        Draw main window of the game.
-        :return:
-        """
-        return pygame.display.set_mode((600, 720))
-
-    @staticmethod
-    def __draw_title(window):
-        """
-        Draw title of the game.
-        :return:
-        """
-        title_font = pygame.font.SysFont("monospace", 20)
-        title = title_font.render("MACGYVER", 1, (255, 255, 0))
-        window.blit(title, (0, 0))
-
-    @staticmethod
-    def __draw_background(window):
-        """
-        Draw background of the game.
-        :return:
-        """
-        background_path = os.path.join(def_settings.ROOT_PATH, 'media', 'background.jpg')
-        background = pygame.image.load(background_path).convert()
-        window.blit(background, (0, 120))
-
-    @staticmethod
-    def __draw_element(window, element, coordinates):
-        """
-        Draw elements in graphical mod.
-        :param element: An Element instance.
-        :return: A sprite with attached picture.
-        """
-        absciss, ordonate = coordinates
-        pict = element.picture
-        picture_path = os.path.join(def_settings.ROOT_PATH, 'media', pict)
-        sprite = pygame.image.load(picture_path).convert_alpha()
-        window.blit(sprite, (absciss * 40, ordonate * 40 + 120))
-
-    def __draw_player(self, window):
-        """
-        draw player in graphical mod
-        :return: The player sprite and its position.
-        """
-        player = self.player['element'].picture
-        player_picture_path = os.path.join(def_settings.ROOT_PATH, 'media', player)
-        player_sprite = pygame.image.load(player_picture_path).convert_alpha()
-        player_position = player_sprite.get_rect()
-        player_position.top, player_position.left = tuple(
-            [40 * i for i in list(self.player['position'])])
-        player_position.top += 120
-        window.blit(player_sprite, player_position)
-
-    def __draw_inventory(self, window):
-        """
-        Draw game inventory.
-        :param window: a pygame Surface instance
-        :return:
-        """
-        myfont = pygame.font.SysFont("monospace", 20)
-        column, row = 1, 1
-        for obj in self.player['inventory'].values():
-            absciss, ordinate = column * 40, row * 40
-            pict = obj['picture']
-            picture_path = os.path.join(def_settings.ROOT_PATH, 'media', pict)
-            inv = pygame.image.load(picture_path).convert_alpha()
-            # render text
-            label = myfont.render(str(obj['nb']), 1, (255, 255, 0))
-            window.blit(inv, (absciss, ordinate))
-            window.blit(label, (absciss + 40, ordinate))
-            column += 1
@@ -104,3 +104,70 @@ MAP_FOLDER_PATH_LIST = [
     os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'game', 'maps',
                  'example'),
 ]
+
+# on-disk index of maps found in MAP_FOLDER_PATH_LIST
+CACHE_FOLDER_PATH = os.environ.get(
+    'MACGYVER_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'macgyver'))
+MAP_CATALOG_PATH = os.path.join(CACHE_FOLDER_PATH, 'map_catalog.json')
+
+# max number of pictures kept in memory by graphical mode
+ASSET_CACHE_SIZE = 256
+
+# graphical mode rendering: 'dirty' draws again only changed tiles, 'full' the whole window
+RENDER_MODE = 'dirty'
+
+# graphical mode main loop: 'event' sleeps until input arrives, 'fps' caps frames per second
+# with LOOP_FPS and 'polling' waits POLLING_DELAY milliseconds between frames
+LOOP_MODE = 'event'
+LOOP_FPS = 30
+POLLING_DELAY = 50
+
+# max number of rendered texts kept in memory by graphical mode
+TEXT_CACHE_SIZE = 128
+
+# max number of distance fields kept in memory per map
+DISTANCE_CACHE_SIZE = 16
+
+# extension of compiled binary maps, written next to map files by compile-map tool
+COMPILED_MAP_EXTENSION = ".mgm"
+
+# map files bigger than this number of bytes are streamed into the grid of each labyrinth
+# instead of being kept in memory as lines
+STREAMING_MAP_SIZE = 16 * 1024 * 1024
+
+# graphical mode window size in pixels, map tiles size in pixels and height of the header
+# (title and inventory) above the map. The map is drawn through a viewport following the
+# player when it does not fit in the window.
+WINDOW_SIZE = (600, 720)
+TILE_SIZE = 40
+HEADER_HEIGHT = 120
+
+# graphical mode map is pre-composited in square chunks of CHUNK_SIZE tiles, at most
+# CHUNK_CACHE_SIZE chunks are kept in memory (more if the window shows more chunks)
+CHUNK_SIZE = 16
+CHUNK_CACHE_SIZE = 32
+
+# played games are recorded in this folder (None disables recording), see game.recording
+RECORDING_FOLDER_PATH = os.environ.get('MACGYVER_RECORDINGS')
+RECORDING_EXTENSION = ".mgr"
+
+# benchmark suite (game.benchmark): sizes of synthetic square maps, allowed relative slowdown
+# compared with baseline before a benchmark is a regression, and baseline results
+BENCHMARK_SIZES = (10, 100, 1000, 4000)
+BENCHMARK_THRESHOLD = 0.25
+BENCHMARK_BASELINE_PATH = os.path.join(CACHE_FOLDER_PATH, 'benchmark_baseline.json')
+
+# frame profiling of play_game loops (game.profiling): enabled by MACGYVER_PROFILE
+# environment variable, number of frames of rolling statistics, seconds between two
+# summaries logged, and summary drawn in graphical mode header
+PROFILE_FRAMES = bool(os.environ.get('MACGYVER_PROFILE'))
+PROFILE_WINDOW = 300
+PROFILE_LOG_INTERVAL = 5
+PROFILE_OVERLAY = False
+
+# console games server (game.server): listening address, seconds without input before a
+# session is closed and seconds between two metrics logged
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8023
+SERVER_IDLE_TIMEOUT = 300
+SERVER_METRICS_INTERVAL = 10
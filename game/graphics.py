@@ -0,0 +1,829 @@
+# -*- coding: utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+"""
+
+Contains graphical mode: GraphicalLabyrinth and helpers used to draw it with pygame.
+
+"""
+import collections
+import logging
+import os
+import time
+
+import pygame
+from pygame.locals import QUIT, KEYDOWN, K_UP, K_RIGHT, K_DOWN, K_LEFT
+
+import game.core as gc
+import game.default_settings as def_settings
+
+__author__ = 'tom.gabriele'
+LOGGER = logging.getLogger(__name__)
+
+# event posted once when time_limit condition expires, so that it is not checked each frame
+TIME_LIMIT_EVENT = pygame.USEREVENT + 1
+
+
+class AssetManager:
+    """
+    Load pictures of media folder once per display and keep them in a LRU cache, with their
+    copies scaled to tile size.
+    """
+
+    def __init__(self, media_path=None, max_size=None):
+        """
+
+        :param media_path: folder containing pictures. Default to ROOT_PATH/media
+        :param max_size: max number of pictures kept. Default to ASSET_CACHE_SIZE
+        """
+        self.media_path = media_path or os.path.join(def_settings.ROOT_PATH, 'media')
+        self.max_size = max_size or def_settings.ASSET_CACHE_SIZE
+        self.surfaces = collections.OrderedDict()
+        self.display = None
+        self.loads = 0
+
+    def __repr__(self):
+        return "AssetManager ({} pictures)".format(len(self.surfaces))
+
+    def get(self, picture: str, alpha=True, size=None):
+        """
+        get converted surface of a picture. Missing pictures are replaced by DEFAULT_PICTURE.
+        :param picture: file name of picture in media folder
+        :param alpha: keep transparency of picture
+        :param size: side in pixels of the square the picture is scaled to. Default to size
+        of picture file
+        :return: a pygame Surface instance
+        """
+        display = pygame.display.get_surface()
+        if display is not self.display:
+            # converted surfaces depend on display pixel format
+            self.surfaces.clear()
+            self.display = display
+
+        key = picture, alpha, size
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        if size is None:
+            surface = self.__load(picture, alpha)
+        else:
+            surface = self.get(picture, alpha)
+            if surface.get_size() != (size, size):
+                # smoothscale only handles 24 and 32 bits surfaces
+                scale = pygame.transform.smoothscale if surface.get_bitsize() in (24, 32) \
+                    else pygame.transform.scale
+                surface = scale(surface, (size, size))
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def __load(self, picture, alpha):
+        """
+        load and convert picture from disk
+        :return: a pygame Surface instance
+        """
+        self.loads += 1
+        try:
+            image = pygame.image.load(os.path.join(self.media_path, picture))
+        except (pygame.error, FileNotFoundError) as e:
+            if picture == def_settings.DEFAULT_PICTURE:
+                raise
+            LOGGER.warning("Picture %s can not be loaded (%s). %s will be used.",
+                           picture, e, def_settings.DEFAULT_PICTURE)
+            return self.__load(def_settings.DEFAULT_PICTURE, alpha)
+        return image.convert_alpha() if alpha else image.convert()
+
+    def clear(self):
+        """
+        forget every loaded picture
+        :return:
+        """
+        self.surfaces.clear()
+
+
+class TextCache:
+    """
+    Create fonts once and keep rendered texts in a LRU cache.
+    """
+
+    def __init__(self, max_size=None):
+        """
+
+        :param max_size: max number of rendered texts kept. Default to TEXT_CACHE_SIZE
+        """
+        self.max_size = max_size or def_settings.TEXT_CACHE_SIZE
+        self.fonts = {}
+        self.surfaces = collections.OrderedDict()
+        self.renders = 0
+
+    def __repr__(self):
+        return "TextCache ({} fonts, {} texts)".format(len(self.fonts), len(self.surfaces))
+
+    def font(self, size: int, name="monospace"):
+        """
+        get a system font, looked up only once.
+        :param size:
+        :param name:
+        :return: a pygame Font instance
+        """
+        key = name, size
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.SysFont(name, size)
+        return font
+
+    def render(self, text: str, size: int, color, name="monospace"):
+        """
+        get rendered surface of a text.
+        :param text:
+        :param size: font size
+        :param color: rgb tuple
+        :param name: font name
+        :return: a pygame Surface instance
+        """
+        key = name, size, text, tuple(color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.renders += 1
+        surface = self.surfaces[key] = self.font(size, name).render(text, 1, color)
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+class LoopScheduler:
+    """
+    Pace the main loop of graphical mode and measure achieved frame time.
+    Modes are:
+    - 'polling': wait a fixed delay then poll events (former behaviour),
+    - 'event': sleep until an event arrives,
+    - 'fps': use a pygame Clock to cap frames per second.
+    """
+
+    modes = ('polling', 'event', 'fps')
+
+    def __init__(self, mode=None, fps=None, polling_delay=None):
+        """
+
+        :param mode: one of modes. Default to LOOP_MODE
+        :param fps: max frames per second in 'fps' mode. Default to LOOP_FPS
+        :param polling_delay: delay in milliseconds in 'polling' mode. Default to POLLING_DELAY
+        """
+        self.mode = mode or def_settings.LOOP_MODE
+        if self.mode not in self.modes:
+            raise ValueError("Unknown loop mode %s. Available modes: %s" % (self.mode, self.modes))
+        self.fps = fps or def_settings.LOOP_FPS
+        self.polling_delay = polling_delay or def_settings.POLLING_DELAY
+        self.clock = pygame.time.Clock()
+        self.frame_time = 0.
+        self.average_frame_time = 0.
+        self.frames = 0
+        self.last_frame = None
+
+    def __repr__(self):
+        return "LoopScheduler '{}' ({:.1f} ms/frame)".format(
+            self.mode, self.average_frame_time * 1000)
+
+    def wait_events(self):
+        """
+        wait for next frame according to mode.
+        :return: list of pygame events
+        """
+        if self.mode == 'event':
+            events = [pygame.event.wait()] + pygame.event.get()
+        else:
+            if self.mode == 'fps':
+                self.clock.tick(self.fps)
+            else:
+                pygame.time.wait(self.polling_delay)
+            events = pygame.event.get()
+
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self.frame_time = now - self.last_frame
+            self.frames += 1
+            # exponential moving average of frame time
+            weight = max(1. / self.frames, 0.05)
+            self.average_frame_time += weight * (self.frame_time - self.average_frame_time)
+        self.last_frame = now
+        return events
+
+
+class ChunkCache:
+    """
+    Map pre-composited in square chunks of chunk_size tiles: background and elements of a
+    chunk are drawn once in a surface, built lazily when the chunk comes into view and kept
+    in a LRU cache. A chunk is built again only after being invalidated.
+    Background is tiled in map coordinates, so that it scrolls with the map.
+    """
+
+    def __init__(self, renderer, chunk_size=None, max_size=None):
+        """
+
+        :param renderer: a MapRenderer instance
+        :param chunk_size: number of tiles of a chunk side. Default to CHUNK_SIZE
+        :param max_size: max number of chunks kept. Default to CHUNK_CACHE_SIZE, and at least
+        the number of chunks a viewport can show.
+        """
+        self.renderer = renderer
+        self.chunk_size = chunk_size or def_settings.CHUNK_SIZE
+        visible = ((renderer.view_rows // self.chunk_size + 2) *
+                   (renderer.view_columns // self.chunk_size + 2))
+        self.max_size = max(max_size or def_settings.CHUNK_CACHE_SIZE, visible)
+        self.surfaces = collections.OrderedDict()
+        self.builds = 0
+
+    def __repr__(self):
+        return "ChunkCache ({} chunks of {} tiles)".format(len(self.surfaces), self.chunk_size)
+
+    def chunk_of(self, position):
+        """
+
+        :param position: row and column of a tile
+        :return: row and column of its chunk
+        """
+        return position[0] // self.chunk_size, position[1] // self.chunk_size
+
+    def chunk_rect(self, chunk):
+        """
+
+        :param chunk: row and column of a chunk
+        :return: a pygame Rect instance of chunk in window coordinates
+        """
+        grid = self.renderer.labyrinth.grid
+        first_row, first_column = chunk[0] * self.chunk_size, chunk[1] * self.chunk_size
+        rect = self.renderer.tile_rect((first_row, first_column))
+        rect.size = (min(self.chunk_size, grid.width - first_column) * self.renderer.tile_size,
+                     min(self.chunk_size, grid.height - first_row) * self.renderer.tile_size)
+        return rect
+
+    def visible_chunks(self):
+        """
+
+        :return: list of chunks overlapping viewport
+        """
+        rows, columns = self.renderer.visible_range()
+        if not (rows and columns):
+            return []
+        first_row, first_column = self.chunk_of((rows.start, columns.start))
+        last_row, last_column = self.chunk_of((rows.stop - 1, columns.stop - 1))
+        return [(row, column) for row in range(first_row, last_row + 1)
+                for column in range(first_column, last_column + 1)]
+
+    def get(self, chunk):
+        """
+        get surface of a chunk, building it if needed.
+        :param chunk: row and column of a chunk
+        :return: a pygame Surface instance
+        """
+        surface = self.surfaces.get(chunk)
+        if surface is not None:
+            self.surfaces.move_to_end(chunk)
+            return surface
+
+        surface = self.surfaces[chunk] = self.__build(chunk)
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def __build(self, chunk):
+        """
+        draw background and elements of a chunk
+        :return: a pygame Surface instance
+        """
+        self.builds += 1
+        grid = self.renderer.labyrinth.grid
+        assets, tile_size = self.renderer.assets, self.renderer.tile_size
+        first_row, first_column = chunk[0] * self.chunk_size, chunk[1] * self.chunk_size
+        rows = min(self.chunk_size, grid.height - first_row)
+        columns = min(self.chunk_size, grid.width - first_column)
+        surface = pygame.Surface((columns * tile_size, rows * tile_size)).convert()
+        surface.fill((0, 0, 0))
+
+        background = assets.get('background.jpg', alpha=False)
+        width, height = background.get_size()
+        blits = 0
+        for ordinate in range(-(first_row * tile_size % height), rows * tile_size, height):
+            for absciss in range(-(first_column * tile_size % width), columns * tile_size,
+                                 width):
+                surface.blit(background, (absciss, ordinate))
+                blits += 1
+
+        elements = grid.elements
+        for row in range(rows):
+            start = grid.index(first_row + row, first_column)
+            for column, type_id in enumerate(grid.cells[start:start + columns]):
+                if type_id < len(elements) and elements[type_id].picture is not None:
+                    surface.blit(assets.get(elements[type_id].picture, size=tile_size),
+                                 (column * tile_size, row * tile_size))
+                    blits += 1
+        self.renderer.blits += blits
+        return surface
+
+    def invalidate(self, *positions):
+        """
+        forget chunks of given tiles: they will be built again when drawn.
+        :return:
+        """
+        for position in positions:
+            self.surfaces.pop(self.chunk_of(position), None)
+
+    def clear(self):
+        """
+        forget every chunk
+        :return:
+        """
+        self.surfaces.clear()
+
+
+class MapRenderer:
+    """
+    Draw a labyrinth on a pygame surface through a viewport following the player: only
+    chunks of the visible range are blitted, whatever the size of the map (see ChunkCache).
+    In dirty mode, title and visible chunks are composited once in an offscreen static
+    layer and only tiles touched by the player are drawn again. The static layer is built
+    again when the viewport scrolls.
+    """
+
+    text_color = (255, 255, 0)
+
+    def __init__(self, labyrinth, assets: AssetManager, tile_size=None, top=None,
+                 window_size=None):
+        """
+
+        :param labyrinth: a GraphicalLabyrinth instance
+        :param assets: an AssetManager instance
+        :param tile_size: size in pixels of a map tile. Default to TILE_SIZE
+        :param top: ordinate in pixels of the map in window. Default to HEADER_HEIGHT
+        :param window_size: width and height of window in pixels. Default to WINDOW_SIZE
+        """
+        self.labyrinth = labyrinth
+        self.assets = assets
+        self.tile_size = tile_size or def_settings.TILE_SIZE
+        self.top = top if top is not None else def_settings.HEADER_HEIGHT
+        self.window_size = width, height = window_size or def_settings.WINDOW_SIZE
+        # number of visible rows and columns, a partially visible tile included
+        self.view_rows = max(-(-(height - self.top) // self.tile_size), 1)
+        self.view_columns = max(-(-width // self.tile_size), 1)
+        # map position of top left visible tile
+        self.origin = (0, 0)
+        self.chunks = ChunkCache(self)
+        self.text = TextCache()
+        self.static_layer = None
+        self.inventory_counts = None
+        # number of blits, and profiler of play_game when profiling is enabled
+        self.blits = 0
+        self.profiler = None
+        self.show_profile = False
+
+    def __repr__(self):
+        return "MapRenderer of {}".format(self.labyrinth.map)
+
+    # VIEWPORT METHODS
+    @staticmethod
+    def __follow(origin, position, visible, size):
+        """
+        scroll one axis of viewport: player is centered again when it comes near an edge.
+        :param origin: first visible index
+        :param position: player index
+        :param visible: number of visible indexes
+        :param size: number of indexes of map
+        :return: new origin
+        """
+        if size <= visible:
+            return 0
+        margin = visible // 4
+        if not origin + margin <= position <= origin + visible - 1 - margin:
+            origin = position - visible // 2
+        return max(0, min(origin, size - visible))
+
+    def update_viewport(self):
+        """
+        move viewport so that player stays visible.
+        :return: True if viewport scrolled
+        """
+        position = self.labyrinth.player['position']
+        if not position:
+            return False
+        grid = self.labyrinth.grid
+        origin = (self.__follow(self.origin[0], position[0], self.view_rows, grid.height),
+                  self.__follow(self.origin[1], position[1], self.view_columns, grid.width))
+        scrolled = origin != self.origin
+        self.origin = origin
+        return scrolled
+
+    def visible_range(self):
+        """
+
+        :return: ranges of visible rows and columns
+        """
+        grid = self.labyrinth.grid
+        first_row, first_column = self.origin
+        return (range(first_row, min(first_row + self.view_rows, grid.height)),
+                range(first_column, min(first_column + self.view_columns, grid.width)))
+
+    def is_visible(self, position):
+        """
+
+        :return: True if position is in viewport
+        """
+        rows, columns = self.visible_range()
+        return position[0] in rows and position[1] in columns
+
+    def tile_rect(self, position):
+        """
+
+        :param position: row and column of a tile
+        :return: a pygame Rect instance in window coordinates
+        """
+        row, column = position
+        return pygame.Rect((column - self.origin[1]) * self.tile_size,
+                           (row - self.origin[0]) * self.tile_size + self.top,
+                           self.tile_size, self.tile_size)
+
+    # DRAWING METHODS
+    def draw_title(self, surface):
+        """
+        Draw title of the game.
+        :return:
+        """
+        surface.blit(self.text.render("MACGYVER", 20, self.text_color), (0, 0))
+        self.blits += 1
+
+    def map_rect(self):
+        """
+
+        :return: a pygame Rect instance of the map area of window
+        """
+        width, height = self.window_size
+        return pygame.Rect(0, self.top, width, height - self.top)
+
+    def draw_map(self, surface):
+        """
+        Draw visible chunks of the map, clipped to map area.
+        :return:
+        """
+        area = self.map_rect()
+        for chunk in self.chunks.visible_chunks():
+            chunk_rect = self.chunks.chunk_rect(chunk)
+            rect = chunk_rect.clip(area)
+            if rect:
+                surface.blit(self.chunks.get(chunk), rect,
+                             rect.move(-chunk_rect.x, -chunk_rect.y))
+                self.blits += 1
+
+    def draw_player(self, surface):
+        """
+        draw player in graphical mod
+        :return:
+        """
+        player_sprite = self.assets.get(self.labyrinth.player['element'].picture,
+                                        size=self.tile_size)
+        surface.blit(player_sprite, self.tile_rect(self.labyrinth.player['position']))
+        self.blits += 1
+
+    @property
+    def inventory_size(self):
+        """
+
+        :return: side in pixels of inventory pictures: a third of header height
+        """
+        return max(self.top // 3, 1)
+
+    def inventory_rect(self):
+        """
+
+        :return: a pygame Rect instance covering inventory
+        """
+        size = self.inventory_size
+        return pygame.Rect(size, size, size * (len(self.labyrinth.player['inventory']) + 1),
+                           size)
+
+    def draw_inventory(self, surface):
+        """
+        Draw game inventory.
+        :param surface: a pygame Surface instance
+        :return:
+        """
+        size = self.inventory_size
+        column, row = 1, 1
+        for obj in self.labyrinth.player['inventory'].values():
+            absciss, ordinate = column * size, row * size
+            inv = self.assets.get(obj['picture'] or def_settings.DEFAULT_PICTURE, size=size)
+            # render text
+            label = self.text.render(str(obj['nb']), 20, self.text_color)
+            surface.blit(inv, (absciss, ordinate))
+            surface.blit(label, (absciss + size, ordinate))
+            self.blits += 2
+            column += 1
+
+    def profile_rect(self):
+        """
+
+        :return: a pygame Rect instance covering profiler overlay, in header right part
+        """
+        width = self.window_size[0]
+        return pygame.Rect(width - 200, 0, 200, self.top)
+
+    def draw_profile(self, surface):
+        """
+        Draw profiler summary lines that fit in header.
+        :param surface: a pygame Surface instance
+        :return:
+        """
+        # texts change every frame: they are not kept in text cache
+        font = self.text.font(10, "monospace")
+        area = self.profile_rect()
+        ordinate = area.y
+        for line in self.profiler.summary():
+            if ordinate + font.get_linesize() > area.bottom:
+                break
+            surface.blit(font.render(line, 1, self.text_color), (area.x, ordinate))
+            self.blits += 1
+            ordinate += font.get_linesize()
+
+    # DIRTY MODE METHODS
+    def build_static_layer(self, window):
+        """
+        Composite title and visible chunks in an offscreen surface.
+        :param window: a pygame Surface instance
+        :return:
+        """
+        self.static_layer = pygame.Surface(window.get_size()).convert()
+        self.static_layer.fill((0, 0, 0))
+        self.draw_title(self.static_layer)
+        self.draw_map(self.static_layer)
+        self.inventory_counts = None
+
+    def refresh_tile(self, position):
+        """
+        Copy a tile from its chunk to static layer, after an object has been picked up for
+        instance.
+        :param position: row and column of tile
+        :return:
+        """
+        chunk = self.chunks.chunk_of(position)
+        chunk_rect = self.chunks.chunk_rect(chunk)
+        rect = self.tile_rect(position)
+        self.static_layer.blit(self.chunks.get(chunk), rect,
+                               rect.move(-chunk_rect.x, -chunk_rect.y))
+        self.blits += 1
+
+    def invalidate(self, *positions):
+        """
+        mark tiles whose element changed: their chunks will be built again.
+        :return:
+        """
+        self.chunks.invalidate(*positions)
+
+    def render(self, window, dirty_positions=(), full=False):
+        """
+        Draw dirty tiles, player and inventory if it changed, then update only those
+        parts of display. The whole window is drawn again when viewport scrolls.
+        :param window: a pygame Surface instance
+        :param dirty_positions: positions of tiles to draw again
+        :param full: draw and update the whole window
+        :return: list of updated rects
+        """
+        if self.update_viewport() or self.static_layer is None:
+            self.build_static_layer(window)
+            full = True
+
+        if full:
+            window.blit(self.static_layer, (0, 0))
+            self.blits += 1
+            rects = [window.get_rect()]
+        else:
+            rects = []
+            for position in dirty_positions:
+                if not self.is_visible(position):
+                    continue
+                self.refresh_tile(position)
+                rect = self.tile_rect(position)
+                window.blit(self.static_layer, rect, rect)
+                self.blits += 1
+                rects.append(rect)
+
+        if full or dirty_positions:
+            self.draw_player(window)
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.lap('map')
+
+        counts = tuple(self.labyrinth.player['inventory'].counts)
+        if full or counts != self.inventory_counts:
+            self.inventory_counts = counts
+            area = self.inventory_rect()
+            window.blit(self.static_layer, area, area)
+            self.blits += 1
+            self.draw_inventory(window)
+            rects.append(area)
+        if profiler is not None:
+            if self.show_profile:
+                area = self.profile_rect()
+                window.blit(self.static_layer, area, area)
+                self.draw_profile(window)
+                rects.append(area)
+            profiler.lap('inventory')
+
+        if rects:
+            pygame.display.update(rects)
+        if profiler is not None:
+            profiler.lap('update')
+        return rects
+
+
+class GraphicalLabyrinth(gc.GenericLabyrinth):
+    """
+    Represent a GraphicalLabyrinth
+    """
+
+    keyboard_commands = {
+        K_UP: (-1, 0),
+        K_RIGHT: (0, 1),
+        K_DOWN: (1, 0),
+        K_LEFT: (0, -1)
+    }
+
+    # 'dirty': only tiles touched by player are drawn again, 'full': whole window every frame
+    render_mode = def_settings.RENDER_MODE
+    # 'event', 'fps' or 'polling': see LoopScheduler
+    loop_mode = def_settings.LOOP_MODE
+    # window and tiles size in pixels
+    window_size = def_settings.WINDOW_SIZE
+    tile_size = def_settings.TILE_SIZE
+    # AssetManager, MapRenderer and LoopScheduler instances, created by play_game
+    assets = None
+    renderer = None
+    scheduler = None
+    # draw profiler summary in header, see enable_profiling
+    profile_overlay = def_settings.PROFILE_OVERLAY
+
+    def move_player(self, key):
+        """
+        move player and invalidate the map chunk of a picked up object.
+        :param key: a key of keyboard_commands or of directions
+        :return: picked up Element instance or None
+        """
+        gift = super(GraphicalLabyrinth, self).move_player(key)
+        if gift is not None and self.renderer is not None:
+            self.renderer.invalidate(self.player['position'])
+        return gift
+
+    def play_game(self):
+        """
+        Execution of the game
+        :return:
+        """
+        continue_game = True
+        self.assets = AssetManager()
+        self.renderer = MapRenderer(self, self.assets, self.tile_size,
+                                    window_size=self.window_size)
+
+        # Initialize pygame module
+        pygame.init()
+        self.scheduler = LoopScheduler(self.loop_mode)
+        pygame.key.set_repeat(400, 30)
+
+        # Draw game's window
+        window = self.__draw_window()
+
+        # Get position of the player on the map.
+        LOGGER.info(
+            "\nGetting initial position of player %s\n", self.player['element'].element_name)
+        print("\nGetting initial position of player %s \n" % self.player['element'].element_name)
+        self.get_player_initial_position()
+        time_limit = getattr(self.success_conditions, 'time_limit', None)
+        if time_limit is not None:
+            pygame.time.set_timer(TIME_LIMIT_EVENT, int(time_limit * 1000) + 1, 1)
+        if def_settings.RECORDING_FOLDER_PATH:
+            self.start_recording()
+        if def_settings.PROFILE_FRAMES and self.profiler is None:
+            self.enable_profiling()
+        elif self.profiler is not None:
+            self.attach_profiler(self.renderer)
+        profiler = self.profiler
+
+        if self.render_mode == 'dirty':
+            self.renderer.render(window, full=True)
+
+        # main loop of the game
+        while continue_game:
+            if profiler is not None:
+                profiler.begin_frame()
+
+            # Try to save CPU time
+            events = self.scheduler.wait_events()
+            if profiler is not None:
+                profiler.lap('wait')
+
+            if self.render_mode == 'full':
+                self.__draw_full_frame(window)
+                if profiler is not None:
+                    profiler.lap('map')
+
+            # Events watcher
+            dirty_positions = set()
+            for event in events:
+                # if player clic on top right cross button.
+                if event.type == QUIT:
+                    continue_game = False
+                if event.type == KEYDOWN:
+                    # Change player position and check if game is finished.
+                    dirty_positions.add(self.player['position'])
+                    self.move_player(event.key)
+                    dirty_positions.add(self.player['position'])
+                    continue_game = not self.game_finished()
+                if event.type == TIME_LIMIT_EVENT:
+                    continue_game = not self.game_finished()
+            if profiler is not None:
+                profiler.lap('events')
+
+            if self.render_mode == 'dirty':
+                self.renderer.render(window, dirty_positions)
+            else:
+                # Draw player and inventory
+                self.renderer.draw_player(window)
+                self.renderer.draw_inventory(window)
+                if profiler is not None:
+                    if self.renderer.show_profile:
+                        self.renderer.draw_profile(window)
+                    profiler.lap('inventory')
+
+            # Check if conditions are satisfied
+            if not continue_game:
+                window = self.__draw_window()
+                if self.checked_conditions():
+                    message = "You win ;) !!!"
+
+                else:
+                    message = "You loose :( ..."
+                result = self.renderer.text.render(message, 50, (255, 255, 0))
+                window.blit(result, (50, 100))
+                pygame.display.update()
+                pygame.time.wait(2000)
+                LOGGER.info("Average frame time: %.1f ms",
+                            self.scheduler.average_frame_time * 1000)
+                if self.recorder is not None:
+                    self.save_recording()
+                if profiler is not None:
+                    LOGGER.info("Frame profile: %s", "; ".join(profiler.summary()))
+
+            if self.render_mode == 'full':
+                pygame.display.update()
+                if profiler is not None:
+                    profiler.lap('update')
+                window.fill((0, 0, 0))
+            if profiler is not None:
+                profiler.end_frame()
+
+    def enable_profiling(self, log_interval=None, overlay=None):
+        """
+        time phases of play_game loop and count image loads, chunk builds and blits of
+        renderer. Profiler is attached to renderer now if it exists, else by play_game.
+        :param log_interval: see GenericLabyrinth.enable_profiling
+        :param overlay: draw profiler summary in header. Default to PROFILE_OVERLAY
+        :return: a profiling.FrameProfiler instance
+        """
+        profiler = super(GraphicalLabyrinth, self).enable_profiling(log_interval)
+        self.profile_overlay = def_settings.PROFILE_OVERLAY if overlay is None else overlay
+        if self.renderer is not None:
+            self.attach_profiler(self.renderer)
+        return profiler
+
+    def attach_profiler(self, renderer):
+        """
+        make renderer time its phases with profiler and watch its totals
+        :param renderer: a MapRenderer instance
+        :return:
+        """
+        profiler = self.profiler
+        profiler.watch('image_loads', lambda: renderer.assets.loads)
+        profiler.watch('chunk_builds', lambda: renderer.chunks.builds)
+        profiler.watch('blits', lambda: renderer.blits)
+        renderer.profiler = profiler
+        renderer.show_profile = self.profile_overlay
+
+    # DRAWING METHODS
+    def __draw_window(self):
+        """
+        Draw main window of the game.
+        :return:
+        """
+        return pygame.display.set_mode(self.window_size)
+
+    def __draw_full_frame(self, window):
+        """
+        Draw title and visible chunks of the map.
+        :param window: a pygame Surface instance
+        :return:
+        """
+        self.renderer.update_viewport()
+        self.renderer.draw_title(window)
+        self.renderer.draw_map(window)
@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+"""
+
+Contains the compact grid used to store map elements: one byte per cell.
+
+"""
+import collections.abc
+import logging
+import os
+
+__author__ = 'tom.gabriele'
+LOGGER = logging.getLogger(__name__)
+
+# reserved type ids
+NEWLINE_ID = 254
+VOID_ID = 255
+MAX_ELEMENT_TYPES = NEWLINE_ID
+# number of bytes read between two progress reports of streamed map files
+PROGRESS_STEP = 1 << 20
+
+
+class MapFormatError(ValueError):
+    """Exception to raise when lines of a map file can not be stored in a grid"""
+
+
+class CompactGrid:
+    """
+    Row-major array of element type ids. Each row has `width` playable columns followed by
+    one extra column holding the carriage return of the map file (if any).
+    Cells of short lines are padded with VOID_ID.
+    """
+
+    def __init__(self, width: int, height: int, cells=None):
+        """
+
+        :param width: number of playable columns
+        :param height: number of rows
+        :param cells: already encoded cells, used without copy. Default to VOID_ID cells.
+        """
+        self.width = width
+        self.height = height
+        self.stride = width + 1
+        if cells is None:
+            cells = bytearray([VOID_ID]) * (self.stride * height)
+        elif len(cells) != self.stride * height:
+            raise ValueError("Expected {} cells, got {}".format(self.stride * height, len(cells)))
+        self.cells = cells
+        self.elements = []
+        self.walkable = bytearray(256)
+        self.pickable = bytearray(256)
+        self.exit = bytearray(256)
+        self.start = bytearray(256)
+        # metadata kept up to date by set method
+        self.max_column_index = max(width - 1, 0)
+        # incremented each time walkability of a cell changes
+        self.walkable_version = 0
+        self.start_positions = set()
+        self.exit_positions = frozenset()
+        self.pickable_positions = {}
+
+    def __repr__(self):
+        return "CompactGrid {}x{} ({} element types)".format(
+            self.width, self.height, len(self.elements))
+
+    @classmethod
+    def from_rows(cls, rows, element_factory):
+        """
+        build a grid from map lines. Width is given by first line, as for from_file.
+        :param rows: map lines, carriage returns included
+        :param element_factory: callable returning an Element instance from a map character.
+        It is called once per distinct character.
+        :return: a CompactGrid instance
+        """
+        cells, width, height, max_column_index, symbols = encode_lines(rows)
+        return cls.from_buffer(cells, width, height, symbols, element_factory, max_column_index)
+
+    @classmethod
+    def from_file(cls, map_path: str, element_factory, progress=None):
+        """
+        build a grid streaming a map file line by line: lines are encoded directly in cells,
+        the file content is never held in memory.
+        :param map_path: path of the .txt file
+        :param element_factory: callable returning an Element instance from a map character.
+        It is called once per distinct character.
+        :param progress: callable receiving read bytes and file size. Default to log_progress
+        :return: a CompactGrid instance
+        """
+        cells, width, height, max_column_index, symbols = encode_lines(
+            iter_lines(map_path, progress))
+        return cls.from_buffer(cells, width, height, symbols, element_factory, max_column_index)
+
+    @classmethod
+    def from_buffer(cls, cells, width: int, height: int, symbols, element_factory,
+                    max_column_index=None):
+        """
+        build a grid around already encoded cells (a memory mapped compiled map for
+        instance). Cells are used as is, without copy.
+        :param cells: a writable buffer of height * (width + 1) type ids with find method
+        (bytearray or mmap)
+        :param width: number of playable columns
+        :param height: number of rows
+        :param symbols: map characters of type ids, in type ids order
+        :param element_factory: callable returning an Element instance from a map character
+        :param max_column_index: max column index of map file. Default to width - 1.
+        :return: a CompactGrid instance
+        """
+        grid = cls(width, height, cells)
+        if max_column_index is not None:
+            grid.max_column_index = max_column_index
+        for char in symbols:
+            grid.register(element_factory(char))
+        grid.index_cells()
+        return grid
+
+    def index_cells(self):
+        """
+        compute metadata: start, exits and pickable objects positions.
+        :return:
+        """
+        self.start_positions = set()
+        exit_positions = set()
+        self.pickable_positions = {}
+        for type_id, element in enumerate(self.elements):
+            if not (self.start[type_id] or self.exit[type_id] or self.pickable[type_id]):
+                continue
+            positions = [self.coordinates(index) for index in self.find(type_id)]
+            if self.start[type_id]:
+                self.start_positions.update(positions)
+            if self.exit[type_id]:
+                exit_positions.update(positions)
+            if self.pickable[type_id]:
+                self.pickable_positions.update(dict.fromkeys(positions, element))
+        self.exit_positions = frozenset(exit_positions)
+
+    def find(self, type_id: int):
+        """
+        iterate over indexes of cells holding an element type
+        :param type_id:
+        :return:
+        """
+        needle = bytes([type_id])
+        index = self.cells.find(needle)
+        while index != -1:
+            yield index
+            index = self.cells.find(needle, index + 1)
+
+    def __index_cell(self, position, type_id):
+        """
+        add a cell to metadata
+        :return:
+        """
+        if self.start[type_id]:
+            self.start_positions.add(position)
+        if self.exit[type_id]:
+            self.exit_positions = self.exit_positions.union((position,))
+        if self.pickable[type_id]:
+            self.pickable_positions[position] = self.elements[type_id]
+
+    def __unindex_cell(self, position):
+        """
+        remove a cell from metadata
+        :return:
+        """
+        self.start_positions.discard(position)
+        if position in self.exit_positions:
+            self.exit_positions = self.exit_positions.difference((position,))
+        self.pickable_positions.pop(position, None)
+
+    def type_id(self, element):
+        """
+        get id of an element, registering it in elements table if needed.
+        :param element: an Element instance
+        :return: element type id
+        """
+        for type_id, known_element in enumerate(self.elements):
+            if known_element is element:
+                return type_id
+        return self.register(element)
+
+    def register(self, element):
+        """
+        add an element to elements table.
+        :param element: an Element instance
+        :return: new element type id
+        """
+        type_id = len(self.elements)
+        if type_id >= MAX_ELEMENT_TYPES:
+            raise ValueError("A map can not contain more than %s element types"
+                             % MAX_ELEMENT_TYPES)
+        self.elements.append(element)
+        self.walkable[type_id] = element.walkable
+        self.pickable[type_id] = element.can_be_picked_up
+        self.exit[type_id] = element.is_exit
+        self.start[type_id] = element.is_start
+        return type_id
+
+    # CELLS ACCESS METHODS
+    def index(self, row: int, column: int):
+        """
+
+        :return: index of cell in cells array
+        """
+        return row * self.stride + column
+
+    def coordinates(self, index: int):
+        """
+
+        :return: row and column of a cell index
+        """
+        return divmod(index, self.stride)
+
+    def contains(self, row: int, column: int):
+        """
+
+        :return: True if row and column are playable coordinates
+        """
+        return 0 <= row < self.height and 0 <= column < self.width
+
+    def get(self, row: int, column: int):
+        """
+        get element, carriage return or None of a cell
+        :return:
+        """
+        if not (0 <= row < self.height and 0 <= column < self.stride):
+            return None
+        type_id = self.cells[row * self.stride + column]
+        if type_id == VOID_ID:
+            return None
+        if type_id == NEWLINE_ID:
+            return '\n'
+        return self.elements[type_id]
+
+    def set(self, row: int, column: int, element):
+        """
+        place an element on a cell
+        :return:
+        """
+        type_id = self.type_id(element)
+        index = row * self.stride + column
+        if self.walkable[self.cells[index]] != self.walkable[type_id]:
+            self.walkable_version += 1
+        self.cells[index] = type_id
+        self.__unindex_cell((row, column))
+        self.__index_cell((row, column), type_id)
+
+    def is_walkable(self, row: int, column: int):
+        """
+
+        :return: True if cell is walkable
+        """
+        return bool(self.walkable[self.cells[row * self.stride + column]])
+
+    def is_pickable(self, row: int, column: int):
+        """
+
+        :return: True if cell contains an object that can be picked up
+        """
+        return bool(self.pickable[self.cells[row * self.stride + column]])
+
+    def is_exit(self, row: int, column: int):
+        """
+
+        :return: True if cell is an exit
+        """
+        return bool(self.exit[self.cells[row * self.stride + column]])
+
+
+class GridPositions(collections.abc.Mapping):
+    """
+    Dict-like view of a CompactGrid: (row, column) tuples as keys and Element instances
+    (or carriage returns) as values.
+    """
+
+    def __init__(self, grid: CompactGrid):
+        self.grid = grid
+
+    def __getitem__(self, key):
+        value = self.grid.get(*key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, element):
+        row, column = key
+        if not (0 <= row < self.grid.height and 0 <= column < self.grid.width):
+            raise KeyError(key)
+        self.grid.set(row, column, element)
+
+    def __iter__(self):
+        cells, stride = self.grid.cells, self.grid.stride
+        # a memoryview iterates over ints, for bytearray and mmap cells alike
+        for index, type_id in enumerate(memoryview(cells)):
+            if type_id != VOID_ID:
+                yield divmod(index, stride)
+
+    def __len__(self):
+        return len(self.grid.cells) - sum(1 for _ in self.grid.find(VOID_ID))
+
+    def __contains__(self, key):
+        try:
+            return self.grid.get(*key) is not None
+        except TypeError:
+            return False
+
+    def __repr__(self):
+        return "GridPositions({!r})".format(self.grid)
+
+
+# MAP FILES STREAMING
+def log_progress(map_path: str):
+    """
+    default progress report of streamed map files: a log line every 10%
+    :param map_path:
+    :return: a progress callable
+    """
+    logged = [-1]
+
+    def progress(read: int, total: int):
+        """
+        log percentage of read bytes when it reaches a new ten
+        :return:
+        """
+        percent = 100 * read // total if total else 100
+        if percent // 10 > logged[0]:
+            logged[0] = percent // 10
+            LOGGER.info("Loading %s: %s%%", map_path, percent)
+
+    return progress
+
+
+def iter_lines(map_path: str, progress=None):
+    """
+    iterate over lines of a map file, reporting progress every PROGRESS_STEP bytes.
+    :param map_path: path of the .txt file
+    :param progress: callable receiving read bytes and file size. Default to log_progress
+    :return: a generator of lines, carriage returns included
+    """
+    progress = progress or log_progress(map_path)
+    total = os.path.getsize(map_path)
+    read = next_report = 0
+    with open(map_path, 'rb') as file:
+        for line in file:
+            read += len(line)
+            if read >= next_report:
+                progress(read, total)
+                next_report = read + PROGRESS_STEP
+            yield line.decode('utf-8')
+    progress(read, total)
+
+
+def encode_lines(lines):
+    """
+    encode map lines to cells in one pass, without keeping lines.
+    Width is given by first line: longer lines are refused, shorter lines are padded with
+    VOID_ID. Type ids are numbered in map characters order, as CompactGrid.from_rows does.
+    Windows line endings are read as text files read them: '\r\n' is a carriage return.
+    :param lines: iterable of map lines, carriage returns included
+    :return: cells bytearray, width, height, max column index and map characters of type ids
+    """
+    translation = {ord('\n'): NEWLINE_ID}
+    symbols = []
+    cells = bytearray()
+    width = stride = None
+    height = max_length = 0
+    for line in lines:
+        if line.endswith('\r\n'):
+            line = line[:-2] + '\n'
+        for char in set(line).difference(symbols).difference('\n'):
+            if len(symbols) >= MAX_ELEMENT_TYPES:
+                raise MapFormatError("A map can not contain more than %s element types"
+                                     % MAX_ELEMENT_TYPES)
+            translation[ord(char)] = len(symbols)
+            symbols.append(char)
+        encoded = line.translate(translation).encode('latin-1')
+        length = len(line.rstrip('\n'))
+        if width is None:
+            width, stride = length, length + 1
+        elif length > width:
+            raise MapFormatError("Line {} has {} columns, first line has {}".format(
+                height + 1, length, width))
+        cells += encoded
+        cells += bytes([VOID_ID]) * (stride - len(encoded))
+        height += 1
+        max_length = max(max_length, len(line))
+
+    # renumber type ids in map characters order, in place and by slices to keep memory low
+    order = sorted(range(len(symbols)), key=symbols.__getitem__)
+    if order != list(range(len(symbols))):
+        table = bytearray(range(256))
+        for type_id, old_type_id in enumerate(order):
+            table[old_type_id] = type_id
+        for start in range(0, len(cells), PROGRESS_STEP):
+            cells[start:start + PROGRESS_STEP] = cells[start:start + PROGRESS_STEP].translate(table)
+    return cells, width or 0, height, max(max_length - 1, 0), [symbols[i] for i in order]
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+"""
+
+Contains the player inventory: one counter per object name, at a fixed index.
+
+"""
+import collections.abc
+import logging
+
+__author__ = 'tom.gabriele'
+LOGGER = logging.getLogger(__name__)
+
+# target of an object which must not be counted: never equal to a count
+NO_TARGET = -1
+
+
+class InventorySlot:
+    """
+    Dict-like view of an object of the inventory, as former inventory entries:
+    'picture' and 'nb' keys. 'nb' is read from and written to inventory counters.
+    """
+
+    __slots__ = ('inventory', 'index', 'picture')
+
+    def __init__(self, inventory, index: int, picture):
+        self.inventory = inventory
+        self.index = index
+        self.picture = picture
+
+    def __getitem__(self, key):
+        if key == 'nb':
+            return self.inventory.counts[self.index]
+        if key == 'picture':
+            return self.picture
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key != 'nb':
+            raise KeyError(key)
+        self.inventory.set_count(self.index, value)
+
+    def __eq__(self, other):
+        return {'picture': self.picture, 'nb': self['nb']} == other
+
+    def __repr__(self):
+        return repr({'picture': self.picture, 'nb': self['nb']})
+
+
+class Inventory(collections.abc.Mapping):
+    """
+    Counters of picked up objects at fixed indexes, with object names as keys.
+    When targets are set, number of counters which differ from their target is kept up to
+    date on each change, so that comparing inventory with targets is O(1).
+    """
+
+    def __init__(self, pictures):
+        """
+
+        :param pictures: dict of object names and pictures, in inventory order
+        """
+        self.names = list(pictures)
+        self.indexes = {name: index for index, name in enumerate(self.names)}
+        self.counts = [0] * len(self.names)
+        self.slots = {name: InventorySlot(self, index, pictures[name])
+                      for index, name in enumerate(self.names)}
+        self.targets = None
+        # counters different from their target, plus targets of unknown objects
+        self.mismatches = 0
+        self.unknown_targets = 0
+
+    def __getitem__(self, name):
+        return self.slots[name]
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return repr(self.slots)
+
+    def set_targets(self, targets):
+        """
+        set counts to reach. Inventory matches targets when it has exactly the same objects
+        and counts, as a dict comparison would tell.
+        :param targets: dict of object names and counts, None to forget targets
+        :return:
+        """
+        if targets is None:
+            self.targets = None
+            self.mismatches = self.unknown_targets = 0
+            return
+        self.targets = [targets.get(name, NO_TARGET) for name in self.names]
+        self.unknown_targets = len(set(targets).difference(self.indexes))
+        self.mismatches = self.unknown_targets + sum(
+            count != target for count, target in zip(self.counts, self.targets))
+
+    def set_count(self, index: int, count: int):
+        """
+        change a counter and update mismatches
+        :return:
+        """
+        if self.targets is not None:
+            target = self.targets[index]
+            self.mismatches += (count != target) - (self.counts[index] != target)
+        self.counts[index] = count
+
+    def add(self, name: str, count=1):
+        """
+        add picked up objects
+        :param name: object name
+        :param count:
+        :return: new count of object
+        """
+        index = self.indexes[name]
+        self.set_count(index, self.counts[index] + count)
+        return self.counts[index]
+
+    def clear(self):
+        """
+        set every counter to zero
+        :return:
+        """
+        for index in range(len(self.counts)):
+            self.set_count(index, 0)
+
+    def matches_targets(self):
+        """
+
+        :return: True if every counter equals its target
+        """
+        return self.targets is not None and self.mismatches == 0
+
+    def as_dict(self):
+        """
+
+        :return: dict of object names and counts
+        """
+        return dict(zip(self.names, self.counts))
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+"""
+
+Contains the map loader: resolves map files, parses them once and caches the result.
+
+"""
+import json
+import logging
+import os
+import types
+
+import game.binmap as binmap
+import game.catalog as catalog
+import game.default_settings as def_settings
+
+__author__ = 'tom.gabriele'
+LOGGER = logging.getLogger(__name__)
+
+
+class MapSpec:
+    """
+    Immutable compiled representation of a map: its files, its rows and its legend
+    (the content of the json description file).
+    Rows of big map files are not kept (rows is None): cells are streamed from map_path, or
+    memory mapped from binary_path for compiled maps, when a labyrinth is built.
+    """
+
+    __slots__ = ('name', 'map_path', 'dict_path', 'rows', '_legend', 'mtimes', 'binary_path',
+                 '__weakref__')
+
+    # pylint: disable=too-many-arguments
+
+    def __init__(self, name, map_path, dict_path, rows, legend, mtimes, binary_path=None):
+        """
+
+        :param name: map name
+        :param map_path: path of the .txt file
+        :param dict_path: path of the .json file
+        :param rows: tuple of map lines, carriage returns included, or None if map file is
+        streamed
+        :param legend: dict parsed from json file
+        :param mtimes: tuple of files modification times when they were parsed
+        :param binary_path: path of the compiled map the spec was read from, if any
+        """
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'map_path', map_path)
+        object.__setattr__(self, 'dict_path', dict_path)
+        object.__setattr__(self, 'rows', tuple(rows) if rows is not None else None)
+        object.__setattr__(self, '_legend', dict(legend))
+        object.__setattr__(self, 'mtimes', tuple(mtimes))
+        object.__setattr__(self, 'binary_path', binary_path)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("MapSpec is immutable")
+
+    def __reduce__(self):
+        return self.__class__, (self.name, self.map_path, self.dict_path, self.rows,
+                                self._legend, self.mtimes, self.binary_path)
+
+    def __repr__(self):
+        if self.rows is None:
+            return "MapSpec '{}' (streamed)".format(self.name)
+        return "MapSpec '{}' ({} rows)".format(self.name, len(self.rows))
+
+    @property
+    def files(self):
+        """
+
+        :return: paths of files the spec was read from
+        """
+        if self.binary_path is None:
+            return self.map_path, self.dict_path
+        return self.map_path, self.dict_path, self.binary_path
+
+    @property
+    def legend(self):
+        """
+
+        :return: read only view of the json description of the map
+        """
+        return types.MappingProxyType(self._legend)
+
+
+_CACHE = {}
+
+
+def find_map_files(map_name: str):
+    """
+    search map and map dict files in maps catalog
+    :param map_name: name of the map without extension
+    :return: map file path and map dict file path
+    """
+    entry = catalog.get_catalog().get(map_name)
+    return entry['map_path'], entry['dict_path']
+
+
+def _get_mtimes(paths):
+    """
+    get modification times of given files or None if one of them disappeared
+    :param paths:
+    :return:
+    """
+    try:
+        return tuple(os.stat(path).st_mtime_ns for path in paths)
+    except OSError:
+        return None
+
+
+def compile_map(map_name: str, map_path: str, dict_path: str):
+    """
+    parse map files and build a MapSpec. Lines of files bigger than STREAMING_MAP_SIZE
+    are not read.
+    :param map_name:
+    :param map_path:
+    :param dict_path:
+    :return: a MapSpec instance
+    """
+    mtimes = _get_mtimes((map_path, dict_path))
+    if os.path.getsize(map_path) > def_settings.STREAMING_MAP_SIZE:
+        rows = None
+    else:
+        with open(map_path, 'r') as file:
+            rows = file.readlines()
+    with open(dict_path) as file:
+        legend = json.load(file)
+    return MapSpec(map_name, map_path, dict_path, rows, legend, mtimes)
+
+
+def read_compiled_map(map_name: str, map_path: str, dict_path: str, binary_path: str):
+    """
+    build a MapSpec from the header of a compiled map. Cells are not read.
+    :param map_name:
+    :param map_path:
+    :param dict_path:
+    :param binary_path: path of the compiled map
+    :return: a MapSpec instance
+    """
+    mtimes = _get_mtimes((map_path, dict_path, binary_path))
+    header = binmap.read_header(binary_path)
+    return MapSpec(map_name, map_path, dict_path, None, header.legend, mtimes, binary_path)
+
+
+def is_compiled_map_fresh(map_path: str, dict_path: str, binary_path: str):
+    """
+
+    :return: True if compiled map exists and is newer than map files
+    """
+    mtimes = _get_mtimes((map_path, dict_path, binary_path))
+    return mtimes is not None and mtimes[2] >= max(mtimes[:2])
+
+
+def load_map_spec(map_name: str):
+    """
+    return the MapSpec of a map. A compiled binary map is preferred when it is newer than
+    map files. Specs are cached by map name and compiled again only if map files have been
+    modified since last parsing.
+    :param map_name:
+    :return: a MapSpec instance
+    """
+    spec = _CACHE.get(map_name)
+    if spec is not None and _get_mtimes(spec.files) == spec.mtimes and (
+            spec.binary_path is not None or not is_compiled_map_fresh(
+                spec.map_path, spec.dict_path, binmap.compiled_map_path(spec.map_path))):
+        return spec
+
+    map_path, dict_path = find_map_files(map_name)
+    binary_path = binmap.compiled_map_path(map_path)
+    if is_compiled_map_fresh(map_path, dict_path, binary_path):
+        try:
+            spec = read_compiled_map(map_name, map_path, dict_path, binary_path)
+        except ValueError as e:
+            LOGGER.warning("%s. Map files will be parsed.", e)
+            spec = compile_map(map_name, map_path, dict_path)
+    else:
+        spec = compile_map(map_name, map_path, dict_path)
+    _CACHE[map_name] = spec
+    return spec
+
+
+def clear_cache():
+    """
+    forget every compiled map
+    :return:
+    """
+    _CACHE.clear()
@@ -4,18 +4,37 @@
 """
 Module that execute the program
 """
+import game.catalog as catalog
 import game.core as gc
 
 
+def choose_map(default='example_map'):
+    """
+    Ask player which map of the catalog to play
+    :return: map name
+    """
+    map_names = catalog.get_catalog().names()
+    if len(map_names) < 2:
+        return default
+
+    map_question = "Choisis une carte (Entrée pour {}): \n{}\n".format(
+        default, "\n".join("{}:{}".format(i, name) for i, name in enumerate(map_names)))
+    choice = None
+    while choice not in [str(i) for i in range(len(map_names))] + ['']:
+        choice = input(map_question)
+    return map_names[int(choice)] if choice else default
+
+
 def main():
     """
     Function that execute the program
     :return:
     """
 
+    # class names: pygame is only imported if graphical mode is chosen
     CHOICES = [
-        ('Mode Graphique', gc.GraphicalLabyrinth),
-        ('Mode Console', gc.CommandLineLabyrinth),
+        ('Mode Graphique', 'GraphicalLabyrinth'),
+        ('Mode Console', 'CommandLineLabyrinth'),
     ]
 
     conditions = gc.Conditions(**{
@@ -32,8 +51,9 @@ def main():
     while choice not in [str(i) for i in range(len(CHOICES))]:
         choice = input(mod_question)
 
-    game_mod = CHOICES[int(choice)][1]
-    labyrinth = game_mod(map_name='example_map', success_conditions=conditions, player_name='tom')
+    game_mod = getattr(gc, CHOICES[int(choice)][1])
+    map_name = choose_map()
+    labyrinth = game_mod(map_name=map_name, success_conditions=conditions, player_name='tom')
     labyrinth.play_game()
 
 
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+"""
+
+Contains the placement engine: random objects placement on cells which keep the game winnable.
+
+"""
+import logging
+import weakref
+
+__author__ = 'tom.gabriele'
+LOGGER = logging.getLogger(__name__)
+
+
+# candidates of map specs: every labyrinth of a map shares them
+_CANDIDATES = weakref.WeakKeyDictionary()
+
+
+class UnsolvableMapException(Exception):
+    """Exception to raise when objects can not be placed so that the game can be won"""
+
+
+class PlacementEngine:
+    """
+    Choose cells of randomly placed objects.
+    Candidate cells are computed once per map: free walkable cells reachable from start
+    without walking on an exit, on a map where an exit is reachable from start. Every
+    candidate is then connected to start and exit, and k objects are placed by sampling k
+    candidate indexes without replacement.
+    """
+
+    def __init__(self, grid, start, map_spec=None):
+        """
+
+        :param grid: a CompactGrid instance, before objects placement
+        :param start: start position of player
+        :param map_spec: MapSpec instance grid was built from. Candidates are then computed
+        only for the first grid of the spec
+        """
+        self.grid = grid
+        self.start = start
+        candidates = _CANDIDATES.get(map_spec) if map_spec is not None else None
+        if candidates is None:
+            candidates = self.__get_candidates()
+            if map_spec is not None:
+                _CANDIDATES[map_spec] = candidates
+        self.candidates = candidates
+
+    def __repr__(self):
+        return "PlacementEngine of {!r} ({} candidates)".format(self.grid, len(self.candidates))
+
+    def __get_candidates(self):
+        """
+        flat indexes (row * width + column) of cells which can receive an object
+        :return: a read-only numpy array
+        """
+        # numpy is only needed here: importing the module does not slow down game start
+        import numpy
+        import game.distance as distance
+
+        grid = self.grid
+        engine = distance.get_engine(grid)
+        exits = grid.exit_positions
+        # stepping on an exit ends the game: cells only reachable through an exit are excluded
+        reachable = engine.field(self.start, blocked=exits) != distance.UNREACHABLE
+        if not any(self.__is_next_to(reachable, position) for position in exits):
+            raise UnsolvableMapException("No exit can be reached from start {}".format(self.start))
+
+        free_ids = [type_id for type_id, element in enumerate(grid.elements)
+                    if element.walkable and not (element.can_be_picked_up or element.is_start or
+                                                 element.is_exit)]
+        cells = numpy.frombuffer(grid.cells, dtype=numpy.uint8)
+        cells = cells.reshape(grid.height, grid.stride)[:, :grid.width]
+        candidates = numpy.flatnonzero(reachable & numpy.isin(cells, free_ids))
+        candidates.setflags(write=False)
+        LOGGER.debug("%s cells can receive objects", candidates.size)
+        return candidates
+
+    def __is_next_to(self, reachable, position):
+        """
+
+        :return: True if position is start or a neighbour of a reachable cell
+        """
+        if position == self.start:
+            return True
+        row, column = position
+        return any(self.grid.contains(*neighbour) and reachable[neighbour]
+                   for neighbour in ((row - 1, column), (row, column + 1),
+                                     (row + 1, column), (row, column - 1)))
+
+    def sample(self, count: int, rng):
+        """
+        choose distinct cells in O(count).
+        :param count: number of cells
+        :param rng: a random.Random instance
+        :return: list of positions
+        """
+        if count > len(self.candidates):
+            raise UnsolvableMapException("{} objects can not be placed on {} reachable "
+                                         "cells".format(count, len(self.candidates)))
+        width = self.grid.width
+        return [divmod(int(self.candidates[index]), width)
+                for index in rng.sample(range(len(self.candidates)), count)]
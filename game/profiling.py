@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+"""
+
+Contains the frame profiler: opt-in timers of the phases of main loops and counters.
+
+A main loop calls begin_frame, then lap(phase) at the end of each phase and end_frame.
+Labyrinths keep no profiler by default (profiler attribute is None): loops then only test
+it against None.
+
+"""
+import collections
+import logging
+import time
+
+import game.default_settings as def_settings
+
+__author__ = 'tom.gabriele'
+LOGGER = logging.getLogger(__name__)
+
+
+def percentile(values, rank: float):
+    """
+    nearest-rank percentile
+    :param values: sorted sequence of numbers
+    :param rank: between 0 and 100
+    :return: None if values is empty
+    """
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, -(-len(values) * rank // 100) - 1))
+    return values[int(index)]
+
+
+class FrameProfiler:
+    """
+    Rolling durations of phases of the last frames and counters per frame.
+    Counters are either counted by the loop (count) or read from a watched total
+    (watch): number of image loads of an AssetManager for instance.
+    Callbacks registered with add_callback receive the profiler after each frame.
+    """
+
+    def __init__(self, window=None):
+        """
+
+        :param window: number of frames kept. Default to PROFILE_WINDOW
+        """
+        self.window = window or def_settings.PROFILE_WINDOW
+        self.timings = collections.OrderedDict()
+        self.counters = collections.OrderedDict()
+        self.totals = collections.Counter()
+        self.watched = collections.OrderedDict()
+        self.callbacks = []
+        self.frames = 0
+        self.frame_counts = collections.Counter()
+        self.frame_start = self.last_lap = None
+
+    def __repr__(self):
+        return "FrameProfiler ({} frames, phases: {})".format(self.frames,
+                                                              ", ".join(self.timings))
+
+    # MEASURES
+    def begin_frame(self):
+        """
+        start timing a frame
+        :return:
+        """
+        self.frame_start = self.last_lap = time.perf_counter()
+
+    def lap(self, phase: str):
+        """
+        end a phase: its duration is the time since previous lap or frame start. Laps out
+        of frames are ignored.
+        :param phase: name of the phase
+        :return:
+        """
+        if self.frame_start is None:
+            return
+        now = time.perf_counter()
+        durations = self.timings.get(phase)
+        if durations is None:
+            durations = self.timings[phase] = collections.deque(maxlen=self.window)
+        durations.append(now - self.last_lap)
+        self.last_lap = now
+
+    def count(self, name: str, number=1):
+        """
+        add to a counter of current frame
+        :return:
+        """
+        self.frame_counts[name] += number
+
+    def watch(self, name: str, total):
+        """
+        count increase of a total at each frame
+        :param name: name of the counter
+        :param total: callable returning current total
+        :return:
+        """
+        self.watched[name] = [total, total()]
+
+    def end_frame(self):
+        """
+        record frame duration and counters, then call callbacks
+        :return:
+        """
+        if self.frame_start is None:
+            return
+        self.lap('other')
+        durations = self.timings.get('frame')
+        if durations is None:
+            durations = self.timings['frame'] = collections.deque(maxlen=self.window)
+        durations.append(self.last_lap - self.frame_start)
+        self.frame_start = self.last_lap = None
+
+        for name, watched in self.watched.items():
+            total = watched[0]()
+            self.frame_counts[name] += total - watched[1]
+            watched[1] = total
+        for name in self.frame_counts:
+            if name not in self.counters:
+                self.counters[name] = collections.deque(maxlen=self.window)
+        for name, values in self.counters.items():
+            values.append(self.frame_counts[name])
+        self.totals.update(self.frame_counts)
+        self.frame_counts.clear()
+        self.frames += 1
+
+        for callback in self.callbacks:
+            callback(self)
+
+    # REGISTRY
+    def add_callback(self, callback):
+        """
+        register a callable receiving the profiler after each frame
+        :return: callback, to be given to remove_callback
+        """
+        self.callbacks.append(callback)
+        return callback
+
+    def remove_callback(self, callback):
+        """
+        unregister a callback
+        :return:
+        """
+        self.callbacks.remove(callback)
+
+    # READING
+    def phase_stats(self, phase: str):
+        """
+
+        :return: dict of mean, p50, p95, p99 and max durations in seconds of last frames
+        """
+        durations = sorted(self.timings.get(phase, ()))
+        return {
+            'mean': sum(durations) / len(durations) if durations else None,
+            'p50': percentile(durations, 50),
+            'p95': percentile(durations, 95),
+            'p99': percentile(durations, 99),
+            'max': durations[-1] if durations else None,
+        }
+
+    def stats(self):
+        """
+
+        :return: dict of phases stats, counters per frame (mean of last frames) and totals
+        """
+        return {
+            'frames': self.frames,
+            'phases': {phase: self.phase_stats(phase) for phase in self.timings},
+            'counters': {name: {'per_frame': sum(values) / len(values),
+                                'total': self.totals[name]}
+                         for name, values in self.counters.items() if values},
+        }
+
+    def summary(self):
+        """
+
+        :return: one line per phase and counter
+        """
+        lines = []
+        for phase in self.timings:
+            stats = self.phase_stats(phase)
+            lines.append("{} p50 {:.2f} p95 {:.2f} ms".format(
+                phase, stats['p50'] * 1000, stats['p95'] * 1000))
+        for name, values in self.counters.items():
+            lines.append("{} {:.1f}/frame".format(name, sum(values) / len(values)))
+        return lines
+
+
+class LogDump:
+    """
+    Callback logging profiler summary every interval seconds.
+    """
+
+    def __init__(self, interval=None, level=logging.INFO):
+        """
+
+        :param interval: seconds between two dumps. Default to PROFILE_LOG_INTERVAL
+        :param level: logging level
+        """
+        self.interval = interval or def_settings.PROFILE_LOG_INTERVAL
+        self.level = level
+        self.next_dump = time.monotonic() + self.interval
+
+    def __call__(self, profiler: FrameProfiler):
+        now = time.monotonic()
+        if now < self.next_dump:
+            return
+        self.next_dump = now + self.interval
+        LOGGER.log(self.level, "Frame profile after %s frames: %s", profiler.frames,
+                   "; ".join(profiler.summary()))
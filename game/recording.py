@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+"""
+
+Contains game recordings and the replay tool.
+
+A recording is made of:
+- a fixed size header: magic, version, map checksum, placement seed, number of commands and
+  final state of the game (position, moves, picked up objects, finished and won flags),
+- the map name, utf-8 encoded,
+- success conditions of the game, json encoded,
+- commands: directions packed 2 bits per command, 4 commands per byte, first command in
+  low bits.
+
+"""
+import argparse
+import collections
+import functools
+import itertools
+import json
+import logging
+import struct
+import time
+
+import game.catalog as catalog
+
+__author__ = 'tom.gabriele'
+LOGGER = logging.getLogger(__name__)
+
+MAGIC = b'MGYREC'
+VERSION = 2
+HEADER = struct.Struct('<6sH20sQIiiIIBHI')
+
+# directions of commands, in order of their 2 bits code
+DIRECTIONS = ('up', 'right', 'down', 'left')
+VECTORS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+CODES = {vector: code for code, vector in enumerate(VECTORS)}
+# directions of the 4 commands packed in each byte value
+COMMANDS_OF_BYTE = tuple(tuple(DIRECTIONS[value >> shift & 3] for shift in (0, 2, 4, 6))
+                         for value in range(256))
+
+FINISHED = 1
+WON = 2
+
+Recording = collections.namedtuple(
+    'Recording', ('map_name', 'checksum', 'seed', 'conditions', 'count', 'commands',
+                  'position', 'moves', 'picked_up', 'finished', 'won'))
+# index of first field of final state
+STATE_INDEX = Recording._fields.index('position')
+
+
+class ReplayError(Exception):
+    """Exception to raise when a recording does not match its map or its final state"""
+
+
+@functools.lru_cache(maxsize=16)
+def map_checksum(map_spec):
+    """
+    checksum of map files given by maps catalog. It is computed again for maps out of
+    maps folders.
+    :param map_spec: a MapSpec instance
+    :return: 20 bytes sha1 digest
+    """
+    if map_spec.map_path is None:
+        raise ValueError("map %s has no files, its games can not be recorded" % map_spec.name)
+    maps_catalog = catalog.get_catalog()
+    entry = maps_catalog.maps.get(map_spec.name)
+    if entry is not None and entry['map_path'] == map_spec.map_path:
+        entry = maps_catalog.get(map_spec.name)
+    else:
+        entry = catalog.describe_map(map_spec.map_path, map_spec.dict_path)
+    return bytes.fromhex(entry['checksum'])
+
+
+class Recorder:
+    """
+    Record commands of a game, 2 bits per command.
+    """
+
+    def __init__(self, labyrinth):
+        """
+
+        :param labyrinth: a GenericLabyrinth instance, objects placed from its seed
+        """
+        self.labyrinth = labyrinth
+        self.commands = bytearray()
+        self.count = 0
+
+    def __repr__(self):
+        return "Recorder of {} ({} commands)".format(self.labyrinth.map, self.count)
+
+    def add(self, vector):
+        """
+        record a command
+        :param vector: move vector of the command
+        :return:
+        """
+        shift = (self.count & 3) * 2
+        if not shift:
+            self.commands.append(0)
+        self.commands[-1] |= CODES[vector] << shift
+        self.count += 1
+
+    def finish(self):
+        """
+
+        :return: a Recording instance with current state of the game as final state
+        """
+        labyrinth = self.labyrinth
+        finished = labyrinth.game_finished()
+        return Recording(labyrinth.map, map_checksum(labyrinth.map_spec), labyrinth.seed,
+                         labyrinth.success_conditions.as_dict(), self.count,
+                         bytes(self.commands), labyrinth.player['position'],
+                         labyrinth.moves, sum(labyrinth.player['inventory'].counts), finished,
+                         finished and labyrinth.checked_conditions())
+
+
+def dumps(recording: Recording):
+    """
+
+    :return: recording encoded as bytes
+    """
+    name = recording.map_name.encode('utf-8')
+    conditions = json.dumps(recording.conditions, sort_keys=True).encode('utf-8')
+    row, column = recording.position
+    flags = FINISHED * recording.finished | WON * recording.won
+    return HEADER.pack(MAGIC, VERSION, recording.checksum, recording.seed, recording.count,
+                       row, column, recording.moves, recording.picked_up, flags,
+                       len(name), len(conditions)) + name + conditions + recording.commands
+
+
+def loads(content: bytes):
+    """
+
+    :param content: recording encoded by dumps
+    :return: a Recording instance
+    """
+    if len(content) < HEADER.size or content[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a game recording")
+    magic, version, checksum, seed, count, row, column, moves, picked_up, flags, \
+        name_size, conditions_size = HEADER.unpack_from(content)
+    if version != VERSION:
+        raise ValueError("recording has version %s, version %s expected" % (version, VERSION))
+    name_end = HEADER.size + name_size
+    conditions_end = name_end + conditions_size
+    commands = content[conditions_end:]
+    if len(commands) != (count + 3) // 4:
+        raise ValueError("recording has %s bytes of commands, %s expected"
+                         % (len(commands), (count + 3) // 4))
+    return Recording(content[HEADER.size:name_end].decode('utf-8'), checksum, seed,
+                     json.loads(content[name_end:conditions_end].decode('utf-8')), count,
+                     commands, (row, column), moves, picked_up, bool(flags & FINISHED),
+                     bool(flags & WON))
+
+
+def write_recording(path: str, recording: Recording):
+    """
+    write a recording file
+    :return:
+    """
+    with open(path, 'wb') as file:
+        file.write(dumps(recording))
+
+
+def read_recording(path: str):
+    """
+    read a recording file
+    :return: a Recording instance
+    """
+    with open(path, 'rb') as file:
+        return loads(file.read())
+
+
+def iter_commands(recording: Recording):
+    """
+
+    :return: an iterator of recorded directions
+    """
+    return itertools.islice(
+        itertools.chain.from_iterable(map(COMMANDS_OF_BYTE.__getitem__, recording.commands)),
+        recording.count)
+
+
+def replay(labyrinth, recording: Recording, check=True):
+    """
+    reset labyrinth with seed of recording and feed recorded commands to move_player,
+    without any input, output or waiting.
+    :param labyrinth: a GenericLabyrinth instance of the recorded map, with the recorded
+    conditions
+    :param recording: a Recording instance
+    :param check: raise ReplayError if final state differs from recorded one
+    :return: a Recording instance with final state of the replay
+    """
+    checksum = map_checksum(labyrinth.map_spec)
+    if checksum != recording.checksum:
+        raise ReplayError("recording of map %s does not match map %s"
+                          % (recording.map_name, labyrinth.map))
+    if labyrinth.success_conditions.as_dict() != recording.conditions:
+        raise ReplayError("recording has conditions %s, labyrinth has %s"
+                          % (recording.conditions, labyrinth.success_conditions.as_dict()))
+    labyrinth.reset(recording.seed)
+    move_player = labyrinth.move_player
+    for direction in iter_commands(recording):
+        move_player(direction)
+
+    finished = labyrinth.game_finished()
+    result = recording._replace(position=labyrinth.player['position'], moves=labyrinth.moves,
+                                picked_up=sum(labyrinth.player['inventory'].counts),
+                                finished=finished,
+                                won=finished and labyrinth.checked_conditions())
+    if check and result != recording:
+        raise ReplayError("replay ended with {} instead of {}".format(
+            result[STATE_INDEX:], recording[STATE_INDEX:]))
+    return result
+
+
+def main(argv=None):
+    """
+    replay tool: replay recordings at full speed and check their final state
+    :return: number of replayed recordings
+    """
+    # core imports this module: labyrinths are only needed by the tool
+    import game.core as gc
+    import game.loader as loader
+
+    parser = argparse.ArgumentParser(prog='replay',
+                                     description="Replay recorded games and check them.")
+    parser.add_argument('recordings', nargs='+', help="recording files")
+    parser.add_argument('-r', '--repeat', type=int, default=1,
+                        help="number of replays of each recording")
+    args = parser.parse_args(argv)
+
+    recordings = [read_recording(path) for path in args.recordings]
+    labyrinths = {}
+    start = time.perf_counter()
+    for recording in recordings:
+        # a labyrinth per map and recorded conditions
+        key = recording.map_name, json.dumps(recording.conditions, sort_keys=True)
+        if key not in labyrinths:
+            map_spec = loader.load_map_spec(recording.map_name)
+            labyrinths[key] = gc.GenericLabyrinth(
+                map_spec.name, gc.Conditions(**recording.conditions), 'replay',
+                map_spec=map_spec)
+        for _ in range(args.repeat):
+            replay(labyrinths[key], recording)
+    duration = time.perf_counter() - start
+    replays = len(recordings) * args.repeat
+    print(json.dumps({'replays': replays,
+                      'replays_per_second': replays / duration if duration else None}))
+    return replays
+
+
+if __name__ == '__main__':
+    main()
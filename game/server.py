@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+"""
+Module that hosts console games over TCP: one coroutine per session in a single process
+
+Every session plays a CommandLineLabyrinth built from the same MapSpec, parsed once when
+the server is created. Labyrinths are built in a thread pool so that big maps do not stall
+other sessions. Sessions are closed after SERVER_IDLE_TIMEOUT seconds without input.
+"""
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import logging
+import time
+
+import game.console as console
+import game.core as gc
+import game.default_settings as def_settings
+import game.loader as loader
+import game.profiling as profiling
+import game.simulate as simulate
+
+__author__ = 'tom.gabriele'
+LOGGER = logging.getLogger(__name__)
+
+
+class SessionStream:
+    """
+    File-like output of a session: ConsoleRenderer writes are buffered in the transport and
+    sent when the session drains its writer.
+    """
+
+    def __init__(self, writer, encoding='utf-8'):
+        """
+
+        :param writer: an asyncio StreamWriter instance
+        :param encoding:
+        """
+        self.writer = writer
+        self.encoding = encoding
+
+    def write(self, text: str):
+        """
+        buffer text
+        :return:
+        """
+        self.writer.write(text.encode(self.encoding))
+
+    def flush(self):
+        """
+        nothing to do: data is sent by writer.drain
+        :return:
+        """
+
+    @staticmethod
+    def isatty():
+        """
+
+        :return: False, a remote client is not the terminal of the server
+        """
+        return False
+
+
+class ServerMetrics:
+    """
+    Count sessions and keep the latency of the last moves: time between reception of a
+    command and the moment the updated map is handed to the transport.
+    """
+
+    def __init__(self, window=10000):
+        """
+
+        :param window: number of move latencies kept
+        """
+        self.started_at = time.monotonic()
+        self.sessions_started = 0
+        self.sessions_finished = 0
+        self.timeouts = 0
+        self.moves = 0
+        self.latencies = collections.deque(maxlen=window)
+
+    def __repr__(self):
+        return "ServerMetrics ({} sessions)".format(self.sessions_started)
+
+    def add_move(self, latency: float):
+        """
+        record latency of a move in seconds
+        :return:
+        """
+        self.moves += 1
+        self.latencies.append(latency)
+
+    def as_dict(self):
+        """
+
+        :return: sessions counts, sessions finished per second since start and p99 latency
+        of last moves in milliseconds
+        """
+        elapsed = time.monotonic() - self.started_at
+        p99 = profiling.percentile(sorted(self.latencies), 99)
+        return {
+            'sessions_started': self.sessions_started,
+            'sessions_finished': self.sessions_finished,
+            'active_sessions': self.sessions_started - self.sessions_finished,
+            'timeouts': self.timeouts,
+            'moves': self.moves,
+            'sessions_per_second': self.sessions_finished / elapsed if elapsed else 0.,
+            'p99_move_latency_ms': p99 * 1000 if p99 is not None else None,
+        }
+
+
+class GameServer:
+    """
+    Asyncio TCP server running one CommandLineLabyrinth session per connection.
+    A client sends one command per line (Z, S, W or Q) and receives the map after each move.
+    """
+
+    # pylint: disable=too-many-arguments
+
+    def __init__(self, map_name: str, conditions=None, host=None, port=None,
+                 idle_timeout=None, seed=None, interactive=False):
+        """
+
+        :param map_name:
+        :param conditions: a Conditions instance shared by sessions. Default to
+        simulate.default_conditions
+        :param host: Default to SERVER_HOST
+        :param port: Default to SERVER_PORT, 0 for any free port
+        :param idle_timeout: seconds without input before a session is closed. Default to
+        SERVER_IDLE_TIMEOUT
+        :param seed: seed of objects placement of every session. Default to a random one per
+        session
+        :param interactive: patch changed rows with ANSI cursor moves instead of sending the
+        whole map after each move
+        """
+        self.map_spec = loader.load_map_spec(map_name)
+        self.conditions = conditions or simulate.default_conditions(self.map_spec)
+        self.host = host or def_settings.SERVER_HOST
+        self.port = port if port is not None else def_settings.SERVER_PORT
+        self.idle_timeout = idle_timeout or def_settings.SERVER_IDLE_TIMEOUT
+        self.seed = seed
+        self.interactive = interactive
+        self.metrics = ServerMetrics()
+        self.server = None
+        self.session_ids = itertools.count(1)
+
+    def __repr__(self):
+        return "GameServer of {} on {}:{}".format(self.map_spec.name, self.host, self.port)
+
+    @property
+    def address(self):
+        """
+
+        :return: host and port the server listens on
+        """
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def start(self):
+        """
+        start listening
+        :return: an asyncio Server instance
+        """
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        LOGGER.info("Serving %s on %s:%s", self.map_spec.name, *self.address)
+        return self.server
+
+    async def close(self):
+        """
+        stop listening and wait for the server to be closed
+        :return:
+        """
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def serve_forever(self, metrics_interval=None):
+        """
+        serve sessions and log metrics every metrics_interval seconds
+        :param metrics_interval: Default to SERVER_METRICS_INTERVAL
+        :return:
+        """
+        if self.server is None:
+            await self.start()
+        interval = metrics_interval or def_settings.SERVER_METRICS_INTERVAL
+
+        async def log_metrics():
+            """
+            periodic metrics dump
+            :return:
+            """
+            while True:
+                await asyncio.sleep(interval)
+                LOGGER.info("Server metrics: %s", json.dumps(self.metrics.as_dict()))
+
+        task = asyncio.ensure_future(log_metrics())
+        try:
+            await self.server.serve_forever()
+        finally:
+            task.cancel()
+
+    def create_labyrinth(self, session_id: int, writer):
+        """
+        build the labyrinth of a session from the shared MapSpec. Called in a thread of the
+        default executor of the event loop.
+        :return: a CommandLineLabyrinth instance drawing to writer
+        """
+        labyrinth = gc.CommandLineLabyrinth(self.map_spec.name, self.conditions,
+                                            'player{}'.format(session_id),
+                                            map_spec=self.map_spec, seed=self.seed)
+        labyrinth.renderer = console.ConsoleRenderer(labyrinth, SessionStream(writer),
+                                                     self.interactive)
+        labyrinth.get_player_initial_position()
+        return labyrinth
+
+    async def handle(self, reader, writer):
+        """
+        play a session: same loop as CommandLineLabyrinth.play_game with non-blocking
+        input and output.
+        :param reader: an asyncio StreamReader instance
+        :param writer: an asyncio StreamWriter instance
+        :return:
+        """
+        session_id = next(self.session_ids)
+        self.metrics.sessions_started += 1
+        LOGGER.debug("Session %s opened", session_id)
+        try:
+            await self.play(session_id, reader, writer)
+        except ConnectionError:
+            LOGGER.debug("Session %s disconnected", session_id)
+        finally:
+            self.metrics.sessions_finished += 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            LOGGER.debug("Session %s closed", session_id)
+
+    async def play(self, session_id: int, reader, writer):
+        """
+        game loop of a session
+        :return:
+        """
+        labyrinth = await asyncio.get_running_loop().run_in_executor(
+            None, self.create_labyrinth, session_id, writer)
+        stream = labyrinth.renderer.stream
+        labyrinth.renderer.draw()
+
+        while not labyrinth.game_finished():
+            stream.write(gc.PROMPT)
+            await writer.drain()
+            try:
+                line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+            except asyncio.TimeoutError:
+                self.metrics.timeouts += 1
+                stream.write("\nIdle timeout\n")
+                await writer.drain()
+                return
+            if not line:
+                return
+
+            received = time.perf_counter()
+            direction = line.decode('utf-8', 'replace').strip().upper()
+            if direction not in labyrinth.keyboard_commands:
+                continue
+            previous_position = labyrinth.player['position']
+            if labyrinth.move_player(direction) is not None:
+                labyrinth.renderer.set_status(str(labyrinth.player['inventory']))
+            labyrinth.renderer.invalidate(previous_position, labyrinth.player['position'])
+            labyrinth.renderer.draw()
+            self.metrics.add_move(time.perf_counter() - received)
+
+        failed = labyrinth.check_plan.failed_condition()
+        if failed is None:
+            stream.write("You win !\n")
+        else:
+            stream.write(gc.CONSTRAINT_MESSAGE.format(failed) + "\nYou loose...\n")
+        await writer.drain()
+
+
+def main(argv=None):
+    """
+    Function that runs the game server from command line
+    :return:
+    """
+    parser = argparse.ArgumentParser(description="Host console games over TCP.")
+    parser.add_argument('map_name', nargs='?', default='example_map')
+    parser.add_argument('--host', default=def_settings.SERVER_HOST)
+    parser.add_argument('-p', '--port', type=int, default=def_settings.SERVER_PORT)
+    parser.add_argument('--idle-timeout', type=float, default=def_settings.SERVER_IDLE_TIMEOUT)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--ansi', action='store_true',
+                        help="send only changed rows with ANSI cursor moves")
+    args = parser.parse_args(argv)
+
+    server = GameServer(args.map_name, host=args.host, port=args.port,
+                        idle_timeout=args.idle_timeout, seed=args.seed, interactive=args.ansi)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(server.metrics.as_dict()))
+    return server
+
+
+if __name__ == '__main__':
+    main()
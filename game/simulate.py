@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+"""
+Module that runs batches of headless games to compute map statistics
+"""
+import argparse
+import collections
+import concurrent.futures
+import itertools
+import json
+import logging
+import os
+import random
+
+import game.core as gc
+import game.default_settings as def_settings
+import game.distance as distance
+import game.loader as loader
+import game.solver as solver
+
+__author__ = 'tom.gabriele'
+LOGGER = logging.getLogger(__name__)
+
+DIRECTIONS = ('up', 'right', 'down', 'left')
+
+
+# POLICIES
+def random_walk(labyrinth, rng, memory):
+    """
+    choose a random direction
+    :param labyrinth: a GenericLabyrinth instance
+    :param rng: a random.Random instance
+    :param memory: dict kept between steps of a game
+    :return: a direction
+    """
+    return rng.choice(DIRECTIONS)
+
+
+def greedy(labyrinth, rng, memory):
+    """
+    walk to the nearest missing object (or to the nearest exit when every object is picked up),
+    preferring cells visited the less.
+    :param labyrinth: a GenericLabyrinth instance
+    :param rng: a random.Random instance
+    :param memory: dict kept between steps of a game
+    :return: a direction
+    """
+    visits = memory.setdefault('visits', collections.Counter())
+    row, column = labyrinth.player['position']
+    visits[row, column] += 1
+
+    targets = missing_objects_positions(labyrinth) or labyrinth.exit_positions
+
+    def score(direction):
+        """
+        sort key of a direction: visits of next cell then distance to nearest target
+        :return:
+        """
+        vector = labyrinth.directions[direction]
+        position = row + vector[0], column + vector[1]
+        manhattan = min(abs(position[0] - target[0]) + abs(position[1] - target[1])
+                        for target in targets)
+        return visits[position], manhattan, rng.random()
+
+    candidates = [direction for direction in DIRECTIONS
+                  if labyrinth.is_position_on_map(next_position(labyrinth, direction)) and
+                  labyrinth.is_position_walkable(next_position(labyrinth, direction))]
+    return min(candidates or DIRECTIONS, key=score)
+
+
+def optimal(labyrinth, rng, memory):
+    """
+    follow the shortest winning route, walk randomly if there is none
+    :param labyrinth: a GenericLabyrinth instance
+    :param rng: a random.Random instance
+    :param memory: dict kept between steps of a game
+    :return: a direction
+    """
+    if 'route' not in memory:
+        memory['route'] = collections.deque(solver.route_commands(labyrinth) or [])
+    if memory['route']:
+        return memory['route'].popleft()
+    return rng.choice(DIRECTIONS)
+
+
+POLICIES = {
+    'random': random_walk,
+    'greedy': greedy,
+    'optimal': optimal,
+}
+
+
+def next_position(labyrinth, direction):
+    """
+
+    :return: position reached by a move in direction, walls ignored
+    """
+    row, column = labyrinth.player['position']
+    vector = labyrinth.directions[direction]
+    return row + vector[0], column + vector[1]
+
+
+def missing_objects_positions(labyrinth):
+    """
+
+    :return: positions of objects still needed to satisfy to_pick_up_objects condition
+    """
+    required = getattr(labyrinth.success_conditions, 'to_pick_up_objects', {})
+    inventory = labyrinth.player['inventory']
+    return [position for position, element in labyrinth.pickable_elements_position.items()
+            if inventory[element.element_name]['nb'] < required.get(element.element_name, 0)]
+
+
+def reachable_objects(labyrinth):
+    """
+    count objects which can be reached from player position
+    :param labyrinth: a GenericLabyrinth instance
+    :return: number of reachable objects
+    """
+    field = distance.get_engine(labyrinth.grid).field(labyrinth.player['position'])
+    return sum(1 for position in labyrinth.grid.pickable_positions
+               if field[position] != distance.UNREACHABLE)
+
+
+def default_conditions(map_spec):
+    """
+    conditions of a standard game: pick up one of each randomly placed object
+    :param map_spec: a MapSpec instance
+    :return: a Conditions instance
+    """
+    objects = {value['name']: 1 for value in map_spec.legend.values()
+               if def_settings.ELEMENTS_TYPE.get(value['type'], {}).get('randomly_placed')}
+    return gc.Conditions(to_pick_up_objects=objects)
+
+
+# GAMES EXECUTION
+_WORKER = {}
+
+
+def init_worker(map_spec, conditions, policy_name, max_steps):
+    """
+    build the labyrinth of a worker once. Map is sent already compiled.
+    :return:
+    """
+    _WORKER['labyrinth'] = gc.GenericLabyrinth(map_spec.name, conditions, 'simulation',
+                                               map_spec=map_spec)
+    _WORKER['policy'] = POLICIES[policy_name]
+    _WORKER['max_steps'] = max_steps
+
+
+def play_game(seed: int):
+    """
+    play a game with worker labyrinth
+    :param seed: seed of objects placement and policy
+    :return: dict of game result
+    """
+    labyrinth, policy = _WORKER['labyrinth'], _WORKER['policy']
+    labyrinth.reset(seed)
+    rng = random.Random(seed)
+    memory = {}
+    reachable = reachable_objects(labyrinth)
+    placed = len(labyrinth.grid.pickable_positions)
+    finished = won = False
+    while not finished and labyrinth.moves < _WORKER['max_steps']:
+        _, _, finished, won = labyrinth.step(policy(labyrinth, rng, memory))
+    return {
+        'seed': seed,
+        'finished': finished,
+        'won': won,
+        'steps': labyrinth.moves,
+        'picked_up': sum(labyrinth.player['inventory'].counts),
+        'placed': placed,
+        'reachable': reachable,
+    }
+
+
+def play_games(seeds):
+    """
+    play one game per seed with worker labyrinth
+    :param seeds: list of seeds
+    :return: list of games results
+    """
+    return [play_game(seed) for seed in seeds]
+
+
+def run_batch(map_name, games, policy='greedy', workers=None, max_steps=10000, seed=0,
+              chunk_size=1, conditions=None):
+    """
+    play games on a map in a process pool and yield results as they complete. Games played
+    in current process are yielded one by one.
+    :param map_name:
+    :param games: number of games
+    :param policy: a key of POLICIES
+    :param workers: number of processes. 0 plays games in current process.
+    Default to number of processors.
+    :param max_steps: max number of moves of a game
+    :param seed: seed of first game, next games use following seeds
+    :param chunk_size: number of games sent at once to a worker. Results of a chunk are
+    yielded when its last game ends: a bigger chunk lowers inter-process overhead of very
+    short games but delays results
+    :param conditions: a Conditions instance. Default to default_conditions.
+    :return: a generator of games results
+    """
+    if policy not in POLICIES:
+        raise ValueError("Unknown policy %s. Available policies: %s" % (policy, sorted(POLICIES)))
+    map_spec = loader.load_map_spec(map_name)
+    conditions = conditions or default_conditions(map_spec)
+    initargs = (map_spec, conditions, policy, max_steps)
+
+    if workers == 0:
+        init_worker(*initargs)
+        for game_seed in range(seed, seed + games):
+            yield play_game(game_seed)
+        return
+
+    chunks = (list(range(start, min(start + chunk_size, seed + games)))
+              for start in range(seed, seed + games, chunk_size))
+    # chunks are submitted as others complete: a few per worker are pending at once
+    max_pending = 4 * (workers or os.cpu_count() or 1)
+    pending = set()
+    with concurrent.futures.ProcessPoolExecutor(workers, initializer=init_worker,
+                                                initargs=initargs) as executor:
+        while True:
+            for chunk in itertools.islice(chunks, max_pending - len(pending)):
+                pending.add(executor.submit(play_games, chunk))
+            if not pending:
+                return
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+class SimulationSummary:
+    """
+    Aggregate games results: win rate, steps to exit and objects reachability.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.finished = 0
+        self.steps_to_exit = 0
+        self.placed = 0
+        self.reachable = 0
+
+    def __repr__(self):
+        return "SimulationSummary ({} games)".format(self.games)
+
+    def add(self, result: dict):
+        """
+        add a game result
+        :return:
+        """
+        self.games += 1
+        self.wins += result['won']
+        self.placed += result['placed']
+        self.reachable += result['reachable']
+        if result['finished']:
+            self.finished += 1
+            self.steps_to_exit += result['steps']
+
+    def as_dict(self):
+        """
+
+        :return: statistics as a dict
+        """
+        return {
+            'games': self.games,
+            'win_rate': self.wins / self.games if self.games else 0.,
+            'finish_rate': self.finished / self.games if self.games else 0.,
+            'mean_steps_to_exit': self.steps_to_exit / self.finished if self.finished else None,
+            'reachability': self.reachable / self.placed if self.placed else 1.,
+        }
+
+
+def main(argv=None):
+    """
+    Function that runs simulations from command line
+    :return:
+    """
+    parser = argparse.ArgumentParser(description="Play headless games to evaluate a map.")
+    parser.add_argument('map_name')
+    parser.add_argument('-n', '--games', type=int, default=1000)
+    parser.add_argument('-p', '--policy', choices=sorted(POLICIES), default='greedy')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="number of processes, 0 to play in current process")
+    parser.add_argument('--max-steps', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=1,
+                        help="number of games sent at once to a worker")
+    parser.add_argument('--results', action='store_true',
+                        help="print each game result as a json line")
+    args = parser.parse_args(argv)
+
+    summary = SimulationSummary()
+    for result in run_batch(args.map_name, args.games, args.policy, args.workers,
+                            args.max_steps, args.seed, args.chunk_size):
+        summary.add(result)
+        if args.results:
+            print(json.dumps(result))
+    print(json.dumps(summary.as_dict()))
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+"""
+
+Contains the route solver: shortest route collecting every required object, then reaching
+an exit.
+
+"""
+import collections
+import functools
+import logging
+
+import game.distance as distance
+
+__author__ = 'tom.gabriele'
+LOGGER = logging.getLogger(__name__)
+
+
+def get_needed_objects(labyrinth):
+    """
+    count objects still needed to satisfy to_pick_up_objects condition.
+    :param labyrinth: a GenericLabyrinth instance
+    :return: dict of object names and counts, None if condition can not be satisfied anymore
+    """
+    required = getattr(labyrinth.success_conditions, 'to_pick_up_objects', {})
+    inventory = labyrinth.player['inventory']
+    needed = {}
+    for name in set(required).union(inventory):
+        count = required.get(name, 0) - (inventory[name]['nb'] if name in inventory else 0)
+        if count < 0:
+            return None
+        needed[name] = count
+    return needed
+
+
+def find_route(labyrinth):
+    """
+    shortest route from player position (or start position if player is not placed) through
+    every needed object to the nearest exit. Exits and objects which are not picked up yet
+    are avoided on the way, but the target of each leg: a leg never walks over an object the
+    route did not choose.
+    Lengths of legs are read from distance fields of each point of interest and set of
+    picked up objects, then the order of objects is chosen with a memoized dynamic
+    programming over subsets of objects.
+    :param labyrinth: a GenericLabyrinth instance
+    :return: list of positions, start and exit included. None if game can not be won.
+    """
+    needed = get_needed_objects(labyrinth)
+    if needed is None:
+        return None
+    start = labyrinth.player['position'] or labyrinth.start_position
+    exits = sorted(labyrinth.exit_positions)
+    engine = distance.get_engine(labyrinth.grid)
+
+    objects = sorted((position, element.element_name) for position, element in
+                     labyrinth.pickable_elements_position.items()
+                     if needed.get(element.element_name))
+    avoided = frozenset(labyrinth.pickable_elements_position).union(exits)
+    names = sorted(needed)
+    name_index = {name: index for index, name in enumerate(names)}
+    target = tuple(needed[name] for name in names)
+    points = [start] + [position for position, _ in objects]
+
+    def blocked_cells(mask):
+        """
+        exits and objects which are not picked up yet
+        :param mask: bits of collected objects
+        :return: frozenset of positions
+        """
+        return avoided.difference(position for bit, (position, _) in enumerate(objects)
+                                  if mask >> bit & 1)
+
+    @functools.lru_cache(maxsize=None)
+    def legs(point, mask):
+        """
+        lengths of legs from a point with already collected objects
+        :param point: index of current point in points
+        :param mask: bits of collected objects
+        :return: tuple of lengths to points, then length and position of nearest exit
+        """
+        field = engine.field(points[point], blocked_cells(mask))
+        exit_length, exit_position = min(
+            ((length, position) for position in exits
+             for length in (leg_length(field, position),) if length != distance.UNREACHABLE),
+            default=(distance.UNREACHABLE, None))
+        return tuple(leg_length(field, position) for position in points) + (
+            exit_length, exit_position)
+
+    def counts(mask):
+        """
+        count collected objects per name
+        :return: tuple of counts ordered as names
+        """
+        collected = [0] * len(names)
+        for bit, (_, name) in enumerate(objects):
+            if mask >> bit & 1:
+                collected[name_index[name]] += 1
+        return tuple(collected)
+
+    @functools.lru_cache(maxsize=None)
+    def best(point, mask):
+        """
+        shortest remaining route from a point with already collected objects.
+        :param point: index of current point in points
+        :param mask: bits of collected objects
+        :return: length and next point index (None to go to exit)
+        """
+        collected = counts(mask)
+        if collected == target:
+            length = legs(point, mask)[-2]
+            return (length, None) if length != distance.UNREACHABLE else (float('inf'), None)
+
+        result = float('inf'), None
+        for bit, (_, name) in enumerate(objects):
+            if mask >> bit & 1 or collected[name_index[name]] >= needed[name]:
+                continue
+            step = legs(point, mask)[bit + 1]
+            if step == distance.UNREACHABLE:
+                continue
+            length = step + best(bit + 1, mask | 1 << bit)[0]
+            if length < result[0]:
+                result = length, bit + 1
+        return result
+
+    length, next_point = best(0, 0)
+    if length == float('inf'):
+        LOGGER.info("No route found on map %s", labyrinth.map)
+        return None
+
+    route = [start]
+    point, mask = 0, 0
+    while next_point is not None:
+        route.extend(engine.path(points[point], points[next_point],
+                                 blocked_cells(mask).difference([points[next_point]]))[1:])
+        point, mask = next_point, mask | 1 << (next_point - 1)
+        next_point = best(point, mask)[1]
+    exit_position = legs(point, mask)[-1]
+    route.extend(engine.path(points[point], exit_position,
+                             blocked_cells(mask).difference([exit_position]))[1:])
+
+    if not check_route(labyrinth, route, needed):
+        LOGGER.info("Shortest route of map %s picks up objects which are not needed", labyrinth.map)
+        return None
+    return route
+
+
+def leg_length(field, position):
+    """
+    length of a leg ending on a position which is blocked in field (an object or an exit):
+    one move more than its nearest reached neighbour.
+    :param field: distance field from the start of the leg
+    :param position:
+    :return: number of moves, UNREACHABLE if position can not be reached
+    """
+    if field[position] != distance.UNREACHABLE:
+        return int(field[position])
+    height, width = field.shape
+    row, column = position
+    lengths = [field[neighbour] for neighbour in ((row - 1, column), (row, column + 1),
+                                                  (row + 1, column), (row, column - 1))
+               if 0 <= neighbour[0] < height and 0 <= neighbour[1] < width and
+               field[neighbour] != distance.UNREACHABLE]
+    return int(min(lengths)) + 1 if lengths else distance.UNREACHABLE
+
+
+def check_route(labyrinth, route, needed):
+    """
+    check that walking a route picks up exactly needed objects
+    :return: True if route wins the game
+    """
+    pickables = labyrinth.pickable_elements_position
+    picked = collections.Counter(pickables[position].element_name
+                                 for position in set(route) if position in pickables)
+    return all(picked[name] == count for name, count in needed.items())
+
+
+def route_commands(labyrinth, route=None):
+    """
+    translate a route to keys of labyrinth keyboard_commands (or of directions if labyrinth
+    has no keyboard commands).
+    :param labyrinth: a GenericLabyrinth instance
+    :param route: list of positions. Default to route found by find_route.
+    :return: list of keys, None if game can not be won.
+    """
+    if route is None:
+        route = find_route(labyrinth)
+        if route is None:
+            return None
+    commands = labyrinth.keyboard_commands or labyrinth.directions
+    keys = {vector: key for key, vector in commands.items()}
+    return [keys[(next_row - row, next_column - column)]
+            for (row, column), (next_row, next_column) in zip(route, route[1:])]
@@ -0,0 +1,16 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Tests of the game. Caches (maps catalog, benchmark baseline) are written in a temporary
+folder, not in the cache folder of the user: it is set before any game module is imported.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+CACHE_FOLDER_PATH = tempfile.mkdtemp(prefix='macgyver-tests-')
+atexit.register(shutil.rmtree, CACHE_FOLDER_PATH, True)
+os.environ['MACGYVER_CACHE'] = CACHE_FOLDER_PATH
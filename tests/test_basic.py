@@ -120,8 +120,11 @@ class TestElement(unittest.TestCase):
         """
         for element_type in gc.Element.get_elements_types_list():
             element = gc.Element.create_from_default_settings(element_type)
-            for attr in element.__dict__.keys():
+            for attr in gc.Element.__slots__:
                 self.assertEqual(getattr(element, attr), ds.ELEMENTS_TYPE[element_type][attr])
+            self.assertIs(gc.Element.create_from_default_settings(element_type), element)
+            with self.assertRaises(AttributeError):
+                element.symbol = "?"
 
 
 class TestLabyrinth(unittest.TestCase):
@@ -234,3 +237,21 @@ class TestLabyrinth(unittest.TestCase):
             gc.CommandLineLabyrinth(self.labyrinth_unavailable_map['map'],
                                   self.labyrinth_unavailable_map['conditions'],
                                   self.labyrinth_unavailable_map['player_name'])
+
+    def test_pick_up_object(self):
+        """
+        picking up an object updates inventory and map metadata.
+        :return:
+        """
+        lab = gc.CommandLineLabyrinth(self.labyrinth['map'], self.labyrinth['conditions'],
+                                      self.labyrinth['player_name'])
+        position, gift = sorted(lab.pickable_elements_position.items())[0]
+        lab.player['position'] = (position[0], position[1] - 1)
+        lab.grid.set(position[0], position[1] - 1, gc.Element.create_from_default_settings(
+            'ground'))
+        lab.move_player('S')
+        self.assertEqual(lab.player['position'], position)
+        self.assertEqual(lab.player['inventory'][gift.element_name]['nb'], 1)
+        self.assertNotIn(position, lab.pickable_elements_position)
+        self.assertEqual(lab.start_position, (0, 1))
+        self.assertEqual(lab.exit_positions, frozenset([(14, 2)]))
@@ -0,0 +1,67 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test benchmark suite
+"""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import game.benchmark as benchmark
+import game.solver as solver
+
+
+class TestBenchmark(unittest.TestCase):
+    """
+    tests for game.benchmark module.
+    """
+
+    def test_synthetic_map(self):
+        """
+        synthetic maps can be won.
+        :return:
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            for size in (5, 10, 11, 12, 13):
+                map_spec = benchmark.write_synthetic_map(folder, size)
+                self.assertEqual(len(map_spec.rows), size)
+                labyrinth = benchmark.create_labyrinth(map_spec)
+                self.assertIsNotNone(solver.find_route(labyrinth))
+
+    def test_run(self):
+        """
+        every asked benchmark gives a duration per size.
+        :return:
+        """
+        results = benchmark.run([10], ['checked_conditions', 'move_player'], repeat=1)
+        self.assertEqual(sorted(results['sizes']['10']), ['checked_conditions', 'move_player'])
+        self.assertTrue(all(duration > 0 for duration in results['sizes']['10'].values()))
+        with self.assertRaises(ValueError):
+            benchmark.run([10], ['teleport'])
+
+    def test_compare(self):
+        """
+        benchmarks slower than baseline by more than threshold are regressions.
+        :return:
+        """
+        baseline = {'sizes': {'10': {'frame': 1., 'print_map': 1.}}}
+        results = {'sizes': {'10': {'frame': 1.2, 'print_map': 1.3, 'move_player': 9.},
+                             '100': {'frame': 9.}}}
+        self.assertEqual(benchmark.compare(results, baseline, 0.25), [('10', 'print_map', 1.3)])
+
+    def test_main(self):
+        """
+        baseline is saved then compared with.
+        :return:
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            baseline = os.path.join(folder, 'baseline.json')
+            argv = ['-s', '10', '-b', 'checked_conditions', '-r', '1', '--baseline', baseline]
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(benchmark.main(argv + ['--save-baseline']), [])
+                self.assertTrue(os.path.exists(baseline))
+                self.assertEqual(benchmark.main(argv + ['--threshold', '1000']), [])
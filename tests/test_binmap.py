@@ -0,0 +1,146 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test compiled binary maps
+"""
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import game.binmap as binmap
+import game.core as gc
+import game.default_settings as ds
+import game.loader as loader
+
+
+class TestCompiledMap(unittest.TestCase):
+    """
+    tests for game.binmap module and compiled maps loading.
+    """
+
+    def setUp(self):
+        """
+        copy example map in a temporary maps folder.
+        :return:
+        """
+        self.folder = tempfile.mkdtemp()
+        example_folder = os.path.join(ds.ROOT_PATH, 'maps', 'example')
+        for extension in ('.txt', '.json'):
+            shutil.copy(os.path.join(example_folder, 'example_map' + extension),
+                        os.path.join(self.folder, 'tmp_map' + extension))
+        self.map_path = os.path.join(self.folder, 'tmp_map.txt')
+        self.binary_path = os.path.join(self.folder, 'tmp_map' + ds.COMPILED_MAP_EXTENSION)
+        self.saved_settings = ds.MAP_FOLDER_PATH_LIST, ds.MAP_CATALOG_PATH
+        ds.MAP_FOLDER_PATH_LIST = [self.folder] + ds.MAP_FOLDER_PATH_LIST
+        ds.MAP_CATALOG_PATH = os.path.join(self.folder, 'index', 'catalog.json')
+        loader.clear_cache()
+
+    def tearDown(self):
+        """
+        restore settings.
+        :return:
+        """
+        ds.MAP_FOLDER_PATH_LIST, ds.MAP_CATALOG_PATH = self.saved_settings
+        shutil.rmtree(self.folder)
+        loader.clear_cache()
+
+    def touch(self, path, seconds):
+        """
+        move modification time of a file
+        :return:
+        """
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10 ** 9))
+
+    def test_compile_map_tool(self):
+        """
+        compile-map writes compiled map next to map file.
+        :return:
+        """
+        self.assertEqual(binmap.main(['tmp_map']), [self.binary_path])
+        header = binmap.read_header(self.binary_path)
+        self.assertEqual((header.height, header.width), (15, 15))
+        self.assertEqual(header.legend['#']['type'], 'wall')
+        self.assertEqual(header.data_offset % binmap.DATA_ALIGNMENT, 0)
+
+    def test_same_grid_as_text_map(self):
+        """
+        compiled map gives the same cells and elements than map files.
+        :return:
+        """
+        text_labyrinth = gc.GenericLabyrinth('tmp_map', gc.Conditions(), 'tom', seed=1)
+        binmap.main(['tmp_map'])
+        self.touch(self.binary_path, 1)
+        labyrinth = gc.GenericLabyrinth('tmp_map', gc.Conditions(), 'tom', seed=1)
+        self.assertEqual(labyrinth.map_spec.binary_path, self.binary_path)
+        self.assertIsNone(labyrinth.map_spec.rows)
+        self.assertEqual(bytes(labyrinth.grid.cells), bytes(text_labyrinth.grid.cells))
+        self.assertEqual(labyrinth.grid.elements, text_labyrinth.grid.elements)
+        self.assertEqual(labyrinth.max_column_index, text_labyrinth.max_column_index)
+        self.assertEqual(labyrinth.pickable_elements_position,
+                         text_labyrinth.pickable_elements_position)
+        self.assertEqual(dict(labyrinth.positions), dict(text_labyrinth.positions))
+        self.assertEqual(pickle.loads(pickle.dumps(labyrinth.map_spec)).binary_path,
+                         self.binary_path)
+
+    def test_windows_line_endings(self):
+        """
+        a map with windows line endings gives the same grid, compiled or not.
+        :return:
+        """
+        with open(self.map_path, 'rb') as file:
+            content = file.read()
+        with open(self.map_path, 'wb') as file:
+            file.write(content.replace(b'\n', b'\r\n'))
+        text_labyrinth = gc.GenericLabyrinth('tmp_map', gc.Conditions(), 'tom', seed=1)
+        binmap.main(['tmp_map'])
+        self.touch(self.binary_path, 1)
+        labyrinth = gc.GenericLabyrinth('tmp_map', gc.Conditions(), 'tom', seed=1)
+        self.assertEqual(labyrinth.map_spec.binary_path, self.binary_path)
+        self.assertEqual(bytes(labyrinth.grid.cells), bytes(text_labyrinth.grid.cells))
+        self.assertEqual((labyrinth.grid.width, labyrinth.max_column_index),
+                         (text_labyrinth.grid.width, text_labyrinth.max_column_index))
+        self.assertNotIn('\r', labyrinth.used_char)
+
+    def test_cells_are_copy_on_write(self):
+        """
+        placing and picking up objects never modify the compiled map.
+        :return:
+        """
+        binmap.main(['tmp_map'])
+        self.touch(self.binary_path, 1)
+        with open(self.binary_path, 'rb') as file:
+            content = file.read()
+        labyrinth = gc.GenericLabyrinth('tmp_map', gc.Conditions(), 'tom')
+        other = gc.GenericLabyrinth('tmp_map', gc.Conditions(), 'tom')
+        position = next(iter(labyrinth.pickable_elements_position))
+        labyrinth.positions[position] = gc.Element.create_from_default_settings('wall')
+        labyrinth.reset(3)
+        self.assertNotEqual(other.positions[position].element_name, 'wall')
+        with open(self.binary_path, 'rb') as file:
+            self.assertEqual(file.read(), content)
+
+    def test_outdated_compiled_map(self):
+        """
+        map files newer than compiled map are parsed instead.
+        :return:
+        """
+        binmap.main(['tmp_map'])
+        self.touch(self.map_path, 1)
+        self.assertIsNone(loader.load_map_spec('tmp_map').binary_path)
+
+    def test_bad_compiled_map(self):
+        """
+        a file which is not a compiled map is ignored.
+        :return:
+        """
+        with open(self.binary_path, 'wb') as file:
+            file.write(b'not a map')
+        self.touch(self.binary_path, 1)
+        with self.assertRaises(ValueError):
+            binmap.read_header(self.binary_path)
+        self.assertIsNone(loader.load_map_spec('tmp_map').binary_path)
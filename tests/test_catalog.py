@@ -0,0 +1,86 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test maps catalog
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import game.catalog as catalog
+import game.default_settings as ds
+
+
+class TestMapCatalog(unittest.TestCase):
+    """
+    tests for game.catalog module MapCatalog class.
+    """
+
+    def setUp(self):
+        """
+        create a temporary maps folder containing a copy of small map.
+        :return:
+        """
+        self.folder = tempfile.mkdtemp()
+        self.maps_folder = os.path.join(self.folder, 'maps')
+        os.makedirs(os.path.join(self.maps_folder, 'sub'))
+        self.index_path = os.path.join(self.folder, 'index.json')
+        self.add_map('small_map', os.path.join(self.maps_folder, 'sub'))
+
+    def tearDown(self):
+        """
+        remove temporary folder.
+        :return:
+        """
+        shutil.rmtree(self.folder)
+
+    @staticmethod
+    def add_map(map_name, folder):
+        """
+        copy small example map in given folder.
+        :return:
+        """
+        example_folder = os.path.join(ds.ROOT_PATH, 'maps', 'example')
+        for extension in ('.txt', '.json'):
+            shutil.copy(os.path.join(example_folder, 'small_map' + extension),
+                        os.path.join(folder, map_name + extension))
+
+    def test_entry(self):
+        """
+        catalog entries describe maps.
+        :return:
+        """
+        maps_catalog = catalog.MapCatalog([self.maps_folder], self.index_path)
+        self.assertEqual(maps_catalog.names(), ['small_map'])
+        entry = maps_catalog.get('small_map')
+        self.assertEqual(entry['map_path'], os.path.join(self.maps_folder, 'sub', 'small_map.txt'))
+        self.assertEqual((entry['width'], entry['height']), (4, 7))
+        self.assertEqual(entry['items'], ['ether', 'needle', 'tube'])
+        self.assertEqual((entry['start_count'], entry['exit_count']), (1, 1))
+        self.assertEqual(len(entry['checksum']), 40)
+        self.assertTrue(os.path.exists(self.index_path))
+
+    def test_incremental_refresh(self):
+        """
+        unchanged folders are not scanned again and new maps are found.
+        :return:
+        """
+        catalog.MapCatalog([self.maps_folder], self.index_path)
+        maps_catalog = catalog.MapCatalog([self.maps_folder], self.index_path)
+        self.assertFalse(maps_catalog.refresh())
+
+        self.add_map('other_map', self.maps_folder)
+        self.assertIn('other_map', catalog.MapCatalog([self.maps_folder], self.index_path))
+        self.assertIn('other_map', maps_catalog.get('other_map')['map_path'])
+
+    def test_missing_map(self):
+        """
+        unknown map raises FileNotFoundError.
+        :return:
+        """
+        maps_catalog = catalog.MapCatalog([self.maps_folder], self.index_path)
+        with self.assertRaises(FileNotFoundError):
+            maps_catalog.get('doesnotexist_map')
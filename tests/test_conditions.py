@@ -0,0 +1,131 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test success conditions and inventory counters
+"""
+import contextlib
+import io
+import unittest
+
+import game.core as gc
+import game.inventory as inventory
+
+
+class TestInventory(unittest.TestCase):
+    """
+    tests for game.inventory module.
+    """
+
+    def setUp(self):
+        """
+        create an inventory of two objects.
+        :return:
+        """
+        self.inventory = inventory.Inventory({'needle': 'N', 'tube': 'T'})
+
+    def test_slots(self):
+        """
+        objects are read and written as former inventory dict entries.
+        :return:
+        """
+        self.inventory['tube']['nb'] += 2
+        self.assertEqual(self.inventory['tube'], {'picture': 'T', 'nb': 2})
+        self.assertEqual(self.inventory.as_dict(), {'needle': 0, 'tube': 2})
+        self.assertEqual(list(self.inventory), ['needle', 'tube'])
+
+    def test_mismatches(self):
+        """
+        counters different from their target are counted on each change.
+        :return:
+        """
+        self.inventory.set_targets({'needle': 1, 'tube': 0})
+        self.assertEqual(self.inventory.mismatches, 1)
+        self.assertEqual(self.inventory.add('needle'), 1)
+        self.assertTrue(self.inventory.matches_targets())
+        self.inventory.add('needle')
+        self.assertFalse(self.inventory.matches_targets())
+        self.inventory.clear()
+        self.assertEqual(self.inventory.mismatches, 1)
+
+    def test_targets_as_dict_comparison(self):
+        """
+        inventory matches targets when a dict comparison would tell so.
+        :return:
+        """
+        self.inventory.set_targets({'needle': 0})
+        self.assertFalse(self.inventory.matches_targets())
+        self.inventory.set_targets({'needle': 0, 'tube': 0, 'ether': 0})
+        self.assertEqual(self.inventory.mismatches, 1)
+        self.inventory.set_targets(None)
+        self.assertFalse(self.inventory.matches_targets())
+
+
+class TestConditions(unittest.TestCase):
+    """
+    tests for Conditions compiled in a check plan.
+    """
+
+    def create_labyrinth(self, **conditions):
+        """
+        create small map labyrinth with objects placed by seed 1.
+        :return:
+        """
+        conditions.setdefault('to_pick_up_objects', {"needle": 1, "tube": 1, "ether": 1})
+        labyrinth = gc.GenericLabyrinth('small_map', gc.Conditions(**conditions), 'tom')
+        labyrinth.reset(seed=1)
+        return labyrinth
+
+    def test_plan(self):
+        """
+        plan checks conditions in order of valid conditions.
+        :return:
+        """
+        labyrinth = self.create_labyrinth(time_limit=60, max_moves=10)
+        self.assertEqual([name for name, _ in labyrinth.check_plan.checks],
+                         ['to_pick_up_objects', 'max_moves', 'time_limit'])
+        self.assertEqual([name for name, _ in labyrinth.check_plan.limits],
+                         ['max_moves', 'time_limit'])
+        self.assertEqual(gc.Conditions(max_moves=10).__dict__, {'max_moves': 10})
+
+    def test_pick_up_objects(self):
+        """
+        conditions are satisfied once every object is picked up, without any output.
+        :return:
+        """
+        labyrinth = self.create_labyrinth()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertFalse(labyrinth.checked_conditions())
+            for direction in ['down'] * 4 + ['right'] + ['up'] * 4:
+                labyrinth.step(direction)
+            self.assertTrue(labyrinth.checked_conditions())
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual(labyrinth.player['inventory'].mismatches, 0)
+
+        labyrinth.reset()
+        self.assertFalse(labyrinth.checked_conditions())
+
+    def test_max_moves(self):
+        """
+        game ends when moves exceed max_moves.
+        :return:
+        """
+        labyrinth = self.create_labyrinth(max_moves=2)
+        self.assertEqual(labyrinth.step('down')[2:], (False, False))
+        self.assertEqual(labyrinth.step('down')[2:], (False, False))
+        self.assertEqual(labyrinth.step('down')[2:], (True, False))
+        self.assertEqual(labyrinth.check_plan.failed_condition(), 'to_pick_up_objects')
+
+    def test_time_limit(self):
+        """
+        game ends when duration exceeds time_limit, measured from player placement.
+        :return:
+        """
+        labyrinth = self.create_labyrinth(time_limit=60)
+        self.assertFalse(labyrinth.game_finished())
+        labyrinth.started_at -= 61
+        self.assertTrue(labyrinth.game_finished())
+        labyrinth.reset()
+        self.assertFalse(labyrinth.game_finished())
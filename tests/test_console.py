@@ -0,0 +1,92 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test console renderer
+"""
+import io
+import unittest
+
+import game.console as console
+import game.core as gc
+
+
+class TestConsoleRenderer(unittest.TestCase):
+    """
+    tests for game.console module ConsoleRenderer class.
+    """
+
+    def setUp(self):
+        """
+        create a labyrinth with player on start position.
+        :return:
+        """
+        self.labyrinth = gc.CommandLineLabyrinth('example_map', gc.Conditions(), 'tom')
+        self.labyrinth.get_player_initial_position()
+        self.stream = io.StringIO()
+
+    def test_render_matches_map_file(self):
+        """
+        rendered map is the map file with player and objects.
+        :return:
+        """
+        with open(self.labyrinth.map_spec.map_path) as file:
+            expected = list(file.read())
+        stride = self.labyrinth.max_column_index + 1
+        for (row, column), element in self.labyrinth.pickable_elements_position.items():
+            expected[row * stride + column] = element.symbol
+        row, column = self.labyrinth.player['position']
+        expected[row * stride + column] = self.labyrinth.player['element'].symbol
+        self.assertEqual(self.labyrinth.print_map(), ''.join(expected))
+
+    def test_not_interactive_writes_whole_map(self):
+        """
+        whole map is written when stream is not a terminal.
+        :return:
+        """
+        renderer = console.ConsoleRenderer(self.labyrinth, self.stream, interactive=False)
+        renderer.draw()
+        renderer.invalidate((1, 1))
+        renderer.draw()
+        self.assertEqual(self.stream.getvalue(), (self.labyrinth.print_map() + '\n') * 2)
+
+    def test_interactive_writes_changed_rows(self):
+        """
+        only changed rows are written in interactive mode.
+        :return:
+        """
+        renderer = console.ConsoleRenderer(self.labyrinth, self.stream, interactive=True)
+        renderer.draw()
+        self.stream.seek(0)
+        self.stream.truncate()
+
+        previous_position = self.labyrinth.player['position']
+        self.labyrinth.move_player('W')
+        renderer.invalidate(previous_position, self.labyrinth.player['position'])
+        renderer.draw()
+        first_row, second_row = self.labyrinth.print_map().split('\n')[:2]
+        self.assertEqual(first_row, "#s#############")
+        self.assertEqual(second_row[:2], "#X")
+        self.assertEqual(self.stream.getvalue(),
+                         console.MOVE_TO.format(1) + console.CLEAR_LINE + first_row +
+                         console.MOVE_TO.format(2) + console.CLEAR_LINE + second_row +
+                         console.MOVE_TO.format(16) + console.CLEAR_BELOW)
+
+    def test_status_is_kept_below_map(self):
+        """
+        status is written after clearing below the map, on each draw.
+        :return:
+        """
+        renderer = console.ConsoleRenderer(self.labyrinth, self.stream, interactive=True)
+        renderer.draw()
+        renderer.set_status("needle: 1")
+        renderer.draw()
+        self.assertTrue(self.stream.getvalue().endswith(
+            console.MOVE_TO.format(16) + console.CLEAR_BELOW + "needle: 1\n"))
+
+        stream = io.StringIO()
+        renderer = console.ConsoleRenderer(self.labyrinth, stream, interactive=False)
+        renderer.set_status("needle: 1")
+        renderer.draw()
+        self.assertEqual(stream.getvalue(), self.labyrinth.print_map() + '\nneedle: 1\n')
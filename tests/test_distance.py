@@ -0,0 +1,107 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test distance engine
+"""
+import unittest
+
+import numpy
+
+import game.core as gc
+import game.distance as distance
+import game.grid as compact_grid
+
+
+class TestDistanceEngine(unittest.TestCase):
+    """
+    tests for game.distance module DistanceEngine class.
+    """
+
+    def setUp(self):
+        """
+        build a small grid with a dead end.
+        :return:
+        """
+        self.elements = {
+            '#': gc.Element.create_from_default_settings('wall'),
+            '.': gc.Element.create_from_default_settings('ground'),
+        }
+        self.grid = compact_grid.CompactGrid.from_rows(["....\n",
+                                                        ".##.\n",
+                                                        ".#..\n",
+                                                        "##.#"], self.elements.get)
+        self.engine = distance.get_engine(self.grid)
+
+    def test_field(self):
+        """
+        distances are lengths of shortest paths, walls and unreachable cells are -1.
+        :return:
+        """
+        self.assertEqual(self.engine.field((0, 0)).tolist(), [[0, 1, 2, 3],
+                                                              [1, -1, -1, 4],
+                                                              [2, -1, 6, 5],
+                                                              [-1, -1, 7, -1]])
+        self.assertEqual(self.engine.walkable().sum(), 10)
+        self.assertEqual(self.engine.distance((3, 2), (0, 0)), 7)
+
+    def test_multiple_sources(self):
+        """
+        a field can be computed from several sources.
+        :return:
+        """
+        field = self.engine.field([(0, 0), (3, 2)])
+        self.assertEqual(field[0, 3], 3)
+        self.assertEqual(field[2, 3], 2)
+
+    def test_cache_and_invalidation(self):
+        """
+        fields are cached until walkability of a cell changes.
+        :return:
+        """
+        field = self.engine.field((0, 0))
+        self.assertIs(self.engine.field((0, 0)).base, field.base)
+        self.grid.set(2, 0, self.elements['.'])
+        self.assertIs(self.engine.field((0, 0)).base, field.base)
+
+        self.grid.set(0, 2, self.elements['#'])
+        self.assertEqual(self.engine.field((0, 0))[0, 1], 1)
+        self.assertEqual(self.engine.field((0, 0))[3, 2], distance.UNREACHABLE)
+        self.assertEqual(self.engine.field((3, 2))[0, 3], 4)
+
+    def test_path(self):
+        """
+        path goes from source to target through walkable cells.
+        :return:
+        """
+        path = self.engine.path((0, 0), (3, 2))
+        self.assertEqual(path[0], (0, 0))
+        self.assertEqual(path[-1], (3, 2))
+        self.assertEqual(len(path), 8)
+        for position in path:
+            self.assertTrue(self.grid.is_walkable(*position))
+        self.assertEqual(self.engine.path((0, 0), (1, 1)), [])
+
+    def test_blocked_cells(self):
+        """
+        blocked cells are considered as walls.
+        :return:
+        """
+        self.assertEqual(self.engine.distance((0, 0), (2, 3), blocked=[(0, 2)]),
+                         distance.UNREACHABLE)
+        self.assertEqual(self.engine.distance((0, 0), (2, 3)), 5)
+
+    def test_wide_frontier(self):
+        """
+        wide frontiers expanded with numpy give the same distances as small ones.
+        :return:
+        """
+        size = distance.SMALL_FRONTIER * 2
+        grid = compact_grid.CompactGrid.from_rows(["." * size + "\n"] * (size - 1) +
+                                                  ["." * (size - 1) + "#"], self.elements.get)
+        field = distance.get_engine(grid).field([(0, 0), (0, 0)])
+        rows, columns = numpy.indices(field.shape)
+        expected = rows + columns
+        expected[-1, -1] = distance.UNREACHABLE
+        self.assertEqual(field.tolist(), expected.tolist())
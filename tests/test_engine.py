@@ -0,0 +1,85 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test headless API of labyrinths
+"""
+import contextlib
+import io
+import unittest
+
+import game.core as gc
+
+
+class TestHeadlessApi(unittest.TestCase):
+    """
+    tests for GenericLabyrinth reset, step and state methods.
+    """
+
+    def setUp(self):
+        """
+        create a labyrinth driven by headless API.
+        :return:
+        """
+        self.conditions = gc.Conditions(to_pick_up_objects={"needle": 1, "tube": 1, "ether": 1})
+        self.labyrinth = gc.GenericLabyrinth('small_map', self.conditions, 'tom')
+
+    def test_reset_is_reproducible(self):
+        """
+        same seed gives same objects placement.
+        :return:
+        """
+        state = self.labyrinth.reset(seed=3)
+        self.assertEqual(state, {'position': (0, 1), 'moves': 0,
+                                 'inventory': {'needle': 0, 'tube': 0, 'ether': 0}})
+        placement = self.labyrinth.pickable_elements_position
+        self.labyrinth.reset(seed=4)
+        self.labyrinth.reset(seed=3)
+        self.assertEqual(self.labyrinth.pickable_elements_position, placement)
+
+    def test_step(self):
+        """
+        step moves player, picks up objects and finishes game without any output.
+        :return:
+        """
+        self.labyrinth.reset(seed=1)
+        output = io.StringIO()
+        picked = []
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(self.labyrinth.step('up'), ((0, 1), None, False, False))
+            # walk every cell of the map, then the exit
+            path = ['down'] * 5 + ['right'] + ['up'] * 4 + ['down'] * 4 + ['left', 'down']
+            for direction in path:
+                position, gift, finished, won = self.labyrinth.step(direction)
+                if gift:
+                    picked.append(gift)
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual(sorted(picked), ['ether', 'needle', 'tube'])
+        self.assertEqual((position, finished, won), ((6, 1), True, True))
+        self.assertEqual(self.labyrinth.state()['moves'], len(path))
+
+    def test_lost_game(self):
+        """
+        reaching exit without every object loses the game.
+        :return:
+        """
+        self.labyrinth.reset(seed=1)
+        for _ in range(5):
+            position, _, finished, won = self.labyrinth.step('down')
+        self.assertEqual(self.labyrinth.step('down')[2:], (True, False))
+        self.assertTrue(self.labyrinth.state()['moves'] == 6 and position == (5, 1))
+
+    def test_reset_restores_cells(self):
+        """
+        reset after objects were picked up gives the cells of a new labyrinth.
+        :return:
+        """
+        self.labyrinth.reset(seed=1)
+        for direction in ['down'] * 5 + ['right'] + ['up'] * 4:
+            self.labyrinth.step(direction)
+        self.labyrinth.reset(seed=2)
+        other = gc.GenericLabyrinth('small_map', self.conditions, 'tom', seed=2)
+        self.assertEqual(bytes(self.labyrinth.grid.cells), bytes(other.grid.cells))
+        self.assertEqual(self.labyrinth.pickable_elements_position,
+                         other.pickable_elements_position)
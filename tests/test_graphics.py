@@ -0,0 +1,406 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test graphical mode helpers
+"""
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame  # noqa: E402
+
+import game.core as gc  # noqa: E402
+import game.graphics as graphics  # noqa: E402
+import game.loader as loader  # noqa: E402
+
+
+class TestAssetManager(unittest.TestCase):
+    """
+    tests for game.graphics module AssetManager class.
+    """
+
+    def setUp(self):
+        """
+        open a display.
+        :return:
+        """
+        pygame.display.init()
+        pygame.display.set_mode((40, 40))
+        self.assets = graphics.AssetManager(max_size=2)
+
+    def tearDown(self):
+        """
+        close display.
+        :return:
+        """
+        pygame.display.quit()
+
+    def test_pictures_are_loaded_once(self):
+        """
+        a picture is loaded from disk only once.
+        :return:
+        """
+        wall = self.assets.get('wall.png')
+        self.assertIs(self.assets.get('wall.png'), wall)
+        self.assertEqual(self.assets.loads, 1)
+
+    def test_lru_bound(self):
+        """
+        least recently used pictures are dropped.
+        :return:
+        """
+        self.assets.get('wall.png')
+        self.assets.get('floor.png')
+        self.assets.get('wall.png')
+        self.assets.get('guard.png')
+        self.assertEqual(len(self.assets.surfaces), 2)
+        self.assertIn(('wall.png', True, None), self.assets.surfaces)
+        self.assertNotIn(('floor.png', True, None), self.assets.surfaces)
+
+    def test_missing_picture(self):
+        """
+        missing pictures are replaced by default picture.
+        :return:
+        """
+        self.assertEqual(self.assets.get('doesnotexist.png').get_size(),
+                         self.assets.get('default.png').get_size())
+
+    def test_scaled_pictures(self):
+        """
+        scaled pictures are made from the picture loaded once.
+        :return:
+        """
+        self.assertEqual(self.assets.get('wall.png', size=24).get_size(), (24, 24))
+        self.assertIs(self.assets.get('wall.png', size=24), self.assets.get('wall.png', size=24))
+        self.assertIs(self.assets.get('wall.png', size=40), self.assets.get('wall.png'))
+        self.assertEqual(self.assets.loads, 1)
+
+    def test_new_display_clears_cache(self):
+        """
+        cache is emptied when display changes.
+        :return:
+        """
+        self.assets.get('wall.png')
+        pygame.display.quit()
+        pygame.display.init()
+        pygame.display.set_mode((80, 80))
+        self.assets.get('wall.png')
+        self.assertEqual(self.assets.loads, 2)
+
+
+class TestMapRenderer(unittest.TestCase):
+    """
+    tests for game.graphics module MapRenderer class.
+    """
+
+    def setUp(self):
+        """
+        open a display and create a labyrinth renderer. Seed leaves cell below start free.
+        :return:
+        """
+        pygame.init()
+        self.window = pygame.display.set_mode((600, 720))
+        self.labyrinth = gc.GraphicalLabyrinth('example_map', gc.Conditions(), 'tom', seed=0)
+        self.labyrinth.get_player_initial_position()
+        self.renderer = graphics.MapRenderer(self.labyrinth, graphics.AssetManager())
+
+    def tearDown(self):
+        """
+        close display.
+        :return:
+        """
+        pygame.quit()
+
+    def test_idle_frame_updates_nothing(self):
+        """
+        nothing is drawn when nothing changed.
+        :return:
+        """
+        self.assertEqual(self.renderer.render(self.window, full=True)[0],
+                         self.window.get_rect())
+        self.assertEqual(self.renderer.render(self.window), [])
+
+    def test_move_updates_dirty_tiles(self):
+        """
+        only tiles touched by player are updated.
+        :return:
+        """
+        self.renderer.render(self.window, full=True)
+        old_position = self.labyrinth.player['position']
+        self.assertIsNone(self.labyrinth.move_player(pygame.K_DOWN))
+        new_position = self.labyrinth.player['position']
+        rects = self.renderer.render(self.window, {old_position, new_position})
+        self.assertEqual(sorted(map(tuple, rects)),
+                         sorted([tuple(self.renderer.tile_rect(old_position)),
+                                 tuple(self.renderer.tile_rect(new_position))]))
+
+    def test_picked_up_object_is_erased(self):
+        """
+        static layer tile is drawn again when an object is picked up.
+        :return:
+        """
+        self.renderer.render(self.window, full=True)
+        position = sorted(self.labyrinth.pickable_elements_position)[0]
+        rect = self.renderer.tile_rect(position)
+        with_object = pygame.image.tostring(self.renderer.static_layer.subsurface(rect), 'RGB')
+        self.labyrinth.positions[position] = gc.Element.create_from_default_settings('ground')
+        self.renderer.invalidate(position)
+        self.renderer.refresh_tile(position)
+        without_object = pygame.image.tostring(self.renderer.static_layer.subsurface(rect),
+                                               'RGB')
+        self.assertNotEqual(with_object, without_object)
+
+    def test_profiled_frame(self):
+        """
+        rendering phases, blits and image loads are measured when profiling is enabled.
+        :return:
+        """
+        self.labyrinth.renderer = self.renderer
+        profiler = self.labyrinth.enable_profiling(log_interval=0, overlay=True)
+        profiler.begin_frame()
+        rects = self.renderer.render(self.window, full=True)
+        profiler.end_frame()
+        self.assertIn(self.renderer.profile_rect(), rects)
+        self.assertEqual(list(profiler.timings), ['map', 'inventory', 'update', 'other', 'frame'])
+        counters = profiler.stats()['counters']
+        self.assertEqual(counters['blits']['total'], self.renderer.blits)
+        self.assertEqual(counters['image_loads']['total'], self.renderer.assets.loads)
+        self.assertEqual(counters['moves']['total'], 0)
+
+
+class TestViewport(unittest.TestCase):
+    """
+    tests for game.graphics module MapRenderer viewport.
+    """
+
+    def setUp(self):
+        """
+        open a small display and create a renderer on a map bigger than the window.
+        :return:
+        """
+        pygame.init()
+        self.window = pygame.display.set_mode((200, 240))
+        rows = ["#s" + "#" * 58 + "\n"] + ["#" + "." * 58 + "#\n"] * 58 + ["#" * 58 + "g#"]
+        spec = loader.MapSpec('big_map', None, None, rows,
+                              loader.load_map_spec('small_map').legend, ())
+        self.labyrinth = gc.GraphicalLabyrinth('big_map', gc.Conditions(), 'tom', map_spec=spec)
+        self.labyrinth.get_player_initial_position()
+        self.renderer = graphics.MapRenderer(self.labyrinth, graphics.AssetManager(),
+                                             tile_size=40, top=40, window_size=(200, 240))
+
+    def tearDown(self):
+        """
+        close display.
+        :return:
+        """
+        pygame.quit()
+
+    def test_only_visible_chunks_are_built(self):
+        """
+        drawing cost depends on window size, not on map size.
+        :return:
+        """
+        self.renderer.chunks = graphics.ChunkCache(self.renderer, chunk_size=4)
+        self.renderer.render(self.window, full=True)
+        self.assertEqual((self.renderer.view_rows, self.renderer.view_columns), (5, 5))
+        self.assertEqual(self.renderer.chunks.visible_chunks(),
+                         [(0, 0), (0, 1), (1, 0), (1, 1)])
+        self.assertEqual(self.renderer.chunks.builds, 4)
+        self.assertEqual(self.renderer.chunks.chunk_rect((1, 1)), pygame.Rect(160, 200, 160, 160))
+
+        self.renderer.render(self.window, full=True)
+        self.assertEqual(self.renderer.chunks.builds, 4)
+
+    def test_pick_up_invalidates_chunk(self):
+        """
+        picking up an object builds only its chunk again.
+        :return:
+        """
+        self.labyrinth.renderer = self.renderer
+        self.renderer.chunks = graphics.ChunkCache(self.renderer, chunk_size=4)
+        self.renderer.render(self.window, full=True)
+        gift = next(iter(self.labyrinth.pickable_elements_position.values()))
+        self.labyrinth.positions[2, 1] = gift
+        self.labyrinth.move_player(pygame.K_DOWN)
+        self.labyrinth.move_player(pygame.K_DOWN)
+        self.assertEqual(list(self.renderer.chunks.surfaces), [(0, 1), (1, 0), (1, 1)])
+        self.renderer.render(self.window, {(1, 1), (2, 1)})
+        self.assertEqual(list(self.renderer.chunks.surfaces)[-1], (0, 0))
+
+    def test_chunks_lru(self):
+        """
+        least recently used chunks are dropped, at least visible chunks are kept.
+        :return:
+        """
+        chunks = graphics.ChunkCache(self.renderer, chunk_size=2, max_size=1)
+        self.assertEqual(chunks.max_size, 16)
+        for row in range(17):
+            chunks.get((row, 0))
+        self.assertEqual(len(chunks.surfaces), 16)
+        self.assertNotIn((0, 0), chunks.surfaces)
+
+    def test_viewport_follows_player(self):
+        """
+        viewport scrolls when player comes near an edge and stays in map.
+        :return:
+        """
+        self.renderer.render(self.window, full=True)
+        self.assertEqual(self.renderer.origin, (0, 0))
+        for _ in range(10):
+            old_position = self.labyrinth.player['position']
+            self.labyrinth.move_player(pygame.K_DOWN)
+            rects = self.renderer.render(self.window,
+                                         {old_position, self.labyrinth.player['position']})
+            self.assertTrue(self.window.get_rect().contains(
+                self.renderer.tile_rect(self.labyrinth.player['position'])))
+        self.assertEqual(self.labyrinth.player['position'], (10, 1))
+        self.assertEqual(self.renderer.origin, (8, 0))
+        self.assertEqual(rects[0], self.window.get_rect())
+
+        self.labyrinth.player['position'] = (58, 58)
+        self.renderer.update_viewport()
+        self.assertEqual(self.renderer.origin, (55, 55))
+
+    def test_other_tile_size(self):
+        """
+        sprites are scaled to tile size: chunks have no gaps and player stays in its tile.
+        :return:
+        """
+        renderer = graphics.MapRenderer(self.labyrinth, graphics.AssetManager(), tile_size=24,
+                                        top=60, window_size=(200, 240))
+        renderer.render(self.window, full=True)
+        chunk_size = renderer.chunks.chunk_size
+        self.assertEqual(renderer.chunks.get((0, 0)).get_size(), (24 * chunk_size,) * 2)
+        # walls and player are drawn with pictures scaled to tile size
+        for picture in (self.labyrinth.positions[0, 0].picture,
+                        self.labyrinth.player['element'].picture):
+            self.assertEqual(renderer.assets.surfaces[picture, True, 24].get_size(), (24, 24))
+
+        old_position = self.labyrinth.player['position']
+        self.labyrinth.move_player(pygame.K_DOWN)
+        new_position = self.labyrinth.player['position']
+        rects = renderer.render(self.window, {old_position, new_position})
+        self.assertEqual(rects[:2], [renderer.tile_rect(old_position),
+                                     renderer.tile_rect(new_position)])
+        self.assertEqual(renderer.tile_rect(new_position).size, (24, 24))
+        self.assertEqual(renderer.inventory_rect(), pygame.Rect(20, 20, 80, 20))
+
+
+class TestLoopScheduler(unittest.TestCase):
+    """
+    tests for game.graphics module LoopScheduler class.
+    """
+
+    def setUp(self):
+        """
+        open a display.
+        :return:
+        """
+        pygame.init()
+        pygame.display.set_mode((40, 40))
+        pygame.event.clear()
+
+    def tearDown(self):
+        """
+        close display.
+        :return:
+        """
+        pygame.quit()
+
+    def test_event_mode_returns_pending_events(self):
+        """
+        event mode returns as soon as events are available.
+        :return:
+        """
+        scheduler = graphics.LoopScheduler('event')
+        pygame.event.post(pygame.event.Event(pygame.USEREVENT, code=1))
+        pygame.event.post(pygame.event.Event(pygame.USEREVENT, code=2))
+        events = [event for event in scheduler.wait_events() if event.type == pygame.USEREVENT]
+        self.assertEqual([event.code for event in events], [1, 2])
+
+    def test_frame_time(self):
+        """
+        frame time is measured between two frames.
+        :return:
+        """
+        scheduler = graphics.LoopScheduler('polling', polling_delay=10)
+        scheduler.wait_events()
+        scheduler.wait_events()
+        self.assertGreaterEqual(scheduler.frame_time, 0.009)
+        self.assertEqual(scheduler.average_frame_time, scheduler.frame_time)
+
+    def test_unknown_mode(self):
+        """
+        unknown modes are refused.
+        :return:
+        """
+        with self.assertRaises(ValueError):
+            graphics.LoopScheduler('busy')
+
+
+class TestTextCache(unittest.TestCase):
+    """
+    tests for game.graphics module TextCache class.
+    """
+
+    def setUp(self):
+        """
+        initialize fonts.
+        :return:
+        """
+        pygame.font.init()
+        self.text = graphics.TextCache(max_size=2)
+
+    def tearDown(self):
+        """
+        close fonts.
+        :return:
+        """
+        pygame.font.quit()
+
+    def test_texts_are_rendered_once(self):
+        """
+        a text is rendered only once per font and color.
+        :return:
+        """
+        title = self.text.render("MACGYVER", 20, (255, 255, 0))
+        self.assertIs(self.text.render("MACGYVER", 20, (255, 255, 0)), title)
+        self.assertIsNot(self.text.render("MACGYVER", 20, (255, 0, 0)), title)
+        self.assertEqual(self.text.renders, 2)
+        self.assertEqual(len(self.text.fonts), 1)
+
+    def test_lru_bound(self):
+        """
+        least recently used texts are dropped.
+        :return:
+        """
+        for count in range(3):
+            self.text.render(str(count), 20, (255, 255, 0))
+        self.assertEqual(len(self.text.surfaces), 2)
+        self.assertIs(self.text.font(20), self.text.font(20))
+
+
+class TestProfiledGame(unittest.TestCase):
+    """
+    tests for profiling of GraphicalLabyrinth play_game.
+    """
+
+    def test_profiling_enabled_before_play_game(self):
+        """
+        renderer created by play_game is attached to profiler enabled before.
+        :return:
+        """
+        labyrinth = gc.GraphicalLabyrinth('small_map', gc.Conditions(time_limit=0.2), 'tom')
+        labyrinth.loop_mode = 'fps'
+        profiler = labyrinth.enable_profiling(log_interval=0, overlay=True)
+        with mock.patch.object(pygame.time, 'wait'):
+            labyrinth.play_game()
+        self.assertIs(labyrinth.renderer.profiler, profiler)
+        self.assertTrue(labyrinth.renderer.show_profile)
+        self.assertTrue({'wait', 'events', 'map', 'inventory', 'update'}.issubset(
+            profiler.timings))
+        self.assertGreater(profiler.totals['blits'], 0)
@@ -0,0 +1,125 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test compact grid
+"""
+import os
+import tempfile
+import unittest
+
+import game.core as gc
+import game.grid as compact_grid
+
+
+class TestCompactGrid(unittest.TestCase):
+    """
+    tests for game.grid module CompactGrid and GridPositions classes.
+    """
+
+    def setUp(self):
+        """
+        build a small grid with a short line.
+        :return:
+        """
+        self.elements = {
+            '#': gc.Element.create_from_default_settings('wall'),
+            '.': gc.Element.create_from_default_settings('ground'),
+            'g': gc.Element.create_from_default_settings('exit'),
+        }
+        self.grid = compact_grid.CompactGrid.from_rows(["#.#\n", "#.\n", "#g#"],
+                                                       self.elements.get)
+        self.positions = compact_grid.GridPositions(self.grid)
+
+    def test_dimensions(self):
+        """
+        grid has one byte per cell and a column for carriage returns.
+        :return:
+        """
+        self.assertEqual((self.grid.width, self.grid.height), (3, 3))
+        self.assertEqual(len(self.grid.cells), 12)
+        self.assertEqual(len(self.grid.elements), 3)
+        self.assertEqual(self.grid.max_column_index, 3)
+
+    def test_lookups(self):
+        """
+        walkable, pickable and exit flags are read from cells.
+        :return:
+        """
+        self.assertTrue(self.grid.is_walkable(0, 1))
+        self.assertFalse(self.grid.is_walkable(0, 0))
+        self.assertFalse(self.grid.is_walkable(1, 2))
+        self.assertTrue(self.grid.is_exit(2, 1))
+        self.assertFalse(self.grid.is_pickable(2, 1))
+        self.assertTrue(self.grid.contains(2, 2))
+        self.assertFalse(self.grid.contains(0, 3))
+
+    def test_positions_view(self):
+        """
+        dict-like view behaves as former positions dict.
+        :return:
+        """
+        self.assertIs(self.positions[0, 0], self.elements['#'])
+        self.assertEqual(self.positions[0, 3], '\n')
+        self.assertEqual(self.positions[1, 2], '\n')
+        self.assertNotIn((1, 3), self.positions)
+        self.assertNotIn((2, 3), self.positions)
+        with self.assertRaises(KeyError):
+            _ = self.positions[5, 0]
+        self.assertEqual(len(self.positions), 10)
+        self.assertEqual(list(self.positions)[:4], [(0, 0), (0, 1), (0, 2), (0, 3)])
+
+        item = gc.Element.create_from_default_settings('inventory')
+        self.positions[0, 1] = item
+        self.assertIs(self.positions[0, 1], item)
+        self.assertTrue(self.grid.is_pickable(0, 1))
+
+    def test_metadata(self):
+        """
+        exits and pickable objects are indexed and updated on change.
+        :return:
+        """
+        self.assertEqual(self.grid.exit_positions, frozenset([(2, 1)]))
+        self.assertEqual(self.grid.pickable_positions, {})
+
+        item = gc.Element.create_from_default_settings('inventory')
+        self.positions[0, 1] = item
+        self.assertEqual(self.grid.pickable_positions, {(0, 1): item})
+        self.positions[0, 1] = self.elements['g']
+        self.assertEqual(self.grid.pickable_positions, {})
+        self.assertEqual(self.grid.exit_positions, frozenset([(0, 1), (2, 1)]))
+
+    def test_streamed_file(self):
+        """
+        streaming a map file gives the same grid than its lines, progress is reported.
+        :return:
+        """
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+            file.write("#.#\n#.\n#g#")
+        self.addCleanup(os.remove, file.name)
+        reports = []
+        grid = compact_grid.CompactGrid.from_file(file.name, self.elements.get,
+                                                  lambda read, total: reports.append(read))
+        self.assertEqual(grid.cells, self.grid.cells)
+        self.assertEqual(grid.elements, self.grid.elements)
+        self.assertEqual(grid.max_column_index, self.grid.max_column_index)
+        self.assertEqual(grid.exit_positions, self.grid.exit_positions)
+        self.assertEqual(reports[-1], os.path.getsize(file.name))
+
+    def test_line_widths(self):
+        """
+        lines longer than first line are refused.
+        :return:
+        """
+        with self.assertRaises(compact_grid.MapFormatError):
+            compact_grid.encode_lines(["#.\n", "#.#\n"])
+        with self.assertRaises(compact_grid.MapFormatError):
+            compact_grid.CompactGrid.from_rows(["#.\n", "#.#\n"], self.elements.get)
+        cells, width, height, _, symbols = compact_grid.encode_lines(iter(["#g#\n", "#"]))
+        self.assertEqual((width, height, symbols), (3, 2, ['#', 'g']))
+        self.assertEqual(cells, bytearray([0, 1, 0, compact_grid.NEWLINE_ID, 0] +
+                                          [compact_grid.VOID_ID] * 3))
+        # windows line endings
+        self.assertEqual(compact_grid.encode_lines(["#g#\r\n", "#"]),
+                         (cells, width, height, 3, symbols))
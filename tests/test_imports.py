@@ -0,0 +1,67 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test import cost of game modules
+"""
+import os
+import subprocess
+import sys
+import unittest
+
+import game.default_settings as ds
+
+# max cumulative import time of game.core in seconds: about twice its current import time
+# (0.07 second), half of the one of the eager pygame import (0.3 second)
+IMPORT_TIME_BUDGET = 0.15
+
+
+class TestImports(unittest.TestCase):
+    """
+    tests for lazy import of graphical dependencies.
+    """
+
+    @staticmethod
+    def import_times(statement):
+        """
+        run a statement in a new interpreter with -X importtime
+        :return: dict of module names and cumulative import times in seconds
+        """
+        output = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                                cwd=os.path.dirname(ds.ROOT_PATH), stderr=subprocess.PIPE,
+                                stdout=subprocess.PIPE, universal_newlines=True, check=True)
+        times = {}
+        for line in output.stderr.splitlines():
+            if line.startswith('import time:') and '|' in line:
+                _, cumulative, name = line.split('|')
+                if cumulative.strip().isdigit():
+                    times[name.strip()] = int(cumulative) / 10 ** 6
+        return times
+
+    def test_core_does_not_import_pygame(self):
+        """
+        console mode and engine do not load pygame.
+        :return:
+        """
+        times = self.import_times("import game.core, game.simulate, game.solver")
+        self.assertIn('game.core', times)
+        self.assertFalse([name for name in times if name.split('.')[0] == 'pygame'])
+
+    def test_core_import_time_budget(self):
+        """
+        import time of game.core stays below budget, numpy is only loaded by placement.
+        :return:
+        """
+        times = self.import_times("import game.core")
+        self.assertLess(times['game.core'], IMPORT_TIME_BUDGET)
+        self.assertNotIn('numpy', times)
+
+    def test_graphical_labyrinth_is_lazy(self):
+        """
+        graphical labyrinth is still available from game.core.
+        :return:
+        """
+        times = self.import_times("import game.core as gc; gc.GraphicalLabyrinth")
+        self.assertIn('pygame', times)
+        self.assertIn('game.graphics', times)
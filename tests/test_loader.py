@@ -0,0 +1,116 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test map loader
+"""
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import game.core as gc
+import game.default_settings as ds
+import game.loader as loader
+
+
+class TestMapLoader(unittest.TestCase):
+    """
+    tests for game.loader module.
+    """
+
+    def setUp(self):
+        """
+        copy example map in a temporary maps folder.
+        :return:
+        """
+        self.folder = tempfile.mkdtemp()
+        example_folder = os.path.join(ds.ROOT_PATH, 'maps', 'example')
+        for extension in ('.txt', '.json'):
+            shutil.copy(os.path.join(example_folder, 'small_map' + extension),
+                        os.path.join(self.folder, 'tmp_map' + extension))
+        self.saved_settings = ds.MAP_FOLDER_PATH_LIST, ds.MAP_CATALOG_PATH
+        ds.MAP_FOLDER_PATH_LIST = [self.folder] + ds.MAP_FOLDER_PATH_LIST
+        ds.MAP_CATALOG_PATH = os.path.join(self.folder, 'index', 'catalog.json')
+        loader.clear_cache()
+
+    def tearDown(self):
+        """
+        restore settings.
+        :return:
+        """
+        ds.MAP_FOLDER_PATH_LIST, ds.MAP_CATALOG_PATH = self.saved_settings
+        shutil.rmtree(self.folder)
+        loader.clear_cache()
+
+    def test_spec_is_cached(self):
+        """
+        a second load of the same map returns the same spec.
+        :return:
+        """
+        spec = loader.load_map_spec('tmp_map')
+        self.assertIs(loader.load_map_spec('tmp_map'), spec)
+        self.assertEqual(spec.rows[0], "#s##\n")
+        self.assertEqual(spec.legend['g']['type'], 'exit')
+
+    def test_spec_is_immutable(self):
+        """
+        spec attributes and legend can not be modified.
+        :return:
+        """
+        spec = loader.load_map_spec('tmp_map')
+        with self.assertRaises(AttributeError):
+            spec.name = 'other'
+        with self.assertRaises(TypeError):
+            spec.legend['z'] = {}
+        self.assertEqual(pickle.loads(pickle.dumps(spec)).rows, spec.rows)
+
+    def test_spec_is_invalidated_when_file_changes(self):
+        """
+        modifying map file makes loader parse it again.
+        :return:
+        """
+        spec = loader.load_map_spec('tmp_map')
+        map_path = os.path.join(self.folder, 'tmp_map.txt')
+        with open(map_path, 'w') as file:
+            file.write("#s#\n#g#")
+        stat = os.stat(map_path)
+        os.utime(map_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        new_spec = loader.load_map_spec('tmp_map')
+        self.assertIsNot(new_spec, spec)
+        self.assertEqual(new_spec.rows, ("#s#\n", "#g#"))
+
+    def test_labyrinths_share_spec(self):
+        """
+        labyrinths built on the same map share the compiled spec.
+        :return:
+        """
+        lab1 = gc.CommandLineLabyrinth('tmp_map', gc.Conditions(), 'tom')
+        lab2 = gc.CommandLineLabyrinth('tmp_map', gc.Conditions(), 'tom')
+        self.assertIs(lab1.map_spec, lab2.map_spec)
+
+    def test_unknown_map(self):
+        """
+        unknown map raises FileNotFoundError.
+        :return:
+        """
+        with self.assertRaises(FileNotFoundError):
+            loader.load_map_spec('doesnotexist_map')
+
+    def test_big_map_is_streamed(self):
+        """
+        lines of maps bigger than STREAMING_MAP_SIZE are not kept in spec.
+        :return:
+        """
+        saved_size = ds.STREAMING_MAP_SIZE
+        ds.STREAMING_MAP_SIZE = 0
+        try:
+            spec = loader.load_map_spec('tmp_map')
+            labyrinth = gc.GenericLabyrinth('tmp_map', gc.Conditions(), 'tom', map_spec=spec)
+        finally:
+            ds.STREAMING_MAP_SIZE = saved_size
+        self.assertIsNone(spec.rows)
+        self.assertEqual(labyrinth.start_position, (0, 1))
+        self.assertEqual((labyrinth.grid.width, labyrinth.grid.height), (4, 7))
@@ -0,0 +1,95 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test random objects placement
+"""
+import random
+import unittest
+
+import game.core as gc
+import game.loader as loader
+import game.placement as placement
+
+
+class TestPlacementEngine(unittest.TestCase):
+    """
+    tests for game.placement module.
+    """
+
+    def setUp(self):
+        """
+        load legend of small map.
+        :return:
+        """
+        self.legend = loader.load_map_spec('small_map').legend
+        self.conditions = gc.Conditions(to_pick_up_objects={"needle": 1, "tube": 1, "ether": 1})
+
+    def create_labyrinth(self, rows, seed=None):
+        """
+        create a labyrinth from map rows with small map legend.
+        :return:
+        """
+        spec = loader.MapSpec('tmp_map', None, None, rows, self.legend, ())
+        return gc.GenericLabyrinth('tmp_map', self.conditions, 'tom', map_spec=spec, seed=seed)
+
+    def test_objects_are_reachable(self):
+        """
+        objects are never placed in closed areas or behind exit.
+        :return:
+        """
+        rows = ("#s#...\n",
+                "#.#...\n",
+                "#..#..\n",
+                "#g##..\n",
+                "#...##\n")
+        for seed in range(20):
+            labyrinth = self.create_labyrinth(rows, seed)
+            self.assertEqual(set(labyrinth.pickable_elements_position),
+                             {(1, 1), (2, 1), (2, 2)})
+
+    def test_placement_is_reproducible(self):
+        """
+        seed of labyrinth gives its placement.
+        :return:
+        """
+        labyrinth = gc.GenericLabyrinth('example_map', self.conditions, 'tom')
+        same = gc.GenericLabyrinth('example_map', self.conditions, 'tom', seed=labyrinth.seed)
+        self.assertEqual(labyrinth.pickable_elements_position, same.pickable_elements_position)
+        same.reset()
+        self.assertEqual(labyrinth.pickable_elements_position, same.pickable_elements_position)
+
+    def test_sample_distinct_cells(self):
+        """
+        sampled cells are distinct candidates.
+        :return:
+        """
+        labyrinth = gc.GenericLabyrinth('example_map', self.conditions, 'tom')
+        engine = labyrinth.placement
+        positions = engine.sample(len(engine.candidates), random.Random(0))
+        self.assertEqual(len(set(positions)), len(engine.candidates))
+        self.assertTrue(all(labyrinth.is_position_walkable(position) for position in positions))
+        with self.assertRaises(placement.UnsolvableMapException):
+            engine.sample(len(engine.candidates) + 1, random.Random(0))
+
+    def test_unsolvable_map(self):
+        """
+        a map whose exit can not be reached is refused.
+        :return:
+        """
+        with self.assertRaises(placement.UnsolvableMapException):
+            self.create_labyrinth(("#s#\n", "#..\n", "###\n", "#g#\n"))
+        with self.assertRaises(placement.UnsolvableMapException):
+            self.create_labyrinth(("#s#\n", "#.g\n", "###\n"))
+
+    def test_candidates_shared_per_map(self):
+        """
+        labyrinths of a map spec share candidates computed for the first one.
+        :return:
+        """
+        spec = loader.load_map_spec('example_map')
+        labyrinth = gc.GenericLabyrinth('example_map', self.conditions, 'tom', map_spec=spec)
+        other = gc.GenericLabyrinth('example_map', self.conditions, 'tom', map_spec=spec)
+        self.assertIs(labyrinth.placement.candidates, other.placement.candidates)
+        self.assertFalse(other.placement.candidates.flags.writeable)
@@ -0,0 +1,92 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test frame profiling
+"""
+import unittest
+
+import game.core as gc
+import game.profiling as profiling
+
+
+class TestFrameProfiler(unittest.TestCase):
+    """
+    tests for game.profiling module.
+    """
+
+    def setUp(self):
+        """
+        create a profiler keeping 4 frames.
+        :return:
+        """
+        self.profiler = profiling.FrameProfiler(window=4)
+
+    def test_percentile(self):
+        """
+        nearest-rank percentiles.
+        :return:
+        """
+        values = list(range(1, 101))
+        self.assertEqual(profiling.percentile(values, 50), 50)
+        self.assertEqual(profiling.percentile(values, 99), 99)
+        self.assertEqual(profiling.percentile(values, 100), 100)
+        self.assertEqual(profiling.percentile([3], 95), 3)
+        self.assertIsNone(profiling.percentile([], 50))
+
+    def test_rolling_phases(self):
+        """
+        last frames phases are kept, laps out of frames are ignored.
+        :return:
+        """
+        self.profiler.lap('input')
+        for _ in range(6):
+            self.profiler.begin_frame()
+            self.profiler.lap('input')
+            self.profiler.lap('render')
+            self.profiler.end_frame()
+        self.assertEqual(list(self.profiler.timings), ['input', 'render', 'other', 'frame'])
+        self.assertEqual(len(self.profiler.timings['input']), 4)
+        stats = self.profiler.stats()
+        self.assertEqual(stats['frames'], 6)
+        self.assertLessEqual(stats['phases']['input']['p50'], stats['phases']['input']['max'])
+        self.assertEqual(len(self.profiler.summary()), 4)
+
+    def test_counters_and_callbacks(self):
+        """
+        counted and watched counters are given per frame to callbacks.
+        :return:
+        """
+        total = [10]
+        self.profiler.watch('loads', lambda: total[0])
+        frames = []
+        callback = self.profiler.add_callback(
+            lambda profiler: frames.append(dict(profiler.totals)))
+        self.profiler.begin_frame()
+        self.profiler.count('blits', 3)
+        total[0] += 2
+        self.profiler.end_frame()
+        self.profiler.remove_callback(callback)
+        self.profiler.begin_frame()
+        self.profiler.end_frame()
+        self.assertEqual(frames, [{'loads': 2, 'blits': 3}])
+        self.assertEqual(list(self.profiler.counters['blits']), [3, 0])
+        self.assertEqual(self.profiler.stats()['counters']['loads'],
+                         {'per_frame': 1., 'total': 2})
+
+    def test_labyrinth_profiler(self):
+        """
+        labyrinths have no profiler until profiling is enabled, moves are then counted.
+        :return:
+        """
+        labyrinth = gc.GenericLabyrinth('small_map', gc.Conditions(), 'tom')
+        labyrinth.reset(seed=1)
+        self.assertIsNone(labyrinth.profiler)
+        profiler = labyrinth.enable_profiling(log_interval=0)
+        self.assertEqual(profiler.callbacks, [])
+        profiler.begin_frame()
+        labyrinth.step('down')
+        labyrinth.step('down')
+        profiler.end_frame()
+        self.assertEqual(profiler.totals['moves'], 2)
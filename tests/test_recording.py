@@ -0,0 +1,113 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test games recording and replay
+"""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import game.catalog as catalog
+import game.core as gc
+import game.recording as recording
+
+# every cell of small map, then the exit
+WINNING_PATH = ['down'] * 5 + ['right'] + ['up'] * 4 + ['down'] * 4 + ['left', 'down']
+
+
+class TestRecording(unittest.TestCase):
+    """
+    tests for game.recording module.
+    """
+
+    def setUp(self):
+        """
+        record a won game on small map.
+        :return:
+        """
+        self.conditions = gc.Conditions(to_pick_up_objects={"needle": 1, "tube": 1, "ether": 1})
+        self.labyrinth = gc.GenericLabyrinth('small_map', self.conditions, 'tom', seed=1)
+        self.labyrinth.get_player_initial_position()
+        self.labyrinth.start_recording()
+        # a command against a wall is recorded too
+        for direction in ['up'] + WINNING_PATH:
+            self.labyrinth.step(direction)
+        self.recording = self.labyrinth.recorder.finish()
+
+    def test_packed_commands(self):
+        """
+        commands are packed 2 bits per command.
+        :return:
+        """
+        self.assertEqual(self.recording.count, len(WINNING_PATH) + 1)
+        self.assertEqual(len(self.recording.commands), 5)
+        self.assertEqual(list(recording.iter_commands(self.recording)), ['up'] + WINNING_PATH)
+        self.assertEqual((self.recording.position, self.recording.moves,
+                          self.recording.picked_up, self.recording.won), ((6, 1), 16, 3, True))
+        self.assertEqual(recording.loads(recording.dumps(self.recording)), self.recording)
+        self.assertEqual(self.recording.conditions, self.conditions.as_dict())
+        self.assertEqual(self.recording.checksum.hex(),
+                         catalog.get_catalog().get('small_map')['checksum'])
+
+    def test_replay(self):
+        """
+        replay on another labyrinth of the map places objects from recorded seed.
+        :return:
+        """
+        labyrinth = gc.GenericLabyrinth('small_map', self.conditions, 'replay', seed=2)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(recording.replay(labyrinth, self.recording), self.recording)
+            self.assertEqual(recording.replay(labyrinth, self.recording), self.recording)
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual(labyrinth.seed, 1)
+
+    def test_replay_mismatch(self):
+        """
+        replay refuses recordings of other maps and checks final state.
+        :return:
+        """
+        labyrinth = gc.GenericLabyrinth('small_map', self.conditions, 'replay')
+        with self.assertRaises(recording.ReplayError):
+            recording.replay(labyrinth, self.recording._replace(moves=15))
+        with self.assertRaises(recording.ReplayError):
+            recording.replay(labyrinth, self.recording._replace(checksum=bytes(20)))
+        with self.assertRaises(recording.ReplayError):
+            recording.replay(labyrinth, self.recording._replace(conditions={'max_moves': 3}))
+        self.assertEqual(recording.replay(labyrinth, self.recording._replace(count=5),
+                                          check=False).position, (4, 1))
+
+    def test_save_and_replay_tool(self):
+        """
+        saved recordings are replayed by the replay tool.
+        :return:
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            path = self.labyrinth.save_recording(folder)
+            self.assertIsNone(self.labyrinth.recorder)
+            self.assertEqual(os.path.dirname(path), folder)
+            self.assertEqual(recording.read_recording(path), self.recording)
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(recording.main([path, '--repeat', '3']), 3)
+
+    def test_replay_tool_uses_recorded_conditions(self):
+        """
+        replay tool builds labyrinths with the conditions of each recording.
+        :return:
+        """
+        conditions = gc.Conditions(to_pick_up_objects={"needle": 1}, max_moves=3)
+        labyrinth = gc.GenericLabyrinth('small_map', conditions, 'tom', seed=1)
+        labyrinth.get_player_initial_position()
+        labyrinth.start_recording()
+        for direction in WINNING_PATH[:3]:
+            labyrinth.step(direction)
+        with tempfile.TemporaryDirectory() as folder:
+            path = labyrinth.save_recording(folder)
+            self.assertEqual(recording.read_recording(path).conditions,
+                             {'to_pick_up_objects': {"needle": 1}, 'max_moves': 3})
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(recording.main([path]), 1)
@@ -0,0 +1,91 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test console games server
+"""
+import asyncio
+import unittest
+
+import game.core as gc
+import game.server as server
+
+# every cell of small map, then the exit, with console commands
+WINNING_COMMANDS = ['W'] * 5 + ['S'] + ['Z'] * 4 + ['W'] * 4 + ['Q', 'W']
+
+
+class TestGameServer(unittest.IsolatedAsyncioTestCase):
+    """
+    tests for game.server module, with local clients.
+    """
+
+    async def asyncSetUp(self):
+        """
+        serve small map on a free port.
+        :return:
+        """
+        conditions = gc.Conditions(to_pick_up_objects={"needle": 1, "tube": 1, "ether": 1})
+        self.server = server.GameServer('small_map', conditions, port=0, idle_timeout=5,
+                                        seed=1)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        """
+        stop server.
+        :return:
+        """
+        await self.server.close()
+
+    async def play(self, commands, end_input=True):
+        """
+        connect a client, send commands then read output until server closes session.
+        :param end_input: close client input once commands are sent
+        :return: output of session
+        """
+        reader, writer = await asyncio.open_connection(*self.server.address)
+        writer.write(''.join(command + '\n' for command in commands).encode())
+        if end_input:
+            writer.write_eof()
+        await writer.drain()
+        output = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+        return output.decode()
+
+    async def test_won_session(self):
+        """
+        a client plays a whole game.
+        :return:
+        """
+        output = await self.play(['x'] + WINNING_COMMANDS)
+        self.assertTrue(output.endswith("You win !\n"))
+        metrics = self.server.metrics.as_dict()
+        self.assertEqual((metrics['sessions_finished'], metrics['moves']),
+                         (1, len(WINNING_COMMANDS)))
+        self.assertGreater(metrics['p99_move_latency_ms'], 0)
+
+    async def test_concurrent_sessions(self):
+        """
+        sessions are played concurrently, each on its own labyrinth.
+        :return:
+        """
+        outputs = await asyncio.gather(*[self.play(WINNING_COMMANDS[:index % 5])
+                                         for index in range(20)])
+        # a prompt after each map sent
+        self.assertEqual([output.count(gc.PROMPT) for output in outputs],
+                         [index % 5 + 1 for index in range(20)])
+        metrics = self.server.metrics.as_dict()
+        self.assertEqual(metrics['sessions_started'], 20)
+        self.assertEqual(metrics['active_sessions'], 0)
+        self.assertGreater(metrics['sessions_per_second'], 0)
+
+    async def test_idle_timeout(self):
+        """
+        sessions without input are closed.
+        :return:
+        """
+        self.server.idle_timeout = 0.05
+        output = await self.play([], end_input=False)
+        self.assertTrue(output.endswith("Idle timeout\n"))
+        self.assertEqual(self.server.metrics.timeouts, 1)
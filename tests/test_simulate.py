@@ -0,0 +1,55 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test batch simulations
+"""
+import unittest
+
+import game.simulate as simulate
+
+
+class TestSimulation(unittest.TestCase):
+    """
+    tests for game.simulate module.
+    """
+
+    def test_run_batch_in_process(self):
+        """
+        games are played in current process and results are reproducible.
+        :return:
+        """
+        results = list(simulate.run_batch('small_map', 20, 'greedy', workers=0))
+        self.assertEqual([result['seed'] for result in results], list(range(20)))
+        self.assertEqual(results, list(simulate.run_batch('small_map', 20, 'greedy', workers=0)))
+        # results are yielded game by game: first one comes before other games are played
+        self.assertEqual(next(simulate.run_batch('small_map', 10 ** 9, 'greedy', workers=0)),
+                         results[0])
+
+        summary = simulate.SimulationSummary()
+        for result in results:
+            summary.add(result)
+        stats = summary.as_dict()
+        self.assertEqual(stats['games'], 20)
+        self.assertEqual(stats['win_rate'], 1.)
+        self.assertEqual(stats['reachability'], 1.)
+
+    def test_run_batch_in_process_pool(self):
+        """
+        process pool gives same results as current process.
+        :return:
+        """
+        results = simulate.run_batch('small_map', 10, 'random', workers=2, max_steps=50,
+                                     chunk_size=3)
+        self.assertEqual(sorted(results, key=lambda result: result['seed']),
+                         list(simulate.run_batch('small_map', 10, 'random', workers=0,
+                                                 max_steps=50)))
+
+    def test_unknown_policy(self):
+        """
+        unknown policies are refused.
+        :return:
+        """
+        with self.assertRaises(ValueError):
+            list(simulate.run_batch('small_map', 1, 'teleport'))
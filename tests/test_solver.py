@@ -0,0 +1,128 @@
+# -*- coding:utf-8 -*-
+# for python 2.7 only
+# from __future__ import print_function, unicode_literals, absolute_import
+
+"""
+Module to test route solver
+"""
+import collections
+import unittest
+
+import game.core as gc
+import game.loader as loader
+import game.solver as solver
+
+
+class TestRouteSolver(unittest.TestCase):
+    """
+    tests for game.solver module.
+    """
+
+    def setUp(self):
+        """
+        create labyrinths on small map.
+        :return:
+        """
+        self.conditions = gc.Conditions(to_pick_up_objects={"needle": 1, "tube": 1, "ether": 1})
+
+    @staticmethod
+    def shortest_winning_length(labyrinth):
+        """
+        brute force breadth first search over positions and picked up objects.
+        :return: number of moves of shortest winning game
+        """
+        objects = labyrinth.pickable_elements_position
+        start = labyrinth.player['position'], frozenset()
+        seen = {start}
+        queue = collections.deque([(start, 0)])
+        while queue:
+            (position, picked), length = queue.popleft()
+            if position in labyrinth.exit_positions:
+                if len(picked) == len(objects):
+                    return length
+                continue
+            for vector in labyrinth.directions.values():
+                next_position = position[0] + vector[0], position[1] + vector[1]
+                if labyrinth.is_position_on_map(next_position) and \
+                        labyrinth.is_position_walkable(next_position):
+                    state = next_position, picked.union(
+                        [next_position] if next_position in objects else [])
+                    if state not in seen:
+                        seen.add(state)
+                        queue.append((state, length + 1))
+        return None
+
+    def test_route_is_shortest(self):
+        """
+        route length is the one of the shortest winning game.
+        :return:
+        """
+        labyrinth = gc.GenericLabyrinth('example_map', self.conditions, 'tom')
+        for seed in range(5):
+            labyrinth.reset(seed)
+            route = solver.find_route(labyrinth)
+            self.assertEqual(route[0], labyrinth.start_position)
+            self.assertIn(route[-1], labyrinth.exit_positions)
+            self.assertEqual(len(route) - 1, self.shortest_winning_length(labyrinth))
+
+    def test_commands_win_the_game(self):
+        """
+        commands are keyboard keys of labyrinth class and win the game.
+        :return:
+        """
+        labyrinth = gc.CommandLineLabyrinth('example_map', self.conditions, 'tom')
+        labyrinth.reset(7)
+        commands = solver.route_commands(labyrinth)
+        self.assertTrue(set(commands).issubset(labyrinth.keyboard_commands))
+        for key in commands:
+            labyrinth.move_player(key)
+        self.assertTrue(labyrinth.game_finished())
+        self.assertTrue(labyrinth.checked_conditions())
+
+    def test_unwinnable_game(self):
+        """
+        no route when an object can not be reached.
+        :return:
+        """
+        labyrinth = gc.GenericLabyrinth('small_map', self.conditions, 'tom')
+        labyrinth.reset(0)
+        position = next(iter(labyrinth.pickable_elements_position))
+        wall = gc.Element.create_from_default_settings('wall')
+        for vector in labyrinth.directions.values():
+            neighbour = position[0] + vector[0], position[1] + vector[1]
+            if neighbour not in labyrinth.pickable_elements_position:
+                labyrinth.positions[neighbour] = wall
+        self.assertIsNone(solver.find_route(labyrinth))
+        self.assertIsNone(solver.route_commands(labyrinth))
+
+    def test_route_avoids_extra_objects(self):
+        """
+        legs do not walk over an object the route does not pick up: a second needle on the
+        shortest leg would lose the game.
+        :return:
+        """
+        # needle is the only object of the map
+        legend = {char: value for char, value in loader.load_map_spec('small_map').legend.items()
+                  if value['name'] not in ('tube', 'ether')}
+        rows = ("#s#####\n",
+                "#...#g#\n",
+                "#.#...#\n",
+                "#.....#\n",
+                "#######\n")
+        spec = loader.MapSpec('tmp_map', None, None, rows, legend, ())
+        labyrinth = gc.GenericLabyrinth('tmp_map', gc.Conditions(to_pick_up_objects={
+            "needle": 1}), 'tom', map_spec=spec, seed=0)
+        objects = labyrinth.pickable_elements_position
+        needle = next(element for element in objects.values()
+                      if element.element_name == 'needle')
+        for position in list(objects):
+            labyrinth.positions[position] = gc.Element.create_from_default_settings('ground')
+        labyrinth.positions[(1, 1)] = labyrinth.positions[(2, 3)] = needle
+        labyrinth.get_player_initial_position()
+
+        route = solver.find_route(labyrinth)
+        self.assertEqual(len(route) - 1, 9)
+        self.assertNotIn((2, 3), route)
+        for direction in solver.route_commands(labyrinth, route):
+            result = labyrinth.step(direction)
+        self.assertEqual(result, ((1, 5), None, True, True))